@@ -1,14 +1,22 @@
+import json
 import os
 
-from app import blueprint
+import click
+from flask_migrate import stamp
+from werkzeug.datastructures import FileStorage
+
+from app import api, blueprint
 from app.main import create_app, db
+from app.main.model import Institute
+from app.main.service.student_service import import_students
 from app.main.util.api_error import APIError
+from app.main.util.import_utils import read_records
+from app.main.util.index_advisor import advise, existing_indexes, read_query_log
 
 env_name = os.environ.get("ENV_NAME", "dev")
 
 app = create_app(env_name)
 app.register_blueprint(blueprint)
-app.app_context().push()
 
 
 @app.cli.command("setup_api_database")
@@ -17,7 +25,53 @@ def create_db():
     db.create_all()
     APIError.add_errors_to_database()
     db.session.commit()
+    stamp()
+
+
+@app.cli.command("import_students")
+@click.argument("path", type=click.Path(exists=True, dir_okay=False))
+@click.option("--institute-id", type=int, required=True, help="Institute of the students")
+@click.option("--start-chunk", type=int, default=1, show_default=True, help="First chunk to import, to resume an import")
+@click.option("--no-mail", is_flag=True, help="Do not send the user activation emails")
+def import_students_command(path, institute_id, start_chunk, no_mail):
+    """Register the students of a CSV or NDJSON file, printing a JSON report per chunk."""
+    if not db.session.get(Institute, institute_id):
+        raise click.BadParameter(f"Institute {institute_id} not found", param_hint="--institute-id")
+    with app.test_request_context():
+        validator = api.models["StudentPost"].validator(api.refresolver, api.format_checker)
+
+    chunk = start_chunk
+    with open(path, "rb") as stream:
+        records = read_records(FileStorage(stream, filename=path), columns=("email",))
+        try:
+            for report in import_students(records, institute_id, validator, not no_mail, start_chunk):
+                click.echo(json.dumps(report))
+                chunk = report["chunk"] + 1
+        except APIError as error:
+            raise click.ClickException(f"{error.description} {error.info or ''}".strip())
+        except Exception:
+            click.echo(f"Chunk {chunk} failed, resume with --start-chunk {chunk}", err=True)
+            raise
+
+
+@app.cli.command("index-advisor")
+@click.argument("path", type=click.Path(exists=True, dir_okay=False), required=False)
+@click.option("--min-statements", type=int, default=1, show_default=True, help="Ignore indexes used by fewer logged statements")
+def index_advisor_command(path, min_statements):
+    """Propose the indexes missing for the statements of a query log (default: QUERY_LOG_PATH)."""
+    if not (path := path or app.config.get("QUERY_LOG_PATH")):
+        raise click.UsageError("Give the path of a query log or set QUERY_LOG_PATH")
+    with open(path) as file:
+        statements = read_query_log(file)
+
+    proposals = [proposal for proposal in advise(statements, existing_indexes(db.engine)) if proposal.statements >= min_statements]
+    if not proposals:
+        click.echo(f"No missing index for the {len(statements)} statements logged.")
+    for proposal in proposals:
+        click.echo(f"-- {proposal.statements} statements, {proposal.duration_ms:.1f} ms, like: {proposal.example}")
+        click.echo(proposal.ddl)
 
 
 if __name__ == "__main__":
+    # Development server; production runs ``gunicorn wsgi:app``
     app.run(host=app.config["HOST"])
@@ -1,15 +1,19 @@
 from flask import Blueprint
 from flask_restx import Api
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 
 from .main.controller.auth_controller import api as auth_ns
 from .main.controller.document_controller import api as document_ns
 from .main.controller.employee_controller import api as employee_ns
 from .main.controller.error_controller import _error_response, api as error_ns
+from .main.controller.health_controller import api as health_ns
 from .main.controller.institute_controller import api as institute_ns, address_ns
 from .main.controller.student_controller import api as student_ns
 from .main.controller.user_controller import api as user_ns
 from .main.util.api_error import APIError
 from .main.util.auth_utils import Auth
+from .main.util.marshalling import output_json
+from .main.util.rate_limit import RateLimitExceeded
 
 blueprint = Blueprint("api", __name__)
 
@@ -22,12 +26,14 @@ api = Api(blueprint,
           authorizations=Auth,
           contact_email="joaobruno.rf@gmail.com",
           )
+api.representation("application/json")(output_json)
 
 api.add_namespace(address_ns)
 api.add_namespace(auth_ns, path="/auth")
 api.add_namespace(document_ns, path="/document")
 api.add_namespace(employee_ns, path="/employee")
 api.add_namespace(error_ns, path="/error")
+api.add_namespace(health_ns, path="/health")
 api.add_namespace(institute_ns, path="/institute")
 api.add_namespace(student_ns, path="/student")
 api.add_namespace(user_ns, path="/user")
@@ -45,5 +51,26 @@ def handle_default_exception(error):
     Returns:
         tuple: A tuple containing the formatted error response object and the corresponding HTTP status code.
     """
+    if isinstance(error, RateLimitExceeded):
+        # Answered without the database, so rejecting a flood stays cheap
+        return {"error": error.to_dict()}, error.code, {"Retry-After": str(error.retry_after)}
     if isinstance(error, APIError):
         return {"error": error.to_error()}, error.code
+
+
+@api.errorhandler(PoolTimeoutError)
+@error_ns.marshal_with(_error_response)
+def handle_pool_timeout(error):
+    """
+    Handles a request that waited ``DB_POOL_TIMEOUT`` seconds for a database connection.
+
+    Answered without the database, since no connection is available.
+
+    Args:
+        error (TimeoutError): The pool timeout.
+
+    Returns:
+        tuple: The formatted error response object, 503 and a ``Retry-After`` header.
+    """
+    error = APIError("No database connection available.", code=503, api_code="DATABASE_BUSY")
+    return {"error": error.to_dict()}, error.code, {"Retry-After": "1"}
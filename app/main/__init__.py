@@ -1,25 +1,47 @@
 from logging.config import dictConfig
+from sqlite3 import Connection as SQLiteConnection
 
 from flask import Flask
 from flask_mail import Mail
 from flask_migrate import Migrate
-from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
 from .config import config_by_name
 from .logger import get_logging_config
+from .util.database import RoutingSQLAlchemy, engine_options
+from .util.query_log import QueryLog
 from flask_cors import CORS 
 
-db = SQLAlchemy()
+db = RoutingSQLAlchemy()
 migrate = Migrate()
 app = Flask(__name__)
 mail = Mail()
 cors = CORS()
 
 
+@event.listens_for(Engine, "connect")
+def _enable_sqlite_foreign_keys(dbapi_connection, connection_record):
+    # SQLite only enforces foreign keys, and runs their ON DELETE CASCADE, when enabled on each connection
+    if isinstance(dbapi_connection, SQLiteConnection):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA foreign_keys=ON")
+        cursor.close()
+
+
 def create_app(config_name: str) -> Flask:
     app.config.from_object(config_by_name[config_name])
     dictConfig(get_logging_config())
+    app.config.setdefault("SQLALCHEMY_ENGINE_OPTIONS", engine_options(app.config))
     db.init_app(app)
     migrate.init_app(app, db)
     mail.init_app(app)
     cors.init_app(app)
+    if query_log_path := app.config.get("QUERY_LOG_PATH"):
+        QueryLog(query_log_path).start()
+
+    @app.teardown_request
+    def _remove_session(exception):
+        # Gives the connection of the request back to the pool as soon as the request ends
+        db.session.remove()
+
     return app
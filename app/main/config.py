@@ -7,9 +7,58 @@ basedir = os.path.abspath(os.path.dirname(__file__))
 class Config:
     load_dotenv()
     SECRET_KEY = os.getenv("SECRET_KEY", "secret_key")
+    # Previous keys, comma separated, still accepted while the tokens they signed expire
+    SECRET_KEY_FALLBACKS = [key for key in os.getenv("SECRET_KEY_FALLBACKS", "").split(",") if key]
     DEBUG = False
     JWT_EXP = 8
     ACTIVATION_EXP_DAYS = 3
+    LOCAL_STORAGE_PATH = os.getenv("LOCAL_STORAGE_PATH")
+    RESPONSE_CACHE_URL = os.getenv("RESPONSE_CACHE_URL")
+    RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", 1024))
+    RESPONSE_CACHE_TIMEOUT = int(os.getenv("RESPONSE_CACHE_TIMEOUT", 300))
+    QUERY_LOG_PATH = os.getenv("QUERY_LOG_PATH")
+    # PostgreSQL connections of each worker process, see util/database.py
+    DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 5))
+    DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 5))
+    DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", 5))
+    DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", 1800))
+    DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+    DB_STATEMENT_TIMEOUT = int(os.getenv("DB_STATEMENT_TIMEOUT", 30000))
+    DB_APPLICATION_NAME = os.getenv("DB_APPLICATION_NAME", "institute-api")
+    DB_PGBOUNCER = os.getenv("DB_PGBOUNCER", "false").lower() in ("1", "true", "yes")
+    # Read replicas of the GET requests, comma separated, and seconds a writer keeps reading from the primary
+    DB_REPLICA_URIS = os.getenv("DB_REPLICA_URIS")
+    DB_REPLICA_CHECK_INTERVAL = float(os.getenv("DB_REPLICA_CHECK_INTERVAL", 5))
+    DB_REPLICA_PIN_SECONDS = int(os.getenv("DB_REPLICA_PIN_SECONDS", 5))
+    DB_REPLICA_PIN_URL = os.getenv("DB_REPLICA_PIN_URL")
+    INSTITUTE_PURGE_THRESHOLD = int(os.getenv("INSTITUTE_PURGE_THRESHOLD", 1000))
+    # Seconds without progress after which a pending or running job is resumed, its process having died
+    JOB_STALE_TIMEOUT = int(os.getenv("JOB_STALE_TIMEOUT", 300))
+    PERSIST_LOGIN_TOKEN = os.getenv("PERSIST_LOGIN_TOKEN", "false").lower() in ("1", "true", "yes")
+    LAST_LOGIN_FLUSH_INTERVAL = float(os.getenv("LAST_LOGIN_FLUSH_INTERVAL", 5))
+    TOKEN_REVOCATION_SYNC_INTERVAL = float(os.getenv("TOKEN_REVOCATION_SYNC_INTERVAL", 5))
+    IDEMPOTENCY_URL = os.getenv("IDEMPOTENCY_URL")
+    IDEMPOTENCY_SIZE = int(os.getenv("IDEMPOTENCY_SIZE", 10000))
+    IDEMPOTENCY_TTL = int(os.getenv("IDEMPOTENCY_TTL", 86400))
+    # Reverse proxies in front of the API whose X-Forwarded-For and X-Forwarded-Proto are trusted
+    TRUSTED_PROXIES = int(os.getenv("TRUSTED_PROXIES", 0))
+    RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() in ("1", "true", "yes")
+    RATE_LIMIT_URL = os.getenv("RATE_LIMIT_URL")
+    # Token buckets of each namespace by key, as "<requests>/<second|minute|hour|day>"; empty disables one
+    RATE_LIMITS = {
+        "login": {
+            "ip": os.getenv("RATE_LIMIT_LOGIN_IP", "30/minute"),
+            "email": os.getenv("RATE_LIMIT_LOGIN_EMAIL", "10/minute"),
+        },
+        "password_reset": {
+            "ip": os.getenv("RATE_LIMIT_PASSWORD_RESET_IP", "10/minute"),
+            "email": os.getenv("RATE_LIMIT_PASSWORD_RESET_EMAIL", "3/hour"),
+        },
+        "invite": {
+            "ip": os.getenv("RATE_LIMIT_INVITE_IP", "60/minute"),
+            "institute": os.getenv("RATE_LIMIT_INVITE_INSTITUTE", "100/hour"),
+        },
+    }
 
 class DevelopmentConfig(Config):
     DEBUG = True
@@ -59,7 +108,17 @@ class TestingConfig(Config):
 class ProductionConfig(Config):
     DEBUG = False
     LOG_LEVEL = "ERROR"
+    SQLALCHEMY_DATABASE_URI = os.getenv("SQLALCHEMY_DATABASE_URI")
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
     ENV = "production"
+    HOST = "0.0.0.0"
+
+    MAIL_USE_TLS = True
+    MAIL_SERVER = os.getenv('MAIL_SERVER')
+    MAIL_PORT = os.getenv('MAIL_PORT')
+    MAIL_USERNAME = os.getenv('MAIL_USERNAME')
+    MAIL_PASSWORD = os.getenv('MAIL_PASSWORD')
+    MAIL_DEFAULT_SENDER = os.getenv('MAIL_DEFAULT_SENDER')
 
 
 config_by_name = {
@@ -3,13 +3,15 @@ from flask_restx import Resource
 
 from ..dto.auth_dto import AuthenticationDTO
 from ..dto.user_dto import UserDTO
-from ..service.auth_service import login, activate_user, validate_email
+from ..service.auth_service import login, logout, activate_user, validate_email
+from ..service.token_service import PASSWORD_RESET
 from ..service.user_service import (
     generate_reset_password_email,
     reset_password,
     update_user_password,
 )
-from ..util.auth_utils import restrict_resource_to_profiles, _INSTITUTE, _EMPLOYEE, _STUDENT
+from ..util.auth_utils import require_token, restrict_resource_to_profiles, _INSTITUTE, _EMPLOYEE, _STUDENT
+from ..util.rate_limit import client_ip, json_field, rate_limiter
 
 
 api = AuthenticationDTO.api
@@ -25,9 +27,11 @@ _user_email = UserDTO.user_email
 class Login(Resource):
     """Endpoint for user login."""
 
+    @rate_limiter.limit("login", ip=client_ip, email=json_field("email"))
     @api.doc(responses={
         400: "`USER_NOT_ACTIVATED` - User not activated.",
         401: "`FAILED_LOGIN` - Login failed.",
+        429: "`TOO_MANY_REQUESTS` - Too many login attempts.",
     })
     @api.expect(_login, validate=True)
     @api.marshal_with(_login_response, description="User logged in successfully.")
@@ -37,6 +41,21 @@ class Login(Resource):
         return login(user_login=data), 200
 
 
+@api.route("/logout")
+class Logout(Resource):
+    """Endpoint for user logout."""
+
+    @require_token
+    @api.doc(responses={
+        204: "Token revoked.",
+        401: "`INVALID_TOKEN` `EXPIRED_TOKEN` `REVOKED_TOKEN` `TOKEN_IS_MISSING` - Authentication error.",
+    })
+    @api.expect(_parser)
+    def post(self):
+        """Revoke the login token of the request."""
+        return logout(request.headers["Authorization"]), 204
+
+
 @api.route("/password-update")
 class UserPasswordResource(Resource):
     """Endpoint for updating user password."""
@@ -105,20 +124,24 @@ class ForgotPasswordResource(Resource):
     def get(self):
         """Check if the reset password token is valid."""
         token = request.args["token"]
-        return validate_email(token), 204
+        return validate_email(token, PASSWORD_RESET), 204
 
+    @rate_limiter.limit("password_reset", ip=client_ip, email=json_field("email"))
     @api.response(204, "Password reset email sent.")
+    @api.response(429, "`TOO_MANY_REQUESTS` - Too many reset requests.")
     @api.expect(_user_email)
     def post(self):
         """Send reset password email."""
         data = request.json
         return generate_reset_password_email(data), 204
 
+    @rate_limiter.limit("password_reset", ip=client_ip)
     @api.doc(
         "Update user's password",
         responses={
             204: "User's password updated successfully.",
             400: "`FAILED_DECODE` `WRONG_CONFIRM_PASSWORD` - Decoding failed or incorrect password confirmation.",
+            429: "`TOO_MANY_REQUESTS` - Too many reset requests.",
         },
     )
     @api.expect(_reset_password_parser, _set_password)
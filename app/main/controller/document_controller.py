@@ -5,6 +5,7 @@ from flask_restx import Resource
 from ..service.document_service import (
     delete_document,
     get_document,
+    get_document_version,
     save_new_document,
     update_document,
     get_all_documents,
@@ -13,6 +14,8 @@ from ..dto.document_dto import DocumentDTO
 from ..dto.auth_dto import AuthenticationDTO
 from ..dto.pagination_dto import PaginationDTO
 from ..util.auth_utils import restrict_resource_to_profiles, _INSTITUTE, _EMPLOYEE, _STUDENT
+from ..util.conditional_utils import conditional
+from ..util.idempotency import idempotency, idempotency_key_param
 
 
 api = DocumentDTO.api
@@ -32,6 +35,8 @@ _parser = AuthenticationDTO.parser
 })
 class DocumentList(Resource):
     @restrict_resource_to_profiles(_STUDENT)
+    @conditional(get_document_version)
+    @api.response(304, "Not modified")
     @api.response(404, "`USER_NOT_FOUND` `DOCUMENT_NOT_FOUND`")
     @api.marshal_with(_document_get)
     @api.expect(_parser)
@@ -40,7 +45,8 @@ class DocumentList(Resource):
         return get_document(user), 200
 
     @restrict_resource_to_profiles(_STUDENT)
-    @api.doc("create a new document", responses={
+    @idempotency.idempotent
+    @api.doc("create a new document", params=idempotency_key_param, responses={
         400: "`INVALID_DOCUMENT` `S3_INTERNAL_ERROR`",
         404: "`USER_NOT_FOUND` `STUDENT_NOT_FOUND`",
         409: "`DOCUMENT_ALREADY_EXISTS`",
@@ -5,8 +5,10 @@ from ..dto.pagination_dto import PaginationDTO
 from ..dto.user_dto import UserDTO
 from ..dto.employee_dto import EmployeeDTO
 from ..dto.auth_dto import AuthenticationDTO
-from ..service.employee_service import update_employee, get_employees, delete_employee
+from ..service.employee_service import update_employee, update_employees, get_employees, delete_employee, delete_employees
 from ..util.auth_utils import restrict_resource_to_profiles, _INSTITUTE
+from ..util.cache_utils import TENANT, response_cache
+from ..util.single_flight import single_flight
 
 
 api = EmployeeDTO.api
@@ -15,6 +17,9 @@ _pagination_parser = PaginationDTO.pagination_parser
 _user_put = UserDTO.user_put
 _user_paged = UserDTO.user_paged
 _user_filters_parser = UserDTO.user_filters_parser
+_employee_batch_put = EmployeeDTO.employee_batch_put
+_employee_batch_parser = EmployeeDTO.employee_batch_parser
+_employee_batch = EmployeeDTO.employee_batch
 
 
 @api.route("/<int:id>")
@@ -51,7 +56,33 @@ class EmployeeListResource(Resource):
         404: "`USER_NOT_FOUND` `PAGE_NOT_FOUND`",
     })
     @api.expect(_parser, _pagination_parser, _user_filters_parser, validate=True)
+    @response_cache.cached(TENANT)
+    @single_flight.coalesce(TENANT)
     @api.marshal_with(_user_paged)
     def get(self, user):
         """Get employee list"""
         return get_employees(user), 200
+
+
+@api.route("/batch")
+@api.doc(responses={
+    400: "`INVALID_DATA`",
+    401: "`INVALID_TOKEN` `EXPIRED_TOKEN` `DECODED_USER_NOT_FOUND` `TOKEN_IS_MISSING`",
+    403: "`PROFILE_FORBIDDEN_ACCESS`",
+    404: "`USER_NOT_FOUND`",
+})
+class EmployeeBatchResource(Resource):
+    @restrict_resource_to_profiles(_INSTITUTE)
+    @api.expect(_parser, _employee_batch_put, validate=True)
+    @api.marshal_with(_employee_batch, description="Per-id results (EMPLOYEE_NOT_FOUND)")
+    def put(self, user):
+        """Update many employees"""
+        return {"items": update_employees(user, request.json["employees"])}, 200
+
+    @restrict_resource_to_profiles(_INSTITUTE)
+    @api.expect(_parser, _employee_batch_parser)
+    @api.marshal_with(_employee_batch, description="Per-id results (EMPLOYEE_NOT_FOUND, EMPLOYEE_IS_INSTITUTE_ADMIN)")
+    def delete(self, user):
+        """Delete many employees"""
+        ids = _employee_batch_parser.parse_args()["ids"]
+        return {"items": delete_employees(user, ids)}, 200
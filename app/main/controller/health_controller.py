@@ -0,0 +1,25 @@
+from flask_restx import Resource
+
+from ..dto.health_dto import HealthDTO
+from ..service.health_service import liveness, readiness
+
+api = HealthDTO.api
+_health = HealthDTO.health
+
+
+@api.route("/live")
+class Liveness(Resource):
+    @api.doc(security=None)
+    @api.marshal_with(_health, skip_none=True, description="The worker is running")
+    def get(self):
+        """Liveness probe: answers as long as the worker serves requests."""
+        return liveness(), 200
+
+
+@api.route("/ready")
+class Readiness(Resource):
+    @api.doc(security=None, responses={503: "The database cannot be reached"})
+    @api.marshal_with(_health, description="The worker can reach the database")
+    def get(self):
+        """Readiness probe: checks the database and reports the connection pool and coalesced requests of the worker."""
+        return readiness()
@@ -3,14 +3,24 @@ from flask_restx import Resource
 
 from ..service.institute_service import (delete_institute, get_all_institutes,
                                          save_new_institute, update_institute,
-                                         institute_info, invite_employee,
-                                         invite_student,
+                                         institute_info, get_institute_version, invite_employee,
+                                         invite_student, invite_students,
                                        )
+from ..service.job_service import generate_job_token, get_job, get_job_by_token
+from ..service.student_service import stream_institute_students
 from ..dto.address_dto import AddressDTO
 from ..dto.institute_dto import InstituteDTO, UserDTO
 from ..dto.auth_dto import AuthenticationDTO
 from ..dto.pagination_dto import PaginationDTO
+from ..dto.student_dto import StudentDTO
 from ..util.auth_utils import require_token, restrict_resource_to_profiles, _INSTITUTE, _EMPLOYEE
+from ..util.idempotency import idempotency, idempotency_key_param
+from ..util.rate_limit import client_ip, rate_limiter, token_subject
+from ..util.cache_utils import response_cache
+from ..util.single_flight import single_flight
+from ..util.conditional_utils import conditional
+from ..util.export_utils import EXPORT_FORMATS, stream_export
+from ..util.marshalling import compiler
 
 
 address_ns = AddressDTO.api
@@ -24,7 +34,14 @@ _institute_put = InstituteDTO.institute_put
 _institute_filters_parser = InstituteDTO.institute_filters_parser
 _institutes_paged = InstituteDTO.institutes_paged
 _invite_response = InstituteDTO.invite_response
+_job = InstituteDTO.job
+_job_accepted = InstituteDTO.job_accepted
 _pagination_parser = PaginationDTO.pagination_parser
+_student = StudentDTO.student
+_student_filters_parser = StudentDTO.student_filters_parser
+_student_export_parser = InstituteDTO.student_export_parser
+_student_invite_parser = InstituteDTO.student_invite_parser
+_student_invite_report = InstituteDTO.student_invite_report
 
 
 @api.route("/")
@@ -36,6 +53,8 @@ class InstituteList(Resource):
         404: "`USER_NOT_FOUND` `PAGES_NOT_FOUND`"
     })
     @api.expect(_parser, _pagination_parser, _institute_filters_parser, validate=True)
+    @response_cache.cached()
+    @single_flight.coalesce()
     @api.marshal_list_with(_institutes_paged, code=200, description="List of registered institutes")
     def get(self):
         """List all registered institutes."""
@@ -71,6 +90,7 @@ class InstituteList(Resource):
 
     @restrict_resource_to_profiles(_INSTITUTE)
     @api.response(204, "Institute deleted")
+    @api.response(202, "Institute being deleted by the returned job", _job_accepted)
     @api.doc(responses={
         204: "Institute deleted",
         401: "`INVALID_TOKEN` `EXPIRED_TOKEN` `DECODED_USER_NOT_FOUND` `TOKEN_IS_MISSING`",
@@ -79,8 +99,37 @@ class InstituteList(Resource):
     })
     @api.expect(_parser)
     def delete(self, user):
-        """Delete institute."""
-        return delete_institute(user), 204
+        """Delete institute, in the background when it has many students."""
+        if job := delete_institute(user):
+            return {**compiler.compile(_job)(job), "token": generate_job_token(job)}, 202
+        return None, 204
+
+
+@api.route("/jobs/<string:job_id>")
+class InstituteJob(Resource):
+    @restrict_resource_to_profiles(_INSTITUTE)
+    @api.doc(responses={
+        401: "`INVALID_TOKEN` `EXPIRED_TOKEN` `DECODED_USER_NOT_FOUND` `TOKEN_IS_MISSING`",
+        403: "`PROFILE_FORBIDDEN_ACCESS`",
+        404: "`USER_NOT_FOUND` `JOB_NOT_FOUND`",
+    })
+    @api.expect(_parser)
+    @api.marshal_with(_job, description="Progress of the job")
+    def get(self, user, job_id):
+        """Get the progress of a job started by the user."""
+        return get_job(job_id, user), 200
+
+
+@api.route("/jobs/status/<string:token>")
+class InstituteJobByToken(Resource):
+    @api.doc(responses={
+        400: "`FAILED_DECODE`",
+        404: "`JOB_NOT_FOUND`",
+    })
+    @api.marshal_with(_job, description="Progress of the job")
+    def get(self, token):
+        """Get the progress of a job with the token returned when it was started, without logging in."""
+        return get_job_by_token(token), 200
 
 
 @api.route("/invite/employee/")
@@ -89,9 +138,13 @@ class InstituteList(Resource):
     403: "`PROFILE_FORBIDDEN_ACCESS`",
     404: "`USER_NOT_FOUND`",
     409: "`USER_ALREADY_EXISTS` `EMPLOYEE_ALREADY_EXISTS` `EMPLOYEE_ALREADY_ACTIVE`",
+    429: "`TOO_MANY_REQUESTS`",
 })
 class InviteEmployee(Resource):
+    @rate_limiter.limit("invite", ip=client_ip, institute=token_subject)
     @restrict_resource_to_profiles(_INSTITUTE)
+    @idempotency.idempotent
+    @api.doc(params=idempotency_key_param)
     @api.expect(_invite_response, _parser, validate=True)
     @api.marshal_list_with(_invite_response, description="Email sent to destination")
     def post(self, user):
@@ -106,9 +159,13 @@ class InviteEmployee(Resource):
     403: "`PROFILE_FORBIDDEN_ACCESS`",
     404: "`USER_NOT_FOUND`",
     409: "`USER_ALREADY_EXISTS` `EMPLOYEE_ALREADY_EXISTS` `EMPLOYEE_ALREADY_ACTIVE`",
+    429: "`TOO_MANY_REQUESTS`",
 })
 class InviteStudent(Resource):
+    @rate_limiter.limit("invite", ip=client_ip, institute=token_subject)
     @restrict_resource_to_profiles(_INSTITUTE)
+    @idempotency.idempotent
+    @api.doc(params=idempotency_key_param)
     @api.expect(_student_email, _parser, validate=True)
     @api.marshal_with(_student_email, description="Email sent to destination")
     def post(self, user):
@@ -116,10 +173,51 @@ class InviteStudent(Resource):
         data = request.json
         return invite_student(data, user)
 
-@api.route("")
+@api.route("/invite/student/bulk/")
+@api.doc(responses={
+    400: "`INVALID_DATA`",
+    401: "`INVALID_TOKEN` `EXPIRED_TOKEN` `DECODED_USER_NOT_FOUND` `TOKEN_IS_MISSING`",
+    403: "`PROFILE_FORBIDDEN_ACCESS`",
+    404: "`USER_NOT_FOUND`",
+    429: "`TOO_MANY_REQUESTS`",
+})
+class InviteStudentBulk(Resource):
+    @rate_limiter.limit("invite", ip=client_ip, institute=token_subject)
+    @restrict_resource_to_profiles(_INSTITUTE)
+    @idempotency.idempotent
+    @api.doc(params=idempotency_key_param)
+    @api.expect(_student_invite_parser)
+    @api.marshal_with(_student_invite_report, description="Invitations sent, with the result of each row")
+    def post(self, user):
+        """Invite the students listed in a CSV or NDJSON file to the institute."""
+        return invite_students(request.files.get("file", default=None), user)
+
+
+@api.route("/export/students")
+class StudentExport(Resource):
+    @restrict_resource_to_profiles(_INSTITUTE, _EMPLOYEE)
+    @api.doc(responses={
+        200: "Students of the institute, gzipped when accepted by the client",
+        400: "Invalid export format",
+        401: "`INVALID_TOKEN` `EXPIRED_TOKEN` `DECODED_USER_NOT_FOUND` `TOKEN_IS_MISSING`",
+        403: "`PROFILE_FORBIDDEN_ACCESS`",
+        404: "`USER_NOT_FOUND`",
+    })
+    @api.expect(_parser, _student_export_parser, _student_filters_parser)
+    @api.produces(list(EXPORT_FORMATS.values()))
+    def get(self, user):
+        """Export the students of the institute as CSV or NDJSON."""
+        export_format = _student_export_parser.parse_args()["format"]
+        students = map(compiler.compile(_student), stream_institute_students(user))
+        return stream_export(_student, students, export_format, "students", compress="gzip" in request.accept_encodings)
+
+
+@api.route("/info")
 class InstituteInformationResource(Resource):
     @restrict_resource_to_profiles(_INSTITUTE, _EMPLOYEE)
+    @conditional(get_institute_version)
     @api.doc(responses={
+        304: "Not modified",
         401: "`INVALID_TOKEN` `EXPIRED_TOKEN` `DECODED_USER_NOT_FOUND` `TOKEN_IS_MISSING`",
         403: "`PROFILE_FORBIDDEN_ACCESS`",
         404: "`USER_NOT_FOUND`",
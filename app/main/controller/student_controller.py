@@ -1,13 +1,18 @@
 from flask import request
 from flask_restx import Resource
 
-from ..service.student_service import (delete, find_student_by_id,
-                                         get_all_students,
+from ..service.student_service import (delete, find_student_by_id, find_students_by_ids,
+                                         get_student_version, parse_student_ids,
+                                         get_all_students, import_students_file,
                                          save_new_student, update_student)
 from ..dto.student_dto import StudentDTO
 from ..dto.auth_dto import AuthenticationDTO
 from ..dto.pagination_dto import PaginationDTO
 from ..util.auth_utils import restrict_resource_to_profiles, _INSTITUTE, _EMPLOYEE, _STUDENT
+from ..util.cache_utils import response_cache
+from ..util.single_flight import single_flight
+from ..util.conditional_utils import conditional
+from ..util.idempotency import idempotency, idempotency_key_param
 
 api = StudentDTO.api
 _student = StudentDTO.student
@@ -17,10 +22,17 @@ _student_paged = StudentDTO.student_paged
 _student_filters_parser = StudentDTO.student_filters_parser
 _pagination_parser = PaginationDTO.pagination_parser
 _parser = AuthenticationDTO.parser
+_student_import_parser = StudentDTO.student_import_parser
+_student_batch_parser = StudentDTO.student_batch_parser
+_student_batch_post = StudentDTO.student_batch_post
+_student_batch = StudentDTO.student_batch
+_student_import_report = StudentDTO.student_import_report
 
 
 @api.route("/<string:token>")
 class StudentCreate(Resource):
+    @idempotency.idempotent
+    @api.doc(params=idempotency_key_param)
     @api.expect(_student_post, validate=True)
     @api.response(409, "USER_ALREADY_EXISTS")
     @api.marshal_with(_student, code=201, description="Student successfully created")
@@ -38,6 +50,8 @@ class StudentList(Resource):
         404: "USER_NOT_FOUND|PAGES_NOT_FOUND"
     })
     @api.expect(_parser, _pagination_parser, _student_filters_parser, validate=True)
+    @response_cache.cached()
+    @single_flight.coalesce()
     @api.marshal_list_with(_student_paged)
     def get(self):
         """List all registered students"""
@@ -71,10 +85,54 @@ class StudentList(Resource):
         return delete(user), 204
 
 
+@api.route("/batch")
+@api.doc(responses={
+    400: "INVALID_DATA",
+    401: "INVALID_TOKEN|EXPIRED_TOKEN|DECODED_USER_NOT_FOUND|TOKEN_IS_MISSING",
+    403: "PROFILE_FORBIDDEN_ACCESS",
+    404: "USER_NOT_FOUND"
+})
+class StudentBatch(Resource):
+    @restrict_resource_to_profiles(_INSTITUTE, _EMPLOYEE, _STUDENT)
+    @api.expect(_parser, _student_batch_parser)
+    @api.marshal_with(_student_batch, description="Students or per-id errors (STUDENT_FORBIDDEN_ACCESS, STUDENT_NOT_FOUND)")
+    def get(self, user):
+        """Get registered students by id"""
+        ids = parse_student_ids(request.args.get("ids", default="", type=str))
+        return {"items": find_students_by_ids(ids, user)}, 200
+
+    @restrict_resource_to_profiles(_INSTITUTE, _EMPLOYEE, _STUDENT)
+    @api.expect(_student_batch_post, _parser, validate=True)
+    @api.marshal_with(_student_batch, description="Students or per-id errors (STUDENT_FORBIDDEN_ACCESS, STUDENT_NOT_FOUND)")
+    def post(self, user):
+        """Get registered students by id, for long lists of ids"""
+        return {"items": find_students_by_ids(request.json["ids"], user)}, 200
+
+
+@api.route("/import/")
+class StudentImport(Resource):
+    @restrict_resource_to_profiles(_INSTITUTE)
+    @api.doc(responses={
+        400: "INVALID_DATA",
+        401: "INVALID_TOKEN|EXPIRED_TOKEN|DECODED_USER_NOT_FOUND|TOKEN_IS_MISSING",
+        403: "PROFILE_FORBIDDEN_ACCESS",
+        404: "USER_NOT_FOUND"
+    })
+    @api.expect(_student_import_parser)
+    @api.marshal_with(_student_import_report, description="Students imported, with the errors of the rejected rows")
+    def post(self, user):
+        """Register the students listed in a CSV or NDJSON file"""
+        validator = _student_post.validator(self.api.refresolver, self.api.format_checker)
+        start_chunk = request.args.get("start_chunk", default=1, type=int)
+        return import_students_file(request.files.get("file", default=None), user, validator, start_chunk)
+
+
 @api.route("/<int:id>")
 class StudentListWithID(Resource):
     @restrict_resource_to_profiles(_INSTITUTE, _EMPLOYEE, _STUDENT)
+    @conditional(get_student_version)
     @api.doc("registered student by id", responses={
+        304: "Not modified",
         401: "INVALID_TOKEN|EXPIRED_TOKEN|DECODED_USER_NOT_FOUND|TOKEN_IS_MISSING",
         403: "STUDENT_FORBIDDEN_ACCESS",
         404: "USER_NOT_FOUND|STUDENT_NOT_FOUND"
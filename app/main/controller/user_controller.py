@@ -2,16 +2,22 @@ from flask import request
 from flask_restx import Resource
 
 from ..dto.auth_dto import AuthenticationDTO
+from ..dto.institute_dto import InstituteDTO
 from ..dto.user_dto import UserDTO
+from ..service.job_service import generate_job_token
 from ..service.user_service import (deactivate_user, delete_user,
-                                    update_user,)
+                                    get_user_version, update_user,)
 from ..util.auth_utils import restrict_resource_to_profiles, _INSTITUTE, _EMPLOYEE, _STUDENT
+from ..util.conditional_utils import conditional
+from ..util.marshalling import compiler
 
 api = UserDTO.api
 _parser = AuthenticationDTO.parser
 _user = UserDTO.user
 _user_get = UserDTO.user_get
 _user_put = UserDTO.user_put
+_job = InstituteDTO.job
+_job_accepted = InstituteDTO.job_accepted
 
 
 @api.route("/")
@@ -23,6 +29,8 @@ _user_put = UserDTO.user_put
 })
 class UserResource(Resource):
     @restrict_resource_to_profiles(_INSTITUTE, _EMPLOYEE, _STUDENT)
+    @conditional(get_user_version)
+    @api.response(304, "Not modified")
     @api.marshal_with(_user_get)
     def get(self, user):
         """get self logged"""
@@ -38,9 +46,12 @@ class UserResource(Resource):
 
     @restrict_resource_to_profiles(_INSTITUTE, _EMPLOYEE, _STUDENT)
     @api.response(204, "User deleted")
+    @api.response(202, "User deleted, its institute being deleted by the returned job", _job_accepted)
     def delete(self, user):
-        """Delete self user"""
-        return delete_user(user), 204
+        """Delete self user, with the institute of an institute user"""
+        if job := delete_user(user):
+            return {**compiler.compile(_job)(job), "token": generate_job_token(job)}, 202
+        return None, 204
 
 
 @api.route("/<int:id>")
@@ -1,4 +1,6 @@
-from flask_restx import Namespace, fields
+from flask_restx import fields
+
+from ..util.namespace import Namespace
 
 
 class AddressDTO:
@@ -1,13 +1,15 @@
-from flask_restx import Namespace, fields
+from flask_restx import fields
 from werkzeug.datastructures import FileStorage
 
+from ..util.namespace import Namespace
+from ..util.replicas import replica_router
 from ..util.document_validation_utils import parse_request_value
 from .auth_dto import AuthenticationDTO
 from .pagination_dto import PaginationDTO
 
 
 class DocumentDTO:
-    api = Namespace("document", description="Document related operations")
+    api = Namespace("document", description="Document related operations", decorators=[replica_router.route])
 
     document_filters_parser = api.parser().add_argument("title", type=str, location="query")
 
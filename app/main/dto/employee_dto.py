@@ -1,10 +1,13 @@
-from flask_restx import Namespace, fields
+from flask_restx import fields
 
+from ..util.namespace import Namespace
+from ..util.replicas import replica_router
 from app.main.dto.user_dto import UserDTO
+from .error_dto import ErrorsDTO
 
 
 class EmployeeDTO:
-    api = Namespace("employee", description="Employee related operations")
+    api = Namespace("employee", description="Employee related operations", decorators=[replica_router.route])
 
     employee_role = api.model(
         "EmployeeRole",
@@ -31,3 +34,46 @@ class EmployeeDTO:
         employee_role,
     )
     employee.__strict__ = True
+
+    employee_batch_item = api.clone(
+        "EmployeeBatchItem",
+        UserDTO.user_put,
+        {
+            "id": fields.Integer(required=True, description="User id of the employee", example=1),
+        },
+    )
+    employee_batch_item.__strict__ = True
+
+    employee_batch_put = api.model(
+        "EmployeeBatchPut",
+        {
+            "employees": fields.List(
+                fields.Nested(employee_batch_item),
+                required=True,
+                description="Employees to update, at most 1000",
+            ),
+        },
+        strict=True,
+    )
+
+    employee_batch_parser = api.parser().add_argument(
+        "ids", type=int, action="split", required=True, location="args", help="Comma separated employee ids"
+    )
+
+    employee_batch_result = api.model(
+        "EmployeeBatchResult",
+        {
+            "id": fields.Integer(description="Requested employee id"),
+            "error": fields.Nested(ErrorsDTO.error, allow_null=True, skip_none=True),
+        },
+    )
+
+    employee_batch = api.model(
+        "EmployeeBatch",
+        {
+            "items": fields.List(
+                fields.Nested(employee_batch_result, skip_none=True),
+                description="Results in request order, each with an error when the employee was not changed",
+            ),
+        },
+    )
@@ -1,10 +1,12 @@
-from flask_restx import Namespace, fields, inputs, reqparse
+from flask_restx import fields, inputs, reqparse
 
+from ..util.namespace import Namespace
+from ..util.replicas import replica_router
 from .pagination_dto import PaginationDTO
 
 
 class ErrorsDTO:
-    api = Namespace("error", description="API erors operations")
+    api = Namespace("error", description="API erors operations", decorators=[replica_router.route])
 
     error_filters_parser = reqparse.RequestParser()
     error_filters_parser.add_argument("code", type=inputs.regex(r"^[1-5][0-9]{2}$"), location="query")
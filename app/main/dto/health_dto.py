@@ -0,0 +1,39 @@
+from flask_restx import fields
+
+from ..util.namespace import Namespace
+
+
+class HealthDTO:
+    api = Namespace("health", description="Liveness and readiness probes")
+
+    pool = api.model(
+        "Pool",
+        {
+            "kind": fields.String(description="Class of the connection pool"),
+            "size": fields.Integer(description="Connections kept open by the pool"),
+            "checked_in": fields.Integer(description="Idle connections"),
+            "checked_out": fields.Integer(description="Connections in use"),
+            "overflow": fields.Integer(description="Connections opened beyond the size"),
+        },
+    )
+
+    coalescing = api.model(
+        "Coalescing",
+        {
+            "endpoint": fields.String(description="Endpoint of the coalesced requests"),
+            "executions": fields.Integer(description="Requests that ran the endpoint"),
+            "coalesced": fields.Integer(description="Requests that shared the answer of a running one"),
+        },
+    )
+
+    health = api.model(
+        "Health",
+        {
+            "status": fields.String(description="`ok` or `unavailable`"),
+            "database": fields.String(description="`ok`, or the error of the database check"),
+            "pool": fields.Nested(pool, allow_null=True, description="Connection pool of the worker"),
+            "coalescing": fields.List(
+                fields.Nested(coalescing), description="Concurrent identical requests coalesced by the worker"
+            ),
+        },
+    )
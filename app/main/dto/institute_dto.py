@@ -1,13 +1,18 @@
-from flask_restx import Namespace, fields, inputs
+from flask_restx import fields, inputs
+from werkzeug.datastructures import FileStorage
 
+from ..util.export_utils import EXPORT_FORMATS
+from ..util.namespace import Namespace
+from ..util.replicas import replica_router
 from .address_dto import AddressDTO
+from .auth_dto import AuthenticationDTO
 from .pagination_dto import PaginationDTO
 from .user_dto import UserDTO
 from .employee_dto import EmployeeDTO
 
 
 class InstituteDTO:
-    api = Namespace("institute", description="Institute related operations")
+    api = Namespace("institute", description="Institute related operations", decorators=[replica_router.route])
 
     institute_filters_parser = api.parser()
     institute_filters_parser.add_argument("trading_name", type=str, location="query")
@@ -16,6 +21,9 @@ class InstituteDTO:
     institute_filters_parser.add_argument("state", type=str, location="query")
     institute_filters_parser.add_argument("city", type=str, location="query")
 
+    student_export_parser = api.parser()
+    student_export_parser.add_argument("format", type=str, location="args", choices=tuple(EXPORT_FORMATS), default="csv")
+
     institute_name = api.model(
         "InstituteName",
         {
@@ -54,7 +62,7 @@ class InstituteDTO:
                 EmployeeDTO.employee_post,
                 required=True,
                 skip_none=True,
-                attribute=lambda institute: institute.get_admin_employee.user,
+                attribute="admin_user",
             ),
             "cnpj": fields.String(
                 required=True,
@@ -83,6 +91,57 @@ class InstituteDTO:
     )
     invite_response.__strict__ = True
 
+    student_invite_parser = AuthenticationDTO.parser.copy().add_argument(
+        "file",
+        location="files",
+        type=FileStorage,
+        required=True,
+        help="CSV with an 'email' column, or NDJSON (.ndjson) of {\"email\": ...} objects",
+    )
+
+    student_invite_result = api.model(
+        "StudentInviteResult",
+        {
+            "row": fields.Integer(description="Row of the file, from 1"),
+            "email": fields.String(description="Email of the row"),
+            "status": fields.String(
+                description="Result of the row",
+                enum=["INVITED", "INVALID_EMAIL", "DUPLICATE_EMAIL", "USER_ALREADY_EXISTS", "USER_ALREADY_ACTIVE"],
+            ),
+        },
+    )
+
+    student_invite_report = api.model(
+        "StudentInviteReport",
+        {
+            "invited": fields.Integer(description="Invitations sent"),
+            "failed": fields.Integer(description="Rows not invited"),
+            "results": fields.List(fields.Nested(student_invite_result)),
+        },
+    )
+
+    job = api.model(
+        "Job",
+        {
+            "id": fields.String(description="Job id"),
+            "kind": fields.String(description="What the job does", example="PURGE_INSTITUTE"),
+            "status": fields.String(description="Job status", enum=["PENDING", "RUNNING", "DONE", "FAILED"]),
+            "processed": fields.Integer(description="Students deleted so far"),
+            "total": fields.Integer(description="Students to delete"),
+            "error": fields.String(description="Why the job failed"),
+            "created_at": fields.DateTime(description="When the job was created"),
+            "updated_at": fields.DateTime(description="When the job last progressed"),
+        },
+    )
+
+    job_accepted = api.inherit(
+        "JobAccepted",
+        job,
+        {
+            "token": fields.String(description="Token reading the job at /institute/jobs/status/<token>, without logging in"),
+        },
+    )
+
     institutes_paged = api.clone(
         "InstitutesPaged",
         PaginationDTO.pagination_base,
@@ -1,4 +1,6 @@
-from flask_restx import Namespace, fields, reqparse
+from flask_restx import fields, reqparse
+
+from ..util.namespace import Namespace
 
 
 class PaginationDTO:
@@ -24,6 +26,7 @@ class PaginationDTO:
     pagination_parser = reqparse.RequestParser()
     pagination_parser.add_argument("page", type=int, location="query")
     pagination_parser.add_argument("per_page", type=int, location="query")
+    pagination_parser.add_argument("fields", type=str, location="query", help="Comma separated item fields to return, nested ones dotted (e.g. id,user.name)")
 
     page_parser = reqparse.RequestParser()
     page_parser.add_argument("page", type=int, location="query")
@@ -1,13 +1,18 @@
-from flask_restx import Namespace, fields, inputs
+from flask_restx import fields, inputs
+from werkzeug.datastructures import FileStorage
 
+from ..util.namespace import Namespace
+from ..util.replicas import replica_router
 from ..model.student import Gender
 from .address_dto import AddressDTO
+from .auth_dto import AuthenticationDTO
+from .error_dto import ErrorsDTO
 from .user_dto import UserDTO
 from .pagination_dto import PaginationDTO
 
 
 class StudentDTO:
-    api = Namespace("student", description="Student related operations")
+    api = Namespace("student", description="Student related operations", decorators=[replica_router.route])
 
     student_filters_parser = api.parser()
     student_filters_parser.add_argument("name", type=str, location="query")
@@ -16,6 +21,7 @@ class StudentDTO:
     student_filters_parser.add_argument("state", type=str, location="query")
     student_filters_parser.add_argument("city", type=str, location="query")
     student_filters_parser.add_argument("gender",type=str,location="query",choices=Gender._member_names_)
+    student_filters_parser.add_argument("sort", type=str, location="query", help="Comma separated columns (id, birthday_date, gender), '-' prefix for descending")
 
     student_id = api.parser().add_argument("student_id", type=int, location="query")
 
@@ -99,3 +105,83 @@ class StudentDTO:
             "items": fields.List(fields.Nested(student)),
         },
     )
+
+    student_batch_parser = api.parser().add_argument(
+        "ids", type=str, required=True, location="args", help="Comma separated student ids"
+    )
+
+    student_batch_post = api.model(
+        "StudentBatchPost",
+        {
+            "ids": fields.List(
+                fields.Integer,
+                required=True,
+                description="Student ids, at most 1000",
+                example=[1, 2, 3],
+            ),
+        },
+        strict=True,
+    )
+
+    student_batch_result = api.model(
+        "StudentBatchResult",
+        {
+            "id": fields.Integer(description="Requested student id"),
+            "student": fields.Nested(student, allow_null=True),
+            "error": fields.Nested(ErrorsDTO.error, allow_null=True, skip_none=True),
+        },
+    )
+
+    student_batch = api.model(
+        "StudentBatch",
+        {
+            "items": fields.List(
+                fields.Nested(student_batch_result, skip_none=True),
+                description="Results in request order, each with a student or an error",
+            ),
+        },
+    )
+
+    student_import_parser = AuthenticationDTO.parser.copy().add_argument(
+        "file",
+        location="files",
+        type=FileStorage,
+        required=True,
+        help="CSV with 'email', 'user.name', 'address.city'... columns, or NDJSON (.ndjson) of StudentPost objects with an 'email'",
+    )
+    student_import_parser.add_argument(
+        "start_chunk", type=int, location="args", default=1, help="First chunk to import, to resume an import"
+    )
+
+    student_import_error = api.model(
+        "StudentImportError",
+        {
+            "row": fields.Integer(description="Row of the file, from 1"),
+            "email": fields.String(description="Email of the row"),
+            "status": fields.String(
+                description="Reason the row was not imported",
+                enum=["INVALID_ROW", "INVALID_EMAIL", "DUPLICATE_EMAIL", "INVALID_DATA", "USER_ALREADY_EXISTS"],
+            ),
+            "errors": fields.Raw(description="Validation errors of the row"),
+        },
+    )
+
+    student_import_chunk = api.model(
+        "StudentImportChunk",
+        {
+            "chunk": fields.Integer(description="Chunk number, from 1"),
+            "first_row": fields.Integer(description="First row of the chunk"),
+            "last_row": fields.Integer(description="Last row of the chunk"),
+            "imported": fields.Integer(description="Students imported from the chunk"),
+        },
+    )
+
+    student_import_report = api.model(
+        "StudentImportReport",
+        {
+            "imported": fields.Integer(description="Students imported"),
+            "failed": fields.Integer(description="Rows not imported"),
+            "chunks": fields.List(fields.Nested(student_import_chunk)),
+            "errors": fields.List(fields.Nested(student_import_error, skip_none=True)),
+        },
+    )
@@ -1,11 +1,12 @@
-from flask_restx import Namespace, fields
+from flask_restx import fields
 
+from ..util.namespace import Namespace
 from ..model.user import Profile
 from .address_dto import AddressDTO
 from .pagination_dto import PaginationDTO
 
 
-email_pattern = r"^(?:[\w]+|([-_.])(?!\1))+@+(?:[\w]+|([-_.])(?!\1))(\.[\w]{2,10})+$"
+email_pattern = r"^(?:[\w]|([-_.])(?!\1))+@+(?:[\w]+|([-_.])(?!\1))(\.[\w]{2,10})+$"
 phone_number_pattern = r"^$|^[1-9]{2}(?:[2-8]|9[1-9])[0-9]{3}[0-9]{4}$"
 
 
@@ -3,5 +3,7 @@ from .document import Document
 from .employee import Employee
 from .error import Error
 from .institute import Institute
+from .job import Job
 from .student import Student
+from .token_revocation import TokenRevocation
 from .user import User
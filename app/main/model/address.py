@@ -1,7 +1,8 @@
 from .. import db
+from .versioned import Versioned
 
 
-class Address(db.Model):
+class Address(Versioned, db.Model):
     __tablename__ = "address"
 
     id = db.Column(db.Integer, primary_key=True, autoincrement=True, nullable=False)
@@ -14,8 +15,8 @@ class Address(db.Model):
     number = db.Column(db.String(255))
     complement = db.Column(db.String(255))
 
-    student_id = db.Column(db.Integer, db.ForeignKey("students.id"))
-    institute_id = db.Column(db.Integer, db.ForeignKey("institutes.id"))
+    student_id = db.Column(db.Integer, db.ForeignKey("students.id", ondelete="CASCADE"), index=True)
+    institute_id = db.Column(db.Integer, db.ForeignKey("institutes.id", ondelete="CASCADE"), index=True)
 
     student = db.relationship("Student", back_populates="address")
     institute = db.relationship("Institute", back_populates="address")
@@ -1,14 +1,15 @@
 from .. import db
+from .versioned import Versioned
 
 
-class Document(db.Model):
+class Document(Versioned, db.Model):
     __tablename__ = "documents"
 
     id = db.Column(db.Integer, primary_key=True, autoincrement=True, nullable=False)
     title = db.Column(db.String(100))
     key = db.Column(db.String(100))
 
-    student_id = db.Column(db.Integer, db.ForeignKey("students.id"), nullable=False)
+    student_id = db.Column(db.Integer, db.ForeignKey("students.id", ondelete="CASCADE"), nullable=False, index=True)
 
     student = db.relationship(
         "Student", back_populates="document", lazy=True, uselist=False)
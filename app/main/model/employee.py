@@ -1,11 +1,13 @@
 from .. import db
+from .versioned import Versioned
 
 
-class Employee(db.Model):
+class Employee(Versioned, db.Model):
     __tablename__="employees"
+    __table_args__ = (db.Index("ix_employees_institute_id_id", "institute_id", "id"),)
     id = db.Column(db.Integer, primary_key=True, autoincrement=True, nullable=False)
-    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
-    institute_id = db.Column(db.Integer, db.ForeignKey('institutes.id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), nullable=False, index=True)
+    institute_id = db.Column(db.Integer, db.ForeignKey('institutes.id', ondelete='CASCADE'), nullable=False)
     role = db.Column(db.String(80))
 
     user = db.relationship("User", back_populates="employee", uselist=False, lazy=True)
@@ -1,7 +1,7 @@
 from .. import db
-from ..model.user import Profile
+from .versioned import Versioned
 
-class Institute(db.Model):
+class Institute(Versioned, db.Model):
     __tablename__ = "institutes"
 
     id = db.Column(db.Integer,
@@ -12,11 +12,20 @@ class Institute(db.Model):
     trading_name = db.Column(db.String(80), nullable=False)
     corporate_name = db.Column(db.String(80), nullable=False)
 
-    address = db.relationship("Address", back_populates="institute", cascade="all,delete", uselist=False)
-    employees = db.relationship("Employee", back_populates="institute", cascade="all,delete")
-    students = db.relationship("Student", back_populates="institute", cascade="all,delete")
-
+    address = db.relationship("Address", back_populates="institute", cascade="all,delete", uselist=False, passive_deletes=True)
+    employees = db.relationship("Employee", back_populates="institute", cascade="all,delete", order_by="Employee.id", passive_deletes=True)
+    students = db.relationship("Student", back_populates="institute", cascade="all,delete", passive_deletes=True)
+    # The user of the first employee with an admin profile, found by SQL so a page of institutes loads them in one query
+    admin_user = db.relationship(
+        "User",
+        secondary="employees",
+        primaryjoin="Institute.id == Employee.institute_id",
+        secondaryjoin="and_(Employee.user_id == User.id, User.profile.in_(['INSTITUTE', 'OWNER']))",
+        order_by="Employee.id",
+        uselist=False,
+        viewonly=True,
+    )
 
     @property
     def get_admin_employee(self):
-        return next(filter(lambda usr: usr.user.profile.value in (Profile.INSTITUTE.value, Profile.OWNER.value), self.employees))
+        return self.admin_user.employee
@@ -1,4 +1,5 @@
 from .. import db
+from .versioned import Versioned
 
 import enum
 
@@ -15,18 +16,19 @@ class Gender(enum.Enum):
         return self.value
 
 
-class Student(db.Model):
+class Student(Versioned, db.Model):
     __tablename__ = "students"
+    __table_args__ = (db.Index("ix_students_institute_id_id", "institute_id", "id"),)
 
     id = db.Column(db.Integer, primary_key=True, autoincrement=True, nullable=False)
-    birthday_date = db.Column(db.Date, nullable=False)
-    gender = db.Column(db.Enum(Gender), nullable=False)
+    birthday_date = db.Column(db.Date, nullable=False, index=True)
+    gender = db.Column(db.Enum(Gender), nullable=False, index=True)
     disabled_person = db.Column(db.Boolean, nullable=False, default=False)
 
-    user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
-    institute_id = db.Column(db.Integer, db.ForeignKey("institutes.id"), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    institute_id = db.Column(db.Integer, db.ForeignKey("institutes.id", ondelete="CASCADE"), nullable=False)
 
     user = db.relationship("User", back_populates="student", cascade="all,delete", uselist=False)
-    address = db.relationship("Address", back_populates="student", cascade="all,delete,delete-orphan", uselist=False)
-    document = db.relationship("Document", back_populates="student", cascade="all,delete,delete-orphan", uselist=False)
+    address = db.relationship("Address", back_populates="student", cascade="all,delete,delete-orphan", uselist=False, passive_deletes=True)
+    document = db.relationship("Document", back_populates="student", cascade="all,delete,delete-orphan", uselist=False, passive_deletes=True)
     institute = db.relationship("Institute", back_populates="students")
\ No newline at end of file
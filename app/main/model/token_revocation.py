@@ -0,0 +1,16 @@
+from datetime import datetime
+
+from .. import db
+
+
+class TokenRevocation(db.Model):
+    __tablename__ = "token_revocations"
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True, nullable=False)
+    # Either one token, by its jti, or every token of a user issued before not_before
+    jti = db.Column(db.String(32), index=True)
+    user_id = db.Column(db.Integer, index=True)
+    not_before = db.Column(db.DateTime)
+    # When the revoked tokens have all expired and the row can be dropped
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
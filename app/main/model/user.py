@@ -1,4 +1,5 @@
 from .. import db
+from .versioned import Versioned
 
 import enum
 
@@ -13,7 +14,7 @@ class Profile(enum.Enum):
     def __str__(self) -> str:
         return self.value
 
-class User(db.Model):
+class User(Versioned, db.Model):
     __tablename__ = "users"
 
     id = db.Column(db.Integer, primary_key=True, autoincrement=True, nullable=False)
@@ -23,7 +24,8 @@ class User(db.Model):
     phone_number = db.Column(db.String(11), nullable=False)
     token = db.Column(db.String)
     activation_status = db.Column(db.Boolean, nullable=False, default=False)
-    profile = db.Column(db.Enum(Profile), nullable=False)
+    profile = db.Column(db.Enum(Profile), nullable=False, index=True)
+    last_login_at = db.Column(db.DateTime)
 
-    student = db.relationship("Student", back_populates="user", cascade="all,delete", lazy=True, uselist=False)
-    employee = db.relationship("Employee", back_populates="user", uselist=False, lazy=True, cascade="all,delete")
+    student = db.relationship("Student", back_populates="user", cascade="all,delete", lazy=True, uselist=False, passive_deletes=True)
+    employee = db.relationship("Employee", back_populates="user", uselist=False, lazy=True, cascade="all,delete", passive_deletes=True)
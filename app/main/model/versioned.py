@@ -0,0 +1,19 @@
+from datetime import datetime
+
+from sqlalchemy import literal_column
+
+from .. import db
+
+
+class Versioned:
+    """
+    Row version and last modification time of a model.
+
+    ``version`` is incremented by the database in every ``UPDATE`` the ORM
+    issues, and ``updated_at`` is set to the time of the change. Together they
+    validate conditional requests without loading the rows. Concurrent changes
+    are not detected: the last writer wins.
+    """
+
+    version = db.Column(db.Integer, nullable=False, default=1, onupdate=literal_column("version") + 1)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -1,24 +1,21 @@
 from .. import db
-from ..config import app_config, Config
+from ..config import app_config
 from ..util.api_error import APIError
 from ..model import User
-from ..util.auth_utils import generate_auth_token
-
-from datetime import timedelta
-from itsdangerous import (
-    URLSafeTimedSerializer,
-    BadData,
-    SignatureExpired,
-    BadTimeSignature,
-    BadSignature,
-    BadHeader,
-)
+from ..util.auth_utils import decode_auth_token, generate_auth_token
+from ..util.revocation import revocations
+from ..util.write_behind import WriteBehindBuffer
+from .token_service import ACTIVATION, find_token_user
+
+from datetime import datetime, timedelta
 import bcrypt
 from typing import Dict, Any, Union
 
 
 _jwt_exp = app_config.JWT_EXP
-_activation_token_exp = app_config.ACTIVATION_EXP_DAYS
+_persist_login_token = app_config.PERSIST_LOGIN_TOKEN
+
+last_logins = WriteBehindBuffer(User.__table__.c.last_login_at, app_config.LAST_LOGIN_FLUSH_INTERVAL)
 
 
 def generate_hashed_password(password: str) -> str:
@@ -52,6 +49,10 @@ def check_password(password: str, hashed_password: str) -> bool:
 def login(user_login: Dict[str, Any]) -> Dict[str, Union[str, User]]:
     """Process the user login.
 
+    Only reads the database: the login time is buffered in ``last_logins`` and
+    written with others every ``LAST_LOGIN_FLUSH_INTERVAL`` seconds. The token is
+    stored in ``user.token``, in a write transaction, only with ``PERSIST_LOGIN_TOKEN``.
+
     Args:
         user_login (dict): User login data containing email and password.
 
@@ -68,71 +69,41 @@ def login(user_login: Dict[str, Any]) -> Dict[str, Union[str, User]]:
         user_pwd = user.password
         if check_password(login_pwd, user_pwd):
             jwt_token = generate_auth_token(timedelta(hours=_jwt_exp), user.id)
-            user.token = jwt_token
-            db.session.commit()
+            if _persist_login_token:
+                user.token = jwt_token
+                db.session.commit()
+            last_logins.add(user.id, datetime.utcnow())
             return dict(token=jwt_token, user=user)
     raise APIError("Incorrect User or Password", code=401, api_code="FAILED_LOGIN")
 
 
-def generate_email_validation_token(email: str) -> str:
-    """Generate token for email validation.
+def logout(auth_token: str) -> None:
+    """Revoke a login token.
 
     Args:
-        email (str): Email to be encoded into the token.
+        auth_token (str): The token to revoke.
 
-    Returns:
-        str: Generated token for email validation.
+    Raises:
+        APIError: If the token is expired, invalid or already revoked.
     """
-    serializer = URLSafeTimedSerializer(Config.SECRET_KEY)
-    return serializer.dumps(email, salt="email-confirm")
-
-
-def decode_email_validation_token(token: str) -> str:
-    """Decode the email validation token.
-
-    Args:
-        token (str): Token to be decoded.
+    revocations.revoke_token(db.session, decode_auth_token(auth_token))
+    db.session.commit()
 
-    Returns:
-        str: Decoded email from the token.
 
-    Raises:
-        APIError: If the token is invalid or expired.
-    """
-    serializer = URLSafeTimedSerializer(Config.SECRET_KEY)
-    try:
-        decoded_token = serializer.loads(
-            token,
-            salt="email-confirm",
-            max_age=timedelta(days=_activation_token_exp).total_seconds(),
-        )
-    except (
-        SignatureExpired,
-        BadData,
-        BadTimeSignature,
-        BadSignature,
-        BadHeader,
-    ) as e:
-        raise APIError("Invalid token to decode. Maybe expired.", code=400, api_code="FAILED_DECODE") from e
-
-    return decoded_token
-
-
-def validate_email(token: str) -> None:
+def validate_email(token: str, purpose: str = ACTIVATION) -> None:
     """Validate the email token.
 
     Args:
         token (str): Token to be validated.
+        purpose (str, optional): The flow the token was generated for. Defaults to ``ACTIVATION``.
 
     Raises:
         APIError: If the user doesn't exist.
     """
-    decoded_token = decode_email_validation_token(token)
-    if User.query.filter_by(email=decoded_token).first() is None:
+    if find_token_user(purpose, token) is None:
         raise APIError("User doesn't exist.", code=404, api_code="USER_NOT_FOUND")
 
 
-
 def activate_user(data: dict, token: str) -> None:
     """Activate the user's account.
 
@@ -143,8 +114,7 @@ def activate_user(data: dict, token: str) -> None:
     Raises:
         APIError: If the user with the email doesn't exist, or if the user is already active.
     """
-    email = decode_email_validation_token(token)
-    user = User.query.filter_by(email=email).first()
+    user = find_token_user(ACTIVATION, token)
 
     if user is None:
         raise APIError("User with this email doesn't exist.", code=404, api_code="EMAIL_NOT_FOUND")
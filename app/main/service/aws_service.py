@@ -1,11 +1,30 @@
-from ..config import StagingConfig
+from ..config import StagingConfig, app_config
 from ..util.api_error import APIError
+from ..util.local_storage import LocalStorage
+import boto3
 from botocore.exceptions import ClientError
 
 bucket_name = StagingConfig.AWS_S3_BUCKET
 s3_client = StagingConfig.S3
 s3_client_client = StagingConfig.CLIENT
 
+if app_config.LOCAL_STORAGE_PATH:
+    s3_client = s3_client_client = LocalStorage(app_config.LOCAL_STORAGE_PATH)
+
+
+def reset_clients() -> None:
+    """Build new S3 clients, in a worker forked from a preloaded app: boto3 clients must not be shared between processes."""
+    global s3_client, s3_client_client
+    if app_config.LOCAL_STORAGE_PATH:
+        return
+    session = boto3.session.Session(
+        aws_access_key_id=StagingConfig.AWS_ACCESS_KEY_ID,
+        aws_secret_access_key=StagingConfig.AWS_SECRET_ACCESS_KEY,
+        region_name=StagingConfig.AWS_S3_REGION,
+    )
+    s3_client = session.resource("s3")
+    s3_client_client = session.client("s3")
+
 
 def is_allowed_file(filename: str, allowed_extensions: set[str]) -> bool:
     """Check if the file extension is allowed.
@@ -2,10 +2,12 @@ from .. import db
 from ..util.api_error import APIError
 from ..service.aws_service import upload_file_to_s3, view_file_from_s3, delete_file_from_s3
 from ..service.email_service import send_email
-from ..model import User, Document
-from ..util.pagination_utils import paginate, get_document_filters
+from ..model import User, Document, Student
+from ..util.pagination_utils import paginate_rows, get_document_filters
 from ..util.document_validation_utils import validate_document
 
+from sqlalchemy import select
+
 
 def upload_document_file(id: int, file, allowed_extensions: set[str]) -> str:
     """Upload a document file to Amazon S3 bucket.
@@ -203,6 +205,23 @@ def get_document(user: User):
     )
 
 
+def get_document_version(user: User):
+    """Get the version of a student's document, for conditional requests.
+
+    Args:
+        user (User): User object.
+
+    Returns:
+        Row: The id, version and modification time of the document, or None if there is none.
+    """
+    statement = (
+        select(Document.id, Document.version.label("document_version"), Document.updated_at.label("document_updated_at"))
+        .join(Student, Student.id == Document.student_id)
+        .where(Student.user_id == user.id)
+    )
+    return db.session.execute(statement).first()
+
+
 def delete_document(user: User, is_update=False):
     """Delete a document.
 
@@ -235,7 +254,7 @@ def get_all_documents(user: User):
     """
     documents_filter = get_document_filters()
 
-    return paginate(
+    return paginate_rows(
         Document,
         filter=documents_filter
     )
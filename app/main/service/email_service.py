@@ -35,3 +35,26 @@ def send_email(
             mail.send(msg)
             return
         Thread(target=send).start()
+
+
+def send_emails(messages: list, template_name: str, message_subject: str):
+    """Send emails asynchronously, all through a single SMTP connection.
+
+    Args:
+        messages (list[tuple[str, dict]]): Recipient email address and template context of each email.
+        template_name (str): Name of the email template.
+        message_subject (str): Subject of the emails.
+    """
+    msgs = [
+        Message(subject=message_subject, recipients=[email], html=render_template(template_name, **context))
+        for email, context in messages
+    ]
+
+    if msgs and current_app.config['ENV'] != 'testing':
+        app = current_app._get_current_object()
+
+        def send():
+            with app.app_context(), mail.connect() as connection:
+                for msg in msgs:
+                    connection.send(msg)
+        Thread(target=send).start()
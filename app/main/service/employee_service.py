@@ -1,10 +1,17 @@
 from .. import db
 from ..util.api_error import APIError
 from ..model import Employee, User
+from ..model.user import Profile
 from ..util.pagination_utils import paginate, get_user_filters
 from ..service.user_service import delete_user
+from ..util.cache_utils import mark_changed
+from ..util.revocation import revocations
+from sqlalchemy import bindparam, delete, select, update
+from sqlalchemy.orm import joinedload
 from sqlalchemy.sql import text
 
+BATCH_MAX_IDS = 1000
+
 
 def save_employee(user: User, institute, role=None) -> Employee:
     """
@@ -28,6 +35,40 @@ def save_employee(user: User, institute, role=None) -> Employee:
     return employee
 
 
+def _employee_not_found() -> APIError:
+    return APIError("Employee doesn't exist.", code=404, api_code="EMPLOYEE_NOT_FOUND")
+
+
+def _institute_admin() -> APIError:
+    return APIError(
+        "Institute admins can't be deleted in a batch.",
+        code=409,
+        api_code="EMPLOYEE_IS_INSTITUTE_ADMIN",
+        info="Delete them with DELETE /api/employee/<id>",
+    )
+
+
+def _find_employee(institute_id: int, user_id: int) -> Employee:
+    # A single indexed row, with its user, instead of the whole staff of the institute
+    return Employee.query.options(joinedload(Employee.user)).filter_by(institute_id=institute_id, user_id=user_id).first()
+
+
+def _employee_user_ids(institute_id: int, ids) -> set:
+    # The requested user ids that are employees of the institute
+    statement = select(Employee.user_id).where(Employee.institute_id == institute_id, Employee.user_id.in_(set(ids)))
+    return set(db.session.execute(statement).scalars())
+
+
+def _check_batch_size(ids: list):
+    if len(ids) > BATCH_MAX_IDS:
+        raise APIError("Too many employee IDs", code=400, api_code="INVALID_DATA", info=f"At most {BATCH_MAX_IDS} ids per request")
+
+
+def _batch_results(ids: list, done: set, errors: dict = {}) -> list:
+    not_found = _employee_not_found().to_dict()
+    return [{"id": id} if id in done else {"id": id, "error": errors.get(id, not_found)} for id in ids]
+
+
 def update_employee(user: User, data, id) -> User:
     """
     Update employee details.
@@ -40,13 +81,52 @@ def update_employee(user: User, data, id) -> User:
     Returns:
         User: The updated user object.
     """
-    employee = next((emp for emp in user.employee.institute.employees if emp.user_id == id), None)
-    if employee:
+    if employee := _find_employee(user.employee.institute_id, id):
         for attribute, new_value in data.items():
             setattr(employee.user, attribute, new_value)
         db.session.commit()
         return employee.user
-    raise APIError("Employee doesn't exist.", code=404, api_code="EMPLOYEE_NOT_FOUND")
+    raise _employee_not_found()
+
+
+def update_employees(user: User, items: list) -> list:
+    """
+    Update the details of many employees of the user's institute.
+
+    The employees are checked with one query and updated with one ``executemany``
+    ``UPDATE``, without loading them into the session.
+
+    Args:
+        user (User): User object representing the current user.
+        items (list[dict]): The ``id`` of each employee with its new ``name`` and ``phone_number``.
+
+    Returns:
+        list[dict]: One result per item, in request order, with the ``id`` and the
+        ``error`` ``update_employee`` would raise, if any.
+
+    Raises:
+        APIError: If more than ``BATCH_MAX_IDS`` employees are given.
+    """
+    ids = [item["id"] for item in items]
+    _check_batch_size(ids)
+
+    institute_id = user.employee.institute_id
+    found = _employee_user_ids(institute_id, ids) if ids else set()
+    if rows := [
+        {"user_id": item["id"], "new_name": item["name"], "new_phone_number": item["phone_number"]}
+        for item in items
+        if item["id"] in found
+    ]:
+        users = User.__table__
+        statement = (
+            update(users)
+            .where(users.c.id == bindparam("user_id"))
+            .values(name=bindparam("new_name"), phone_number=bindparam("new_phone_number"), version=users.c.version + 1)
+        )
+        db.session.execute(statement, rows)
+        mark_changed(db.session, {institute_id})
+        db.session.commit()
+    return _batch_results(ids, found)
 
 
 def get_employees(user: User):
@@ -72,8 +152,47 @@ def delete_employee(user: User, id):
         user (User): User object representing the current user.
         id: ID of the employee to be deleted.
     """
-    employee = next((emp for emp in user.employee.institute.employees if emp.user_id == id and emp.user_id != user.id), None)
-    if employee:
+    if id != user.id and (employee := _find_employee(user.employee.institute_id, id)):
         delete_user(employee.user)
         return
-    raise APIError("Employee doesn't exist.", code=404, api_code="EMPLOYEE_NOT_FOUND")
+    raise _employee_not_found()
+
+
+def delete_employees(user: User, ids: list) -> list:
+    """
+    Delete many employees of the user's institute.
+
+    Their users are deleted with one ``DELETE``, the database cascading to the
+    employees, and their login tokens are revoked. The current user is never deleted,
+    and neither are the institute admins, since ``delete_employee`` also deletes the
+    data of the institute with them.
+
+    Args:
+        user (User): User object representing the current user.
+        ids (list[int]): The IDs of the employees to delete.
+
+    Returns:
+        list[dict]: One result per ID, in request order, with the ``id`` and the
+        ``error`` ``delete_employee`` would raise, if any.
+
+    Raises:
+        APIError: If more than ``BATCH_MAX_IDS`` IDs are given.
+    """
+    _check_batch_size(ids)
+
+    institute_id = user.employee.institute_id
+    statement = (
+        select(User.id, User.profile)
+        .join(Employee, Employee.user_id == User.id)
+        .where(Employee.institute_id == institute_id, User.id.in_(set(ids) - {user.id}))
+    )
+    profiles = dict(db.session.execute(statement).all()) if ids else {}
+    admins = {id for id, profile in profiles.items() if profile == Profile.INSTITUTE}
+    found = set(profiles) - admins
+    if found:
+        users = User.__table__
+        db.session.execute(delete(users).where(users.c.id.in_(found)))
+        revocations.revoke_users(db.session, found)
+        mark_changed(db.session, {institute_id})
+        db.session.commit()
+    return _batch_results(ids, found, dict.fromkeys(admins, _institute_admin().to_dict()))
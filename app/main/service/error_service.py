@@ -1,5 +1,5 @@
 from ..model import Error
-from ..util.pagination_utils import get_error_filters, paginate
+from ..util.pagination_utils import get_error_filters, paginate_rows
 
 
 def get_filtered_errors():
@@ -10,4 +10,4 @@ def get_filtered_errors():
         Pagination: Paginated list of Error objects.
     """
     errors_filter = get_error_filters()
-    return paginate(table=Error, filter=errors_filter)
+    return paginate_rows(table=Error, filter=errors_filter)
@@ -0,0 +1,61 @@
+from .. import db
+from ..util.single_flight import single_flight
+
+from http import HTTPStatus
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+
+
+def pool_status() -> dict:
+    """
+    Get the state of the connection pool of this worker.
+
+    Returns:
+        dict: The class of the pool and, for sized pools, its size and connections
+        checked in, checked out and in overflow.
+    """
+    pool = db.engine.pool
+    status = {"kind": type(pool).__name__}
+    for key, method in (("size", "size"), ("checked_in", "checkedin"), ("checked_out", "checkedout"), ("overflow", "overflow")):
+        if hasattr(pool, method):
+            status[key] = getattr(pool, method)()
+    return status
+
+
+def coalescing_status() -> list:
+    """
+    Get the requests coalesced by this worker since it started.
+
+    Returns:
+        list: The executed and coalesced requests of each endpoint.
+    """
+    stats = single_flight.stats()
+    return [{"endpoint": endpoint, **stats[endpoint]} for endpoint in sorted(stats)]
+
+
+def liveness() -> dict:
+    """
+    Tell that the worker answers requests, without touching the database.
+
+    Returns:
+        dict: The status.
+    """
+    return {"status": "ok"}
+
+
+def readiness() -> tuple:
+    """
+    Check that the worker can reach the database.
+
+    Returns:
+        tuple: The status, database check, pool state and coalesced requests,
+        with 200 if the database answered or 503 otherwise.
+    """
+    try:
+        with db.engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+    except SQLAlchemyError as error:
+        status, database, code = "unavailable", type(error).__name__, HTTPStatus.SERVICE_UNAVAILABLE
+    else:
+        status, database, code = "ok", "ok", HTTPStatus.OK
+    return {"status": status, "database": database, "pool": pool_status(), "coalescing": coalescing_status()}, code
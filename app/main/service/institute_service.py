@@ -1,13 +1,20 @@
 from .. import db
 from ..util.api_error import APIError
-from ..model import User, Address, Institute
+from ..model import User, Address, Employee, Institute
+from ..model.user import Profile
 from ..util.pagination_utils import paginate, get_institute_filters
 from ..service.user_service import save_new_user
-from ..service.email_service import send_email
-from ..service.employee_service import save_employee
-from ..service.auth_service import generate_email_validation_token
+from ..service.email_service import send_email, send_emails
+from ..service.job_service import delete_institute_data
+from ..service.token_service import ACTIVATION, STUDENT_INVITE, generate_token, generate_user_token
 from ..util.auth_utils import _INSTITUTE
+from ..util.import_utils import chunked, read_records
+from ..util.patterns import email_pattern
 from pycpfcnpj.cpfcnpj import validate
+from sqlalchemy import select
+from sqlalchemy.orm import aliased
+
+INVITE_CHUNK_SIZE = 500
 
 
 def save_new_institute(data):
@@ -40,10 +47,19 @@ def save_new_institute(data):
         **data,
         address=Address(**address_dict),
     )
-    new_user = save_new_user(user_dict, skip_commit=True)
-    employee = save_employee(new_user, institute, role)
-    db.session.add(employee)
+    new_user = save_new_user(user_dict, False, skip_commit=True)
+    db.session.add(Employee(user=new_user, institute=institute, role=role))
+    # Flushed first so the activation token can carry the id of the user
+    db.session.flush()
+    token = generate_user_token(ACTIVATION, new_user)
     db.session.commit()
+
+    send_email(
+        email=user_dict["email"],
+        template_name="USER_ACTIVATION.html",
+        message_subject="Token User Activation",
+        token_user_activation=token,
+    )
     return institute
 
 
@@ -61,15 +77,17 @@ def invite_employee(data: dict, user):
     institute = user.employee.institute
     role = data.pop("role")
     user = save_new_user(data, False, skip_commit=True)
-    employee = save_employee(user, institute, role)
-    db.session.add(employee)
+    db.session.add(Employee(user=user, institute=institute, role=role))
+    # Flushed first so the activation token can carry the id of the user
+    db.session.flush()
+    token = generate_user_token(ACTIVATION, user)
     db.session.commit()
 
     send_email(
         email=data["email"],
         template_name="EMPLOYEE_ACTIVATION.html",
         message_subject="Token Employee Activation",
-        token_employee_activation=f"{generate_email_validation_token(data['email'])}",
+        token_employee_activation=token,
     )
     data["role"] = role
     return data
@@ -100,12 +118,62 @@ def invite_student(data: dict, user):
         email=data["email"],
         template_name="STUDENT_VALIDATION.html",
         message_subject="Token Student Validation",
-        token_student_validation=generate_email_validation_token([data["email"], user.email]),
+        token_student_validation=generate_token(STUDENT_INVITE, email=data["email"], inviter_id=user.id),
     )
 
     return data
 
 
+def invite_students(file, user) -> dict:
+    """
+    Invite the students listed in an uploaded CSV or NDJSON file.
+
+    The file is read in chunks of ``INVITE_CHUNK_SIZE`` rows. The existing users of
+    a chunk are found with a single ``IN`` query, and every invitation is sent
+    through one SMTP connection once the file is processed.
+
+    Args:
+        file (FileStorage): CSV file with an ``email`` column, or NDJSON file of ``{"email": ...}`` objects.
+        user: The user sending the invitations.
+
+    Raises:
+        APIError: If there is no file, the CSV has no ``email`` column or a line cannot be read.
+
+    Returns:
+        dict: The number of invited and failed rows, and the status of each row.
+    """
+    results = []
+    invitations = []
+    seen = set()
+    for chunk in chunked(read_records(file, columns=("email",)), INVITE_CHUNK_SIZE):
+        candidates = {}
+        for row, record in chunk:
+            email = record.get("email") if record else None
+            result = {"row": row, "email": email if isinstance(email, str) else None}
+            results.append(result)
+            if not isinstance(email, str) or len(email) > 128 or not email_pattern.match(email):
+                result["status"] = "INVALID_EMAIL"
+            elif email in seen:
+                result["status"] = "DUPLICATE_EMAIL"
+            else:
+                seen.add(email)
+                candidates[email] = result
+
+        existing = dict(
+            db.session.query(User.email, User.activation_status).filter(User.email.in_(list(candidates)))
+        ) if candidates else {}
+        for email, result in candidates.items():
+            if email in existing:
+                result["status"] = "USER_ALREADY_ACTIVE" if existing[email] else "USER_ALREADY_EXISTS"
+            else:
+                result["status"] = "INVITED"
+                token = generate_token(STUDENT_INVITE, email=email, inviter_id=user.id)
+                invitations.append((email, {"token_student_validation": token}))
+
+    send_emails(invitations, template_name="STUDENT_VALIDATION.html", message_subject="Token Student Validation")
+    return {"invited": len(invitations), "failed": len(results) - len(invitations), "results": results}
+
+
 def update_institute(data: dict, user: User) -> Institute:
     """
     Update an existing institute.
@@ -132,13 +200,15 @@ def update_institute(data: dict, user: User) -> Institute:
 
 def delete_institute(user: User):
     """
-    Delete an institute.
+    Delete an institute, in the background when it has many students.
 
     Args:
         user (User): User requesting the deletion.
+
+    Returns:
+        Job: The purge job, or None if the institute was deleted.
     """
-    db.session.delete(user.employee.institute)
-    db.session.commit()
+    return delete_institute_data(user.employee.institute_id, user.id)
 
 
 def get_all_institutes():
@@ -149,7 +219,13 @@ def get_all_institutes():
         Pagination: Paginated list of Institute objects.
     """
     institutes_filter = get_institute_filters()
-    return paginate(Institute, Address, filter=institutes_filter)
+    return paginate(
+        Institute,
+        Address,
+        filter=institutes_filter,
+        relationships=["address", "admin_user"],
+        field_attributes={"institute_admin": "admin_user"},
+    )
 
 
 def find_institute_by(**institute_attr) -> Institute:
@@ -180,3 +256,46 @@ def institute_info(user: User):
         Institute: The institute information.
     """
     return user.employee.institute
+
+
+def get_institute_version(user: User):
+    """
+    Get the versions of the rows of an institute's information, for conditional requests.
+
+    The institute, its address and the user of its admin employee, chosen like
+    ``Institute.admin_user`` does, are read in a single query.
+
+    Args:
+        user (User): User associated with the institute.
+
+    Returns:
+        Row: The versions and modification times, or None if the user has no institute.
+    """
+    admin_employee, admin_user, admin = aliased(Employee), aliased(User), aliased(User)
+    admin_id = (
+        select(admin_employee.user_id)
+        .join(admin_user, admin_user.id == admin_employee.user_id)
+        .where(admin_employee.institute_id == Institute.id, admin_user.profile.in_((Profile.INSTITUTE, Profile.OWNER)))
+        .order_by(admin_employee.id)
+        .limit(1)
+        .scalar_subquery()
+    )
+    statement = (
+        select(
+            Institute.id.label("institute_id"),
+            Institute.version.label("institute_version"),
+            Institute.updated_at.label("institute_updated_at"),
+            Address.id.label("address_id"),
+            Address.version.label("address_version"),
+            Address.updated_at.label("address_updated_at"),
+            admin.id.label("admin_id"),
+            admin.version.label("admin_version"),
+            admin.updated_at.label("admin_updated_at"),
+        )
+        .select_from(Employee)
+        .join(Institute, Institute.id == Employee.institute_id)
+        .outerjoin(Address, Address.institute_id == Institute.id)
+        .outerjoin(admin, admin.id == admin_id)
+        .where(Employee.user_id == user.id)
+    )
+    return db.session.execute(statement).first()
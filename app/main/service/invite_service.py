@@ -1,7 +1,7 @@
 from .. import db
 from ..model import User
 from ..util.api_error import APIError
-from ..service.auth_service import generate_email_validation_token
+from ..service.token_service import ACTIVATION, STUDENT_INVITE, generate_token, generate_user_token
 from ..service.email_service import send_email
 from ..service.user_service import save_new_user
 from ..service.employee_service import save_employee
@@ -29,7 +29,7 @@ def invite_employee(data: dict, user):
         email=data["email"],
         template_name="EMPLOYEE_ACTIVATION.html",
         message_subject="Token Employee Activation",
-        token_employee_activation=f"{generate_email_validation_token(data['email'])}",
+        token_employee_activation=generate_user_token(ACTIVATION, user),
     )
     data["role"] = role
     return data
@@ -60,7 +60,7 @@ def invite_student(data: dict, user):
         email=data["email"],
         template_name="STUDENT_VALIDATION.html",
         message_subject="Token Student Validation",
-        token_student_validation=generate_email_validation_token([data["email"], user.email]),
+        token_student_validation=generate_token(STUDENT_INVITE, email=data["email"], inviter_id=user.id),
     )
 
     return data
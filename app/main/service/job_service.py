@@ -0,0 +1,196 @@
+from .. import db
+from ..model import Institute, Job, Student, User
+from ..model.job import JobStatus
+from ..util.api_error import APIError
+from ..util.background import run_in_background
+from ..util.cache_utils import mark_changed
+from ..util.revocation import revocations
+from .token_service import JOB, decode_token, generate_token
+
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import delete, func, select, update
+
+PURGE_INSTITUTE = "PURGE_INSTITUTE"
+PURGE_CHUNK_SIZE = 1000
+
+
+def get_job(job_id: str, user: User) -> Job:
+    """
+    Get a job started by a user.
+
+    Args:
+        job_id (str): The id of the job.
+        user (User): The user requesting the job.
+
+    Returns:
+        Job: The job.
+    Raises:
+        APIError: If the job does not exist or was started by another user.
+    """
+    if job := Job.query.filter_by(id=job_id, user_id=user.id).first():
+        return job
+    raise APIError("Job doesn't exist.", code=404, api_code="JOB_NOT_FOUND")
+
+
+def generate_job_token(job: Job) -> str:
+    """
+    Generate a token reading a job without logging in.
+
+    Given to the users who cannot poll their job with a login token, like an
+    institute admin whose user is deleted with the institute.
+
+    Args:
+        job (Job): The job.
+
+    Returns:
+        str: The token.
+    """
+    return generate_token(JOB, id=job.id)
+
+
+def get_job_by_token(token: str) -> Job:
+    """
+    Get the job of a token of ``generate_job_token``.
+
+    Args:
+        token (str): The token.
+
+    Returns:
+        Job: The job.
+    Raises:
+        APIError: If the token is invalid or expired, or the job does not exist.
+    """
+    if job := db.session.get(Job, decode_token(JOB, token)["id"]):
+        return job
+    raise APIError("Job doesn't exist.", code=404, api_code="JOB_NOT_FOUND")
+
+
+def _delete_student_users(institute_id: int, limit: int) -> int:
+    # ON DELETE CASCADE removes the students of the users, with their addresses and documents
+    users = User.__table__
+    user_ids = select(Student.user_id).where(Student.institute_id == institute_id).limit(limit)
+    return db.session.execute(delete(users).where(users.c.id.in_(user_ids))).rowcount
+
+
+def purge_institute(institute_id: int, job_id: str = None, chunk_size: int = PURGE_CHUNK_SIZE) -> int:
+    """
+    Delete an institute and everything it owns.
+
+    The users of its students are deleted ``chunk_size`` at a time, each chunk in
+    its own transaction, and the database cascades to the students, their
+    addresses and documents. The institute is deleted last, cascading to its
+    employees and address. The users of the employees are kept. Every chunk
+    records the progress of the job, so a job resumed after its process died
+    goes on from there.
+
+    Args:
+        institute_id (int): The id of the institute.
+        job_id (str, optional): The job recording the progress. Defaults to None.
+        chunk_size (int, optional): Students deleted per transaction. Defaults to ``PURGE_CHUNK_SIZE``.
+
+    Returns:
+        int: The number of deleted students.
+    """
+    job = db.session.get(Job, job_id) if job_id else None
+    if job:
+        job.status = JobStatus.RUNNING
+        job.updated_at = datetime.utcnow()
+        db.session.commit()
+
+    processed = job.processed if job else 0
+    try:
+        while deleted := _delete_student_users(institute_id, chunk_size):
+            processed += deleted
+            mark_changed(db.session, {institute_id})
+            if job:
+                job.processed = processed
+                job.updated_at = datetime.utcnow()
+            db.session.commit()
+
+        institutes = Institute.__table__
+        db.session.execute(delete(institutes).where(institutes.c.id == institute_id))
+        mark_changed(db.session, {institute_id})
+        if job:
+            job.status = JobStatus.DONE
+        db.session.commit()
+    except Exception as error:
+        db.session.rollback()
+        if job:
+            job.status = JobStatus.FAILED
+            job.error = str(error)
+            db.session.commit()
+        raise
+    return processed
+
+
+def _claim_stale_job(job: Job) -> bool:
+    # A job left pending or running by a process that died stops progressing: the first
+    # request seeing it stale takes it over, comparing updated_at so only one request does
+    timeout = timedelta(seconds=current_app.config.get("JOB_STALE_TIMEOUT", 300))
+    if job.updated_at > datetime.utcnow() - timeout:
+        return False
+    claimed = db.session.execute(
+        update(Job)
+        .where(Job.id == job.id, Job.updated_at == job.updated_at)
+        .values(updated_at=datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    )
+    return claimed.rowcount == 1
+
+
+def _delete_user(user: User) -> None:
+    user_id = user.id
+    db.session.delete(user)
+    revocations.revoke_user(db.session, user_id)
+
+
+def delete_institute_data(institute_id: int, user_id: int, deleted_user: User = None) -> Job:
+    """
+    Purge an institute, during the request when it is small or in the background otherwise.
+
+    Institutes with up to ``INSTITUTE_PURGE_THRESHOLD`` students are purged right
+    away. Larger ones get a job, run by the background worker, so the request
+    does not hold a web worker for the whole deletion. A purge already pending or
+    running is returned instead of starting another one, unless it made no
+    progress for ``JOB_STALE_TIMEOUT`` seconds: its process died, and it is
+    resumed.
+
+    Args:
+        institute_id (int): The id of the institute.
+        user_id (int): The id of the user requesting the deletion.
+        deleted_user (User, optional): A user deleted with the institute, with their
+            login tokens revoked: after the purge when it runs during the request,
+            otherwise in the transaction creating the job. Defaults to None.
+
+    Returns:
+        Job: The purge job, or None if the institute is already deleted.
+    """
+    students = db.session.execute(
+        select(func.count()).select_from(Student).where(Student.institute_id == institute_id)
+    ).scalar()
+    if students <= current_app.config.get("INSTITUTE_PURGE_THRESHOLD", 1000):
+        purge_institute(institute_id)
+        if deleted_user is not None:
+            _delete_user(deleted_user)
+            db.session.commit()
+        return None
+
+    job = Job.query.filter(
+        Job.kind == PURGE_INSTITUTE,
+        Job.target_id == institute_id,
+        Job.status.in_((JobStatus.PENDING, JobStatus.RUNNING)),
+    ).first()
+    if job is None:
+        job = Job(kind=PURGE_INSTITUTE, user_id=user_id, target_id=institute_id, total=students)
+        db.session.add(job)
+        start = True
+    else:
+        start = _claim_stale_job(job)
+
+    if deleted_user is not None:
+        _delete_user(deleted_user)
+    db.session.commit()
+    if start:
+        run_in_background(purge_institute, institute_id, job.id)
+    return job
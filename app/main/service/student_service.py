@@ -1,13 +1,28 @@
 from .. import db
 from ..util.api_error import APIError
-from ..model import User, Address, Student, Institute
+from ..model import User, Address, Document, Student, Institute
+from ..model.student import Gender
+from ..model.user import Profile
 from ..service.user_service import save_new_user, update_user
-from ..service.auth_service import decode_email_validation_token
-from ..util.pagination_utils import paginate, get_student_filters
-from ..util.auth_utils import _STUDENT, _INSTITUTE
+from ..service.token_service import ACTIVATION, STUDENT_INVITE, decode_token, generate_token
+from ..service.email_service import send_emails
+from ..util.cache_utils import mark_changed
+from ..util.import_utils import chunked, read_records
+from ..util.pagination_utils import paginate_rows, get_student_filters
+from ..util.patterns import email_pattern
+from ..util.row_utils import columns_tree, row_query
+from ..util.auth_utils import _STUDENT
 
 from datetime import datetime
 
+from flask_restx.inputs import boolean
+from sqlalchemy import insert, select
+from sqlalchemy.orm import joinedload
+
+IMPORT_CHUNK_SIZE = 1000
+BATCH_MAX_IDS = 1000
+_ADDRESS_COLUMNS = ("postal_code", "country", "state", "city", "neighborhood", "street", "number", "complement")
+
 
 def save_new_student(data: dict, token: str) -> Student:
     """
@@ -20,14 +35,15 @@ def save_new_student(data: dict, token: str) -> Student:
     Returns:
         Student: The newly created student.
     """
-    student_email, institute_email = decode_email_validation_token(token)
+    claims = decode_token(STUDENT_INVITE, token)
+    student_email = claims["email"]
 
     address_data = data.pop("address")
     user_data = data.pop("user")
     user_data["email"] = student_email
 
-    institute_user = User.query.filter_by(email=institute_email, profile=_INSTITUTE).first()
-    if not institute_user:
+    institute_user = db.session.get(User, claims["inviter_id"])
+    if not institute_user or institute_user.profile != Profile.INSTITUTE:
         raise APIError("Institute user not found or invalid profile.", code=404, api_code="INSTITUTE_USER_NOT_FOUND")
 
     if User.query.filter_by(email=student_email).first():
@@ -59,6 +75,171 @@ def save(data: Student) -> None:
     db.session.commit()
 
 
+def import_students(records, institute_id: int, validator, send_activation: bool = True, start_chunk: int = 1):
+    """
+    Register students in bulk, one transaction per chunk of ``IMPORT_CHUNK_SIZE`` rows.
+
+    Rows are validated like ``save_new_student`` payloads: the ``StudentPost`` schema,
+    a valid and unused email and a ``YYYY-MM-DD`` birthday date. The valid rows of a
+    chunk are inserted with one ``executemany`` ``INSERT`` per table (batched into
+    multi-row ``VALUES ... RETURNING`` by psycopg2, with one ``SELECT`` of the new ids
+    on drivers without executemany ``RETURNING``), then committed. Rows whose
+    email already exists are reported and skipped, so an interrupted import can be run
+    again from the failed chunk (or from the start) without duplicating students.
+
+    Args:
+        records: Iterable of ``(row, record)``, as read by ``read_records``. A record is a
+            ``StudentPost`` payload with an ``email``, or None when the row could not be read.
+        institute_id (int): Institute of the students.
+        validator: Function returning the ``(key, message)`` errors of a ``StudentPost`` payload, or None.
+        send_activation (bool, optional): Whether to send the user activation emails. Defaults to True.
+        start_chunk (int, optional): First chunk to import, from 1, to resume an import. Defaults to 1.
+
+    Yields:
+        dict: The report of each imported chunk: its number, rows, imported count and row errors.
+    """
+    seen = set()
+    for number, chunk in enumerate(chunked(records, IMPORT_CHUNK_SIZE), 1):
+        if number < start_chunk:
+            continue
+
+        errors = []
+        valid = {}
+        for row, record in chunk:
+            email = record.get("email") if record else None
+            if (error := _import_row_error(record, validator, seen)) is not None:
+                errors.append({"row": row, "email": email if isinstance(email, str) else None, **error})
+            else:
+                valid[record["email"]] = (row, record)
+
+        existing = db.session.execute(select(User.email).where(User.email.in_(list(valid)))).scalars() if valid else ()
+        for email in existing:
+            row, _ = valid.pop(email)
+            errors.append({"row": row, "email": email, "status": "USER_ALREADY_EXISTS"})
+
+        user_ids = _insert_students(list(valid.values()), institute_id)
+        db.session.commit()
+
+        if send_activation:
+            send_emails(
+                [
+                    (email, {"token_user_activation": generate_token(ACTIVATION, id=user_id, email=email)})
+                    for email, user_id in user_ids.items()
+                ],
+                template_name="USER_ACTIVATION.html",
+                message_subject="Token User Activation",
+            )
+        yield {
+            "chunk": number,
+            "first_row": chunk[0][0],
+            "last_row": chunk[-1][0],
+            "imported": len(valid),
+            "errors": sorted(errors, key=lambda error: error["row"]),
+        }
+
+
+def import_students_file(file, user: User, validator, start_chunk: int = 1) -> dict:
+    """
+    Register the students of an uploaded CSV or NDJSON file in the user's institute.
+
+    Args:
+        file (FileStorage): The file, read by ``read_records``.
+        user (User): The institute admin importing the students.
+        validator: Function returning the ``(key, message)`` errors of a ``StudentPost`` payload, or None.
+        start_chunk (int, optional): First chunk to import, from 1. Defaults to 1.
+
+    Raises:
+        APIError: If there is no file, the CSV has no ``email`` column or a line cannot be read.
+
+    Returns:
+        dict: The imported and failed counts, the imported chunks and the row errors.
+    """
+    records = read_records(file, columns=("email",))
+    chunks = list(import_students(records, user.employee.institute_id, validator, start_chunk=start_chunk))
+    errors = [error for chunk in chunks for error in chunk.pop("errors")]
+    return {
+        "imported": sum(chunk["imported"] for chunk in chunks),
+        "failed": len(errors),
+        "chunks": chunks,
+        "errors": errors,
+    }
+
+
+def _import_row_error(record: dict, validator, seen: set):
+    if record is None:
+        return {"status": "INVALID_ROW"}
+
+    email = record.pop("email", None)
+    if not isinstance(email, str) or len(email) > 128 or not email_pattern.match(email):
+        return {"status": "INVALID_EMAIL"}
+    if email in seen:
+        return {"status": "DUPLICATE_EMAIL"}
+
+    if isinstance(record.get("disabled_person"), str):
+        try:
+            record["disabled_person"] = boolean(record["disabled_person"])
+        except ValueError:
+            pass
+    if found := validator(record):
+        return {"status": "INVALID_DATA", "errors": dict(found)}
+    try:
+        record["birthday_date"] = datetime.strptime(record["birthday_date"], r"%Y-%m-%d").date()
+    except ValueError:
+        return {"status": "INVALID_DATA", "errors": {"birthday_date": f"{record['birthday_date']!r} is not a valid date"}}
+
+    seen.add(email)
+    record["email"] = email
+    return None
+
+
+def _insert_returning(table, rows: list, key: str) -> dict:
+    # Inserts the rows and maps their ``key`` column to the generated ids
+    if not rows:
+        return {}
+    statement = insert(table)
+    if db.engine.dialect.insert_executemany_returning:
+        return dict(db.session.execute(statement.returning(table.c[key], table.c.id), rows).all())
+    db.session.execute(statement, rows)
+    keys = [row[key] for row in rows]
+    return dict(db.session.execute(select(table.c[key], table.c.id).where(table.c[key].in_(keys))).all())
+
+
+def _insert_students(rows: list, institute_id: int) -> dict:
+    # Returns the ids of the inserted users by email
+    user_ids = _insert_returning(User.__table__, [
+        {
+            "email": record["email"],
+            "name": record["user"]["name"],
+            "phone_number": record["user"]["phone_number"],
+            "profile": _STUDENT,
+            "activation_status": False,
+        }
+        for _, record in rows
+    ], "email")
+
+    student_ids = _insert_returning(Student.__table__, [
+        {
+            "user_id": user_ids[record["email"]],
+            "institute_id": institute_id,
+            "gender": Gender[record["gender"]],
+            "disabled_person": record["disabled_person"],
+            "birthday_date": record["birthday_date"],
+        }
+        for _, record in rows
+    ], "user_id")
+
+    mark_changed(db.session, {institute_id})
+    if rows:
+        db.session.execute(insert(Address.__table__), [
+            {
+                **{column: record["address"].get(column) for column in _ADDRESS_COLUMNS},
+                "student_id": student_ids[user_ids[record["email"]]],
+            }
+            for _, record in rows
+        ])
+    return user_ids
+
+
 def update_student(data: dict, user: User) -> Student:
     """
     Update a student's information.
@@ -96,15 +277,54 @@ def delete(user: User) -> None:
     db.session.commit()
 
 
-def get_all_students() -> paginate:
+def get_all_students() -> paginate_rows:
     """
     Get all students.
 
     Returns:
-        paginate: Paginated results of students.
+        paginate_rows: Paginated results of students.
     """
     students_filter = get_student_filters()
-    return paginate(table=Student, filter=students_filter)
+    return paginate_rows(
+        table=Student,
+        filter=students_filter,
+        ordenable_columns=["id", "birthday_date", "gender"],
+        relationships=["user", "address", "document"],
+        field_attributes={"document_id": "document.id"},
+        filter_relationships={"name": "user", "state": "address", "city": "address"},
+    )
+
+
+def stream_institute_students(user: User):
+    """
+    Stream the students of the user's institute, in id order.
+
+    The students are read with a server-side cursor as read-only rows, so the
+    memory used does not depend on the size of the roster. The filters of
+    ``get_all_students`` apply.
+
+    Args:
+        user (User): The institute admin or employee exporting the roster.
+
+    Returns:
+        Iterator: The student rows, fetched while iterated.
+    """
+    students_filter = get_student_filters()
+    students_filter.append(Student.institute_id == user.employee.institute_id)
+    query = row_query(Student, columns_tree(["user", "address", "document"]))
+    return query.stream(db.session, students_filter, [Student.id])
+
+
+def _student_forbidden() -> APIError:
+    return APIError("Student cannot access another student's data.", code=403, api_code="STUDENT_FORBIDDEN_ACCESS")
+
+
+def _student_not_found() -> APIError:
+    return APIError(
+        "Student ID does not exist. Please use an existing ID.",
+        code=404,
+        api_code="STUDENT_NOT_FOUND",
+    )
 
 
 def find_student_by_id(id: int, user: User) -> Student:
@@ -121,15 +341,105 @@ def find_student_by_id(id: int, user: User) -> Student:
     Raises:
         APIError: If the student is not found or the user does not have access.
     """
-    if user.profile.value == "student" and user.student.id != id:
-        raise APIError("Student cannot access another student's data.", code=403, api_code="STUDENT_FORBIDDEN_ACCESS")
+    if user.profile.value == _STUDENT and user.student.id != id:
+        raise _student_forbidden()
 
     student = Student.query.filter_by(id=id).first()
     if not student:
-        raise APIError(
-            "Student ID does not exist. Please use an existing ID.",
-            code=404,
-            api_code="STUDENT_NOT_FOUND",
-        )
+        raise _student_not_found()
 
     return student
+
+
+def get_student_version(id: int, user: User):
+    """
+    Get the versions of the rows of a student's representation, for conditional requests.
+
+    Args:
+        id (int): The ID of the student.
+        user (User): The user making the request.
+
+    Returns:
+        Row: The versions and modification times of the student, its user and its address,
+        and the id of its document, or None if the student is not found or not accessible.
+    """
+    statement = (
+        select(
+            Student.version.label("student_version"),
+            Student.updated_at.label("student_updated_at"),
+            User.version.label("user_version"),
+            User.updated_at.label("user_updated_at"),
+            Address.id.label("address_id"),
+            Address.version.label("address_version"),
+            Address.updated_at.label("address_updated_at"),
+            Document.id.label("document_id"),
+        )
+        .join(User, User.id == Student.user_id)
+        .outerjoin(Address, Address.student_id == Student.id)
+        .outerjoin(Document, Document.student_id == Student.id)
+        .where(Student.id == id)
+    )
+    if user.profile.value == _STUDENT:
+        statement = statement.where(Student.user_id == user.id)
+    return db.session.execute(statement).first()
+
+
+def parse_student_ids(value: str) -> list:
+    """
+    Parse a comma separated list of student IDs.
+
+    Args:
+        value (str): The IDs, like ``1,2,3``.
+
+    Returns:
+        list[int]: The IDs.
+
+    Raises:
+        APIError: If one of the IDs is not an integer.
+    """
+    try:
+        return [int(id) for id in value.split(",") if id.strip()]
+    except ValueError:
+        raise APIError("Invalid student ID", code=400, api_code="INVALID_DATA", info="ids must be comma separated integers")
+
+
+def find_students_by_ids(ids: list, user: User) -> list:
+    """
+    Find students by ID, in bulk.
+
+    Applies the access rules of ``find_student_by_id`` to every ID and loads the
+    allowed students, with their user, address and document, in a single query.
+
+    Args:
+        ids (list[int]): The IDs of the students to find, at most ``BATCH_MAX_IDS``.
+        user (User): The user making the request.
+
+    Returns:
+        list[dict]: One result per requested ID, in request order, with the ``id`` and
+        either the ``student`` or the ``error`` that ``find_student_by_id`` would raise.
+
+    Raises:
+        APIError: If more than ``BATCH_MAX_IDS`` IDs are requested.
+    """
+    if len(ids) > BATCH_MAX_IDS:
+        raise APIError("Too many student IDs", code=400, api_code="INVALID_DATA", info=f"At most {BATCH_MAX_IDS} ids per request")
+
+    own_id = user.student.id if user.profile.value == _STUDENT else None
+    allowed = {id for id in ids if own_id is None or id == own_id}
+    students = {}
+    if allowed:
+        query = Student.query.options(
+            joinedload(Student.user), joinedload(Student.address), joinedload(Student.document)
+        ).filter(Student.id.in_(allowed))
+        students = {student.id: student for student in query}
+
+    forbidden, not_found = _student_forbidden().to_dict(), _student_not_found().to_dict()
+    results = []
+    for id in ids:
+        if id not in allowed:
+            results.append({"id": id, "error": forbidden})
+        elif (student := students.get(id)) is None:
+            results.append({"id": id, "error": not_found})
+        else:
+            results.append({"id": id, "student": student})
+    return results
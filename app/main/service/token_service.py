@@ -0,0 +1,101 @@
+from .. import db
+from ..config import app_config
+from ..model import User
+from ..util.api_error import APIError
+
+from datetime import timedelta
+from itsdangerous import BadData, URLSafeTimedSerializer
+
+ACTIVATION = "activation"
+PASSWORD_RESET = "password-reset"
+STUDENT_INVITE = "student-invite"
+JOB = "job"
+PURPOSES = (ACTIVATION, PASSWORD_RESET, STUDENT_INVITE, JOB)
+
+_token_max_age = timedelta(days=app_config.ACTIVATION_EXP_DAYS).total_seconds()
+
+
+def keyring(config) -> list:
+    """
+    Get the keys signing the tokens.
+
+    Args:
+        config: The configuration, with ``SECRET_KEY`` and ``SECRET_KEY_FALLBACKS``.
+
+    Returns:
+        list[str]: The keys, oldest first. Tokens are signed with the last one and
+        accepted when signed with any of them, so a key can be rotated by moving it
+        to ``SECRET_KEY_FALLBACKS`` until the tokens it signed have expired.
+    """
+    return [*config.SECRET_KEY_FALLBACKS, config.SECRET_KEY]
+
+
+# One serializer per purpose, salted with it, so a token is only accepted by its own flow
+_serializers = {purpose: URLSafeTimedSerializer(keyring(app_config), salt=purpose) for purpose in PURPOSES}
+
+
+def generate_token(purpose: str, **claims) -> str:
+    """
+    Generate a signed, timestamped token for an email flow or a job.
+
+    Args:
+        purpose (str): ``ACTIVATION``, ``PASSWORD_RESET``, ``STUDENT_INVITE`` or ``JOB``.
+        **claims: The JSON compatible data of the token.
+
+    Returns:
+        str: The token.
+    """
+    return _serializers[purpose].dumps(claims)
+
+
+def decode_token(purpose: str, token: str) -> dict:
+    """
+    Decode a token generated for a purpose.
+
+    Args:
+        purpose (str): The purpose the token must have been generated for.
+        token (str): The token.
+
+    Returns:
+        dict: The claims of the token.
+
+    Raises:
+        APIError: If the token is invalid, expired or generated for another purpose.
+    """
+    try:
+        return _serializers[purpose].loads(token, max_age=_token_max_age)
+    except BadData as e:
+        raise APIError("Invalid token to decode. Maybe expired.", code=400, api_code="FAILED_DECODE") from e
+
+
+def generate_user_token(purpose: str, user: User) -> str:
+    """
+    Generate a token identifying a user, for activation or password reset.
+
+    Args:
+        purpose (str): ``ACTIVATION`` or ``PASSWORD_RESET``.
+        user (User): The user, with an id.
+
+    Returns:
+        str: The token.
+    """
+    return generate_token(purpose, id=user.id, email=user.email)
+
+
+def find_token_user(purpose: str, token: str) -> User:
+    """
+    Get the user identified by a token, by primary key.
+
+    Args:
+        purpose (str): The purpose the token must have been generated for.
+        token (str): A token of ``generate_user_token``.
+
+    Returns:
+        User: The user, or None if it no longer exists or its email changed.
+
+    Raises:
+        APIError: If the token is invalid, expired or generated for another purpose.
+    """
+    claims = decode_token(purpose, token)
+    user = db.session.get(User, claims["id"])
+    return user if user is not None and user.email == claims["email"] else None
@@ -1,9 +1,14 @@
 from .. import db
 from ..util.api_error import APIError
-from ..model import User
+from ..model import Address, Job, Student, User
 from ..service.email_service import send_email
-from .auth_service import check_password, generate_hashed_password, generate_email_validation_token, decode_email_validation_token
+from ..service.job_service import delete_institute_data
+from .auth_service import check_password, generate_hashed_password
+from .token_service import ACTIVATION, PASSWORD_RESET, find_token_user, generate_user_token
 from ..util.auth_utils import _INSTITUTE, _EMPLOYEE
+from ..util.revocation import revocations
+
+from sqlalchemy import select
 
 
 def find_user_by(**user_attr) -> User:
@@ -29,6 +34,31 @@ def find_user_by(**user_attr) -> User:
     )
 
 
+def get_user_version(user: User):
+    """
+    Get the versions of the rows of a user's representation, for conditional requests.
+
+    Args:
+        user (User): The user.
+
+    Returns:
+        Row: The versions and modification times of the user and of its student address, if any.
+    """
+    statement = (
+        select(
+            User.version.label("user_version"),
+            User.updated_at.label("user_updated_at"),
+            Address.id.label("address_id"),
+            Address.version.label("address_version"),
+            Address.updated_at.label("address_updated_at"),
+        )
+        .outerjoin(Student, Student.user_id == User.id)
+        .outerjoin(Address, Address.student_id == Student.id)
+        .where(User.id == user.id)
+    )
+    return db.session.execute(statement).first()
+
+
 def save_new_user(data: dict, send_default_mail: bool = True, skip_commit: bool = False) -> User:
     """
     Save a new user.
@@ -58,11 +88,15 @@ def save_new_user(data: dict, send_default_mail: bool = True, skip_commit: bool
         db.session.commit()
 
     if send_default_mail:
+        if user.id is None:
+            # The activation token carries the id of the user
+            db.session.add(user)
+            db.session.flush()
         send_email(
             email=data["email"],
             template_name="USER_ACTIVATION.html",
             message_subject="Token User Activation",
-            token_user_activation=f"{generate_email_validation_token(data['email'])}",
+            token_user_activation=generate_user_token(ACTIVATION, user),
         )
     return user
 
@@ -86,7 +120,7 @@ def update_user(data: dict, user: User) -> User:
 
 def update_user_password(data: dict, user: User):
     """
-    Update a user's password.
+    Update a user's password, revoking the login tokens issued until now.
 
     Args:
         data (dict): Password update data.
@@ -103,12 +137,13 @@ def update_user_password(data: dict, user: User):
         raise APIError("New password cannot be the same as the current one", code=422, api_code="WRONG_NEW_PASSWORD")
 
     user.password = generate_hashed_password(data["new_password"])
+    revocations.revoke_user(db.session, user.id)
     db.session.commit()
 
 
 def deactivate_user(id: int, user_agent: User):
     """
-    Deactivate a user.
+    Deactivate a user, revoking their login tokens.
 
     Args:
         id (int): The ID of the user to deactivate.
@@ -124,20 +159,30 @@ def deactivate_user(id: int, user_agent: User):
     ):
         raise APIError("Cannot deactivate user.", code=403, api_code="DEACTIVATE_FORBIDDEN")
     user_target.activation_status = False
+    revocations.revoke_user(db.session, user_target.id)
     db.session.commit()
 
 
-def delete_user(user: User):
+def delete_user(user: User) -> Job:
     """
     Delete a user from the database.
 
+    The institute of an ``INSTITUTE`` user is deleted with it, in the background
+    when it has many students. The user is only deleted once the purge is
+    certain to happen, so a failure leaves the institute with its admin.
+
     Args:
         user (User): The user to delete.
+
+    Returns:
+        Job: The job purging the institute, or None if nothing is left to delete.
     """
     if user.profile.value == _INSTITUTE:
-        db.session.delete(user.employee.institute)
+        return delete_institute_data(user.employee.institute_id, user.id, deleted_user=user)
     db.session.delete(user)
+    revocations.revoke_user(db.session, user.id)
     db.session.commit()
+    return None
 
 
 def generate_reset_password_email(data: dict):
@@ -147,18 +192,18 @@ def generate_reset_password_email(data: dict):
     Args:
         data (dict): Email data.
     """
-    if find_user_by(email=data["email"]):
+    if user := find_user_by(email=data["email"]):
         send_email(
             email=data["email"],
             template_name="RESET_PASSWORD.html",
             message_subject="Token Reset Password",
-            token_reset_password=f"{generate_email_validation_token(data['email'])}",
+            token_reset_password=generate_user_token(PASSWORD_RESET, user),
         )
 
 
 def reset_password(data: dict, token: str):
     """
-    Reset a user's password.
+    Reset a user's password, revoking the login tokens issued until now.
 
     Args:
         data (dict): Password reset data.
@@ -167,10 +212,12 @@ def reset_password(data: dict, token: str):
     Raises:
         APIError: If the password doesn't match or the user is not found.
     """
-    email = decode_email_validation_token(token)
+    user = find_token_user(PASSWORD_RESET, token)
     if data["password"] != data["confirm_password"]:
         raise APIError("Password doesn't match", code=400, api_code="WRONG_CONFIRM_PASSWORD")
+    if user is None:
+        raise APIError("User doesn't exist.", code=404, api_code="USER_NOT_FOUND")
 
-    user = find_user_by(email=email)
     user.password = generate_hashed_password(data["password"])
+    revocations.revoke_user(db.session, user.id)
     db.session.commit()
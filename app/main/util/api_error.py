@@ -57,6 +57,21 @@ class APIError(HTTPException):
             error.info = self.info
 
         return error
+
+    def to_dict(self) -> dict:
+        """
+        Convert the APIError to a dictionary with the fields of an Error, without using the database.
+
+        Returns:
+            dict: The code, name, api_code, description and info of the error.
+        """
+        return {
+            "code": self.code,
+            "name": self.name,
+            "api_code": self.api_code,
+            "description": self.description,
+            "info": self.info,
+        }
     
     @classmethod
     def add_errors_to_database(cls):
@@ -107,6 +122,16 @@ API_ERROR_CODES = {
         "name": "Bad Request",
         "description": "Invalid Data.",
     },
+    "INVALID_FIELDS": {
+        "code": 400,
+        "name": "Bad Request",
+        "description": "Invalid fields to select",
+    },
+    "INVALID_IDEMPOTENCY_KEY": {
+        "code": 400,
+        "name": "Bad Request",
+        "description": "The Idempotency-Key header must have 1 to 255 characters",
+    },
     "FAILED_LOGIN": {
         "code": 401,
         "name": "Unauthorized",
@@ -122,6 +147,11 @@ API_ERROR_CODES = {
         "name": "Unauthorized",
         "description": "Invalid login Token",
     },
+    "REVOKED_TOKEN": {
+        "code": 401,
+        "name": "Unauthorized",
+        "description": "Revoked login Token",
+    },
     "TOKEN_IS_MISSING": {
         "code": 401,
         "name": "Unauthorized",
@@ -217,6 +247,11 @@ API_ERROR_CODES = {
         "name": "Not Found",
         "description": "Employee doesn't exist.",
     },
+    "JOB_NOT_FOUND": {
+        "code": 404,
+        "name": "Not Found",
+        "description": "Job doesn't exist.",
+    },
     "FILE_NOT_INDEXED": {
         "code": 406,
         "name": "Not Acceptable",
@@ -247,6 +282,11 @@ API_ERROR_CODES = {
         "name": "Conflict",
         "description": "User already exists",
     },
+    "EMPLOYEE_IS_INSTITUTE_ADMIN": {
+        "code": 409,
+        "name": "Conflict",
+        "description": "Institute admins are deleted one at a time, with the data of their institute.",
+    },
     "USER_IS_ACTIVE": {
         "code": 409,
         "name": "Conflict",
@@ -267,4 +307,19 @@ API_ERROR_CODES = {
         "name": "Unprocessable Entity",
         "description": "New password cannot be the same as the current one",
     },
+    "IDEMPOTENCY_KEY_REUSED": {
+        "code": 422,
+        "name": "Unprocessable Entity",
+        "description": "The Idempotency-Key was already used for a different request",
+    },
+    "TOO_MANY_REQUESTS": {
+        "code": 429,
+        "name": "Too Many Requests",
+        "description": "Too many requests",
+    },
+    "DATABASE_BUSY": {
+        "code": 503,
+        "name": "Service Unavailable",
+        "description": "No database connection available",
+    },
 }
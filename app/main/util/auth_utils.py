@@ -1,9 +1,11 @@
 from ..config import app_config
 from .api_error import APIError
+from .revocation import revocations
 from ..model.user import Profile, User
 
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from functools import wraps
+from uuid import uuid4
 
 import jwt
 from flask import request
@@ -27,6 +29,9 @@ def generate_auth_token(expiration_time: timedelta, subject: int) -> str:
     """
     Generates an authentication token.
 
+    The token has a unique ``jti`` and an ``iat`` with sub-second precision, so it
+    can be revoked alone or with every token of its subject issued before a moment.
+
     Args:
         expiration_time (timedelta): The expiration time for the token.
         subject (int): The subject of the token.
@@ -34,10 +39,12 @@ def generate_auth_token(expiration_time: timedelta, subject: int) -> str:
     Returns:
         str: The generated authentication token.
     """
+    issued_at = datetime.now(timezone.utc)
     payload_data = {
-        "exp": datetime.utcnow() + expiration_time,
-        "iat": datetime.utcnow(),
+        "exp": issued_at + expiration_time,
+        "iat": issued_at.timestamp(),
         "sub": subject,
+        "jti": uuid4().hex,
     }
     return jwt.encode(payload_data, _secret_key, algorithm="HS256")
 
@@ -46,18 +53,26 @@ def decode_auth_token(auth_token: str) -> "dict[str, timedelta|int]":
     """
     Decodes an authentication token.
 
+    Revocations are checked in memory, without querying the database.
+
     Args:
         auth_token (str): The authentication token to decode.
 
     Returns:
         dict[str, timedelta|int]: The decoded token data.
+
+    Raises:
+        APIError: If the token is expired, invalid or revoked.
     """
     try:
-        return jwt.decode(auth_token, _secret_key, algorithms=["HS256"])
+        payload = jwt.decode(auth_token, _secret_key, algorithms=["HS256"])
     except jwt.ExpiredSignatureError:
         raise APIError("Expired login Token.", code=401, api_code="EXPIRED_TOKEN")
     except jwt.InvalidTokenError:
         raise APIError("Invalid login Token.", code=401, api_code="INVALID_TOKEN")
+    if revocations.is_revoked(payload):
+        raise APIError("Revoked login Token.", code=401, api_code="REVOKED_TOKEN")
+    return payload
 
 
 def get_user_from_token(jwt_token: str) -> User:
@@ -0,0 +1,43 @@
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from flask import current_app
+
+from .. import db
+
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="background")
+
+
+def run_in_background(func, *args, **kwargs) -> Future:
+    """
+    Run a function in the background worker thread of the process, inside an app context.
+
+    Jobs run one at a time, in submission order, with their own database session,
+    removed once they return. Exceptions are logged, so a job must record its own
+    failure where its caller can see it.
+
+    Args:
+        func (Callable): The function to run.
+        *args: Positional arguments of the function.
+        **kwargs: Keyword arguments of the function.
+
+    Returns:
+        Future: The pending result of the function.
+    """
+    app = current_app._get_current_object()
+
+    def run():
+        with app.app_context():
+            try:
+                return func(*args, **kwargs)
+            except Exception:
+                app.logger.exception("Background job %s failed", func.__name__)
+                raise
+            finally:
+                db.session.remove()
+
+    return _executor.submit(run)
+
+
+def wait_for_background_jobs() -> None:
+    """Wait for the queued jobs to finish and stop the worker thread, before the process exits."""
+    _executor.shutdown(wait=True)
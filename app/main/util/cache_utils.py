@@ -0,0 +1,308 @@
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from functools import wraps
+from hashlib import blake2b
+from http import HTTPStatus
+from threading import Lock
+from time import monotonic
+
+import orjson
+from flask import current_app, has_app_context, request
+from flask_restx.utils import unpack
+from sqlalchemy import event, select, union
+from sqlalchemy.orm import Session
+
+from .. import db
+from ..model import Address, Document, Employee, Institute, Student, User
+from .database import REPLICA
+
+GLOBAL = "global"
+TENANT = "tenant"
+
+_EXTENSION = "response_cache"
+_CHANGED_TENANTS = "response_cache_changed_tenants"
+_GLOBAL_GENERATION = "generation:global"
+
+
+class CacheBackend(ABC):
+    """
+    Store of the cached responses and of the generation counters.
+
+    Values are JSON compatible: marshalled responses and integers.
+    """
+
+    @abstractmethod
+    def get(self, key: str):
+        """Get a value, or None if it is missing or expired."""
+
+    @abstractmethod
+    def set(self, key: str, value, timeout: int) -> None:
+        """Store a value for ``timeout`` seconds."""
+
+    @abstractmethod
+    def incr(self, key: str) -> int:
+        """Increment a counter, starting at 0, and return its new value. Counters do not expire."""
+
+
+class LocalCache(CacheBackend):
+    """
+    In-process LRU backend.
+
+    Each process has its own entries and counters, so writes made by another
+    worker are not seen: use a shared backend when running several processes.
+    """
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._counters = {}
+        self._lock = Lock()
+
+    def get(self, key: str):
+        with self._lock:
+            if key in self._counters:
+                return self._counters[key]
+            if (entry := self._entries.get(key)) is None:
+                return None
+            expires_at, value = entry
+            if expires_at < monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value, timeout: int) -> None:
+        with self._lock:
+            self._entries[key] = (monotonic() + timeout, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def incr(self, key: str) -> int:
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + 1
+            return self._counters[key]
+
+
+class RedisCache(CacheBackend):
+    """Backend shared by every process, stored in Redis. Needs the ``redis`` package."""
+
+    def __init__(self, url: str, prefix: str = "institute-api:"):
+        try:
+            import redis
+        except ImportError as error:
+            raise RuntimeError("RESPONSE_CACHE_URL needs the redis package to be installed") from error
+        self._client = redis.Redis.from_url(url)
+        self._prefix = prefix
+
+    def get(self, key: str):
+        value = self._client.get(self._prefix + key)
+        return None if value is None else orjson.loads(value)
+
+    def set(self, key: str, value, timeout: int) -> None:
+        self._client.set(self._prefix + key, orjson.dumps(value), ex=timeout)
+
+    def incr(self, key: str) -> int:
+        return self._client.incr(self._prefix + key)
+
+
+def resource_key(scope: str, kwargs: dict) -> tuple:
+    """
+    Identify the response of the current request to a list resource.
+
+    Args:
+        scope (str): ``GLOBAL`` or ``TENANT``.
+        kwargs (dict): The keyword arguments of the resource method, holding the ``user`` for ``TENANT``.
+
+    Returns:
+        tuple: The route, normalized query arguments, partial response mask, tenant
+        and database read by the request (a replica or the primary), and the tenant
+        (None for ``GLOBAL``). Requests reading from the primary, like those of a user
+        who just wrote, never share the answer of a request reading from a lagging replica.
+    """
+    tenant_id = None
+    if scope == TENANT:
+        employee = kwargs["user"].employee
+        tenant_id = employee and employee.institute_id
+    identity = (
+        request.endpoint,
+        tuple(sorted(request.args.items(multi=True))),
+        request.headers.get("X-Fields"),
+        tenant_id,
+        db.session.info.get(REPLICA) is not None,
+    )
+    return identity, tenant_id
+
+
+def _tenant_generation(tenant_id: int) -> str:
+    return f"generation:tenant:{tenant_id}"
+
+
+class ResponseCache:
+    """
+    Cache of marshalled list responses, invalidated by generation counters.
+
+    Entries are keyed by route, normalized query arguments, partial response
+    mask, tenant, database read (replica or primary) and the current generation
+    of their scope. A commit writing
+    students, users, institutes, addresses, employees or documents increments the
+    global generation and the generation of each institute it touched, so the
+    entries built before it are never read again and age out of the backend.
+
+    The backend is built on first use from the app configuration:
+    ``RESPONSE_CACHE_URL`` selects a ``RedisCache``, otherwise a ``LocalCache`` of
+    ``RESPONSE_CACHE_SIZE`` entries is used. A size of 0 disables the cache.
+    Entries expire after ``RESPONSE_CACHE_TIMEOUT`` seconds.
+    """
+
+    def backend(self) -> CacheBackend:
+        """
+        Get the backend of the current app, building it on first use.
+
+        Returns:
+            CacheBackend: The backend, or None if the cache is disabled.
+        """
+        app = current_app._get_current_object()
+        if _EXTENSION not in app.extensions:
+            if url := app.config.get("RESPONSE_CACHE_URL"):
+                app.extensions[_EXTENSION] = RedisCache(url)
+            elif size := app.config.get("RESPONSE_CACHE_SIZE", 0):
+                app.extensions[_EXTENSION] = LocalCache(size)
+            else:
+                app.extensions[_EXTENSION] = None
+        return app.extensions[_EXTENSION]
+
+    def invalidate(self, tenant_ids) -> None:
+        """
+        Increment the global generation and the generations of some tenants.
+
+        Args:
+            tenant_ids (Iterable[int]): The institutes whose data changed.
+        """
+        if (backend := self.backend()) is None:
+            return
+        backend.incr(_GLOBAL_GENERATION)
+        for tenant_id in tenant_ids:
+            backend.incr(_tenant_generation(tenant_id))
+
+    def cached(self, scope: str = GLOBAL):
+        """
+        Cache the 200 answers of a resource method.
+
+        Place it under the authentication decorator and above ``marshal_with``.
+        ``GLOBAL`` responses are the same for every tenant and are invalidated by
+        any write. ``TENANT`` responses are built from the data of the institute of
+        the ``user`` keyword argument and are only invalidated by its writes.
+
+        Args:
+            scope (str, optional): ``GLOBAL`` or ``TENANT``. Defaults to ``GLOBAL``.
+
+        Returns:
+            Callable: The decorator.
+        """
+        if scope not in (GLOBAL, TENANT):
+            raise ValueError(f"Invalid cache scope {scope!r}")
+
+        def decorator(func):
+            @wraps(func)
+            def decorated(*args, **kwargs):
+                if (backend := self.backend()) is None:
+                    return func(*args, **kwargs)
+
+                identity, tenant_id = resource_key(scope, kwargs)
+                generation = _GLOBAL_GENERATION if scope == GLOBAL else _tenant_generation(tenant_id)
+                key = "response:" + blake2b(repr((identity, backend.get(generation))).encode(), digest_size=16).hexdigest()
+                if (data := backend.get(key)) is not None:
+                    return data, HTTPStatus.OK
+
+                data, code, headers = unpack(func(*args, **kwargs))
+                if code == HTTPStatus.OK and not headers:
+                    timeout = current_app.config.get("RESPONSE_CACHE_TIMEOUT", 300)
+                    if db.session.info.get(REPLICA) is not None:
+                        # Read from a replica, so possibly stale: kept no longer than a writer is pinned to the primary
+                        timeout = min(timeout, current_app.config.get("DB_REPLICA_PIN_SECONDS", 5))
+                    backend.set(key, data, timeout)
+                return data, code, headers
+
+            return decorated
+
+        return decorator
+
+
+response_cache = ResponseCache()
+
+
+def mark_changed(session: Session, tenant_ids) -> None:
+    """
+    Invalidate the cached responses of some tenants when the session commits.
+
+    Writes made through the ORM are tracked by the flush events. Statements run
+    with ``session.execute``, like bulk inserts, must be reported with this.
+
+    Args:
+        session (Session): The session running the writes.
+        tenant_ids (Iterable[int]): The institutes whose data changed.
+    """
+    session.info.setdefault(_CHANGED_TENANTS, set()).update(tenant_ids)
+
+
+def _changed_tenants(session: Session, instances) -> set:
+    # The institutes of the written rows, looking up the ones the rows do not reference
+    tenant_ids, student_ids, user_ids = set(), set(), set()
+    for instance in instances:
+        if isinstance(instance, Institute):
+            tenant_ids.add(instance.id)
+        elif isinstance(instance, (Student, Employee)):
+            tenant_ids.add(instance.institute_id)
+        elif isinstance(instance, Address):
+            if instance.institute_id is not None:
+                tenant_ids.add(instance.institute_id)
+            else:
+                student_ids.add(instance.student_id)
+        elif isinstance(instance, Document):
+            student_ids.add(instance.student_id)
+        elif isinstance(instance, User):
+            user_ids.add(instance.id)
+
+    student_ids.discard(None)
+    user_ids.discard(None)
+    statements = []
+    if student_ids:
+        statements.append(select(Student.institute_id).where(Student.id.in_(student_ids)))
+    if user_ids:
+        statements.append(select(Student.institute_id).where(Student.user_id.in_(user_ids)))
+        statements.append(select(Employee.institute_id).where(Employee.user_id.in_(user_ids)))
+    if statements:
+        statement = union(*statements) if len(statements) > 1 else statements[0]
+        tenant_ids.update(session.connection().execute(statement).scalars())
+
+    tenant_ids.discard(None)
+    return tenant_ids
+
+
+_WATCHED = (Address, Document, Employee, Institute, Student, User)
+
+
+@event.listens_for(Session, "before_flush")
+def _track_deleted_users(session, flush_context, instances):
+    # Resolved before the flush: ON DELETE CASCADE removes the students and employees the lookup goes through
+    if users := [instance for instance in session.deleted if isinstance(instance, User)]:
+        mark_changed(session, _changed_tenants(session, users))
+
+
+@event.listens_for(Session, "after_flush")
+def _track_changes(session, flush_context):
+    deleted = (instance for instance in session.deleted if not isinstance(instance, User))
+    if written := [instance for instance in (*session.new, *session.dirty, *deleted) if isinstance(instance, _WATCHED)]:
+        mark_changed(session, _changed_tenants(session, written))
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_changes(session):
+    if (tenant_ids := session.info.pop(_CHANGED_TENANTS, None)) is not None and has_app_context():
+        response_cache.invalidate(tenant_ids)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_changes(session):
+    session.info.pop(_CHANGED_TENANTS, None)
@@ -0,0 +1,101 @@
+from datetime import timezone
+from functools import wraps
+from hashlib import blake2b
+from http import HTTPStatus
+
+from flask import Response, request
+from flask_restx.utils import unpack
+from werkzeug.http import http_date, quote_etag
+
+_TIMESTAMP_SUFFIX = "updated_at"
+_CACHE_CONTROL = "private, no-cache"
+
+
+def row_validators(row) -> tuple:
+    """
+    Split a version lookup row into the values identifying the representation and its modification time.
+
+    Args:
+        row (Row): A row whose ``*updated_at`` columns hold modification times and
+            whose other columns hold versions and ids.
+
+    Returns:
+        tuple: The versions and ids, and the latest modification time (or None).
+    """
+    versions, timestamps = [], []
+    for key, value in row._mapping.items():
+        (timestamps if key.endswith(_TIMESTAMP_SUFFIX) else versions).append(value)
+    return tuple(versions), max(filter(None, timestamps), default=None)
+
+
+def make_etag(versions: tuple, user_id: int = None) -> str:
+    """
+    Build the weak ETag of a representation.
+
+    The path, query string and ``X-Fields`` mask are part of the tag, since the
+    versions alone do not tell two resources or two projections apart.
+
+    Args:
+        versions (tuple): The versions and ids of the rows of the representation.
+        user_id (int, optional): The user the representation is built for. Defaults to None.
+
+    Returns:
+        str: The tag, without quotes.
+    """
+    key = repr((request.full_path, request.headers.get("X-Fields"), user_id, versions))
+    return blake2b(key.encode(), digest_size=12).hexdigest()
+
+
+def _not_modified(etag: str, last_modified) -> bool:
+    if request.if_none_match:
+        return request.if_none_match.contains_weak(etag)
+    if last_modified is not None and request.if_modified_since is not None:
+        return last_modified <= request.if_modified_since
+    return False
+
+
+def conditional(lookup):
+    """
+    Answer conditional GETs of a resource from its row versions.
+
+    ``lookup`` receives the keyword arguments of the decorated method (the view
+    arguments and the ``user``) and returns a row built for ``row_validators``
+    with a single indexed query, or None to let the method answer (not found,
+    forbidden, ...). A request whose ``If-None-Match`` (or, without it,
+    ``If-Modified-Since``) matches gets an empty 304 before the resource and its
+    relationships are loaded and marshalled; other answers get the ``ETag`` and
+    ``Last-Modified`` headers.
+
+    Place it under ``restrict_resource_to_profiles`` and above ``marshal_with``.
+
+    Args:
+        lookup (Callable): The version lookup of the resource.
+
+    Returns:
+        Callable: The decorator.
+    """
+    def decorator(func):
+        @wraps(func)
+        def decorated(*args, **kwargs):
+            if (row := lookup(**kwargs)) is None:
+                return func(*args, **kwargs)
+
+            versions, last_modified = row_validators(row)
+            user = kwargs.get("user")
+            etag = make_etag(versions, user and user.id)
+            validators = {"ETag": quote_etag(etag, weak=True), "Cache-Control": _CACHE_CONTROL}
+            if last_modified is not None:
+                last_modified = last_modified.replace(microsecond=0, tzinfo=timezone.utc)
+                validators["Last-Modified"] = http_date(last_modified)
+
+            if _not_modified(etag, last_modified):
+                return Response(status=HTTPStatus.NOT_MODIFIED, headers=validators)
+
+            data, code, headers = unpack(func(*args, **kwargs))
+            if code == HTTPStatus.OK:
+                headers = {**headers, **validators}
+            return data, code, headers
+
+        return decorated
+
+    return decorator
@@ -0,0 +1,82 @@
+from flask import current_app, has_app_context
+from flask_sqlalchemy import SignallingSession, SQLAlchemy
+from sqlalchemy import event, orm
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import NullPool
+from sqlalchemy.sql.dml import UpdateBase
+
+# Key of ``session.info`` holding the engine of the read replica the session reads from
+REPLICA = "read_replica"
+
+
+def engine_options(config) -> dict:
+    """
+    Build the ``SQLALCHEMY_ENGINE_OPTIONS`` of a PostgreSQL database from the ``DB_*`` settings.
+
+    Connections are named ``DB_APPLICATION_NAME`` in ``pg_stat_activity``. With
+    ``DB_PGBOUNCER`` the worker keeps no pool (``NullPool``), since PgBouncer
+    pools the server connections, and the ``DB_STATEMENT_TIMEOUT`` is set in each
+    transaction of the sessions, since PgBouncer rejects the ``options`` startup parameter.
+    psycopg2 never prepares statements on the server, so transaction pooling
+    is safe. Otherwise the worker keeps a pool of ``DB_POOL_SIZE`` connections
+    plus ``DB_MAX_OVERFLOW``, waits at most ``DB_POOL_TIMEOUT`` seconds for one,
+    and the timeout is a connection default.
+
+    Other databases, like the SQLite of the benchmarks, keep the defaults.
+
+    Args:
+        config (dict): The app configuration.
+
+    Returns:
+        dict: The engine options.
+    """
+    if not (config.get("SQLALCHEMY_DATABASE_URI") or "").startswith("postgresql"):
+        return {}
+
+    connect_args = {"application_name": config["DB_APPLICATION_NAME"]}
+    if config["DB_PGBOUNCER"]:
+        return {"poolclass": NullPool, "connect_args": connect_args}
+
+    if timeout := config["DB_STATEMENT_TIMEOUT"]:
+        connect_args["options"] = f"-c statement_timeout={timeout}"
+    return {
+        "pool_size": config["DB_POOL_SIZE"],
+        "max_overflow": config["DB_MAX_OVERFLOW"],
+        "pool_timeout": config["DB_POOL_TIMEOUT"],
+        "pool_recycle": config["DB_POOL_RECYCLE"],
+        "pool_pre_ping": config["DB_POOL_PRE_PING"],
+        "connect_args": connect_args,
+    }
+
+
+@event.listens_for(Session, "after_begin")
+def _set_statement_timeout(session, transaction, connection):
+    # Behind PgBouncer the timeout cannot be a connection default: SET LOCAL only
+    # lasts for the transaction, so it never leaks to the next client of the server connection
+    if connection.dialect.name != "postgresql" or not has_app_context():
+        return
+    config = current_app.config
+    if config.get("DB_PGBOUNCER") and (timeout := config.get("DB_STATEMENT_TIMEOUT")):
+        connection.exec_driver_sql(f"SET LOCAL statement_timeout = {int(timeout)}")
+
+
+class RoutingSession(SignallingSession):
+    """
+    Session reading from the read replica in ``info[REPLICA]``, if any.
+
+    Flushes and ``INSERT``, ``UPDATE`` and ``DELETE`` statements always go to the
+    primary, like every statement of the sessions without a replica.
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        replica = self.info.get(REPLICA)
+        if replica is not None and not self._flushing and not isinstance(clause, UpdateBase):
+            return replica
+        return super().get_bind(mapper, clause)
+
+
+class RoutingSQLAlchemy(SQLAlchemy):
+    """``SQLAlchemy`` extension whose sessions are ``RoutingSession``."""
+
+    def create_session(self, options):
+        return orm.sessionmaker(class_=RoutingSession, db=self, **options)
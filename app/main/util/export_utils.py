@@ -0,0 +1,123 @@
+import csv
+import io
+import zlib
+
+from flask import Response, stream_with_context
+from flask_restx import fields
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is an optional speedup
+    orjson = None
+    import json
+
+EXPORT_FORMATS = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+}
+
+
+def flatten(data: dict, prefix: str = "") -> dict:
+    """
+    Flatten nested dictionaries into dotted keys.
+
+    Args:
+        data (dict): The marshalled item.
+        prefix (str, optional): Prefix of the keys. Defaults to "".
+
+    Returns:
+        dict: The flat item.
+    """
+    flat = {}
+    for key, value in data.items():
+        if isinstance(value, dict):
+            flat.update(flatten(value, f"{prefix}{key}."))
+        else:
+            flat[f"{prefix}{key}"] = value
+    return flat
+
+
+def model_columns(model, prefix: str = "") -> list:
+    """
+    Get the dotted keys of the items a model marshals, as ``flatten`` names them.
+
+    Args:
+        model: The restx model.
+        prefix (str, optional): Prefix of the keys. Defaults to "".
+
+    Returns:
+        list[str]: The keys.
+    """
+    columns = []
+    for name, field in model.items():
+        if isinstance(field, fields.Nested):
+            columns.extend(model_columns(field.nested, f"{prefix}{name}."))
+        else:
+            columns.append(f"{prefix}{name}")
+    return columns
+
+
+def _csv_lines(items, columns: list, batch_size: int):
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=columns, extrasaction="ignore")
+    writer.writeheader()
+    for index, item in enumerate(items, 1):
+        writer.writerow(flatten(item))
+        if index % batch_size == 0:
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+    if data := buffer.getvalue():
+        yield data.encode()
+
+
+def _ndjson_lines(items, columns: list, batch_size: int):
+    lines = []
+    for item in items:
+        if orjson is not None:
+            lines.append(orjson.dumps(item, option=orjson.OPT_APPEND_NEWLINE))
+        else:
+            lines.append(json.dumps(item, separators=(",", ":")).encode() + b"\n")
+        if len(lines) == batch_size:
+            yield b"".join(lines)
+            lines.clear()
+    if lines:
+        yield b"".join(lines)
+
+
+def _gzip(chunks):
+    compressor = zlib.compressobj(wbits=16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        if compressed := compressor.compress(chunk):
+            yield compressed
+    yield compressor.flush()
+
+
+def stream_export(model, items, export_format: str, filename: str, compress: bool = True, batch_size: int = 500) -> Response:
+    """
+    Make a streamed response exporting marshalled items.
+
+    The items are encoded and sent ``batch_size`` at a time while they are
+    consumed, so the memory used does not grow with the number of items.
+
+    Args:
+        model: The restx model of the items, giving the CSV columns.
+        items: Iterable of items marshalled with the model, consumed while the response is sent.
+        export_format (str): One of ``EXPORT_FORMATS``.
+        filename (str): Name of the attachment, without extension.
+        compress (bool, optional): Whether to gzip the response. Defaults to True.
+        batch_size (int, optional): Items encoded per chunk. Defaults to 500.
+
+    Returns:
+        Response: The streamed response.
+    """
+    lines = _csv_lines if export_format == "csv" else _ndjson_lines
+    chunks = lines(items, model_columns(model), batch_size)
+    headers = {
+        "Content-Disposition": f'attachment; filename="{filename}.{export_format}"',
+        "Vary": "Accept-Encoding",
+    }
+    if compress:
+        chunks = _gzip(chunks)
+        headers["Content-Encoding"] = "gzip"
+    return Response(stream_with_context(chunks), mimetype=EXPORT_FORMATS[export_format], headers=headers)
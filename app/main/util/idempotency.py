@@ -0,0 +1,142 @@
+from functools import wraps
+from hashlib import blake2b
+from http import HTTPStatus
+
+from flask import current_app, request
+from flask_restx.utils import unpack
+
+from .api_error import APIError
+from .cache_utils import CacheBackend, LocalCache, RedisCache
+from .rate_limit import token_subject
+from .single_flight import SingleFlight
+
+HEADER = "Idempotency-Key"
+MAX_KEY_LENGTH = 255
+REPLAYED_HEADER = "Idempotent-Replayed"
+
+_EXTENSION = "idempotency_store"
+_FORM_MIMETYPES = ("multipart/form-data", "application/x-www-form-urlencoded")
+
+# Swagger documentation of the header, for ``api.doc(params=...)``
+idempotency_key_param = {
+    HEADER: {
+        "in": "header",
+        "type": "string",
+        "description": "Unique key of the request: a retry with the same key gets the stored response instead of running again.",
+    },
+}
+
+
+def _fingerprint() -> str:
+    # Hash of everything the request sends, so a key reused for another request is detected
+    digest = blake2b(digest_size=16)
+    digest.update(f"{request.method} {request.full_path} {request.headers.get('X-Fields')}".encode())
+    if request.mimetype in _FORM_MIMETYPES:
+        for name, value in sorted(request.form.items(multi=True)):
+            digest.update(f"{name}={value}".encode())
+        for name, file in sorted(request.files.items(multi=True), key=lambda item: item[0]):
+            digest.update(f"{name}:{file.filename}".encode())
+            while chunk := file.stream.read(1 << 16):
+                digest.update(chunk)
+            file.stream.seek(0)
+    else:
+        digest.update(request.get_data())
+    return digest.hexdigest()
+
+
+class IdempotencyStore:
+    """
+    Responses of the requests sent with an ``Idempotency-Key`` header.
+
+    Each successful response is kept as its status, marshalled data and the
+    fingerprint of the request, for ``IDEMPOTENCY_TTL`` seconds. Keys are scoped
+    to the route, path and user of the login token, so users cannot read each
+    other's responses, and a user logging in again keeps the keys. Concurrent retries in a worker wait for the first
+    one instead of running alongside it.
+
+    The backend is built on first use from the app configuration:
+    ``IDEMPOTENCY_URL`` selects a ``RedisCache``, otherwise a ``LocalCache`` of
+    ``IDEMPOTENCY_SIZE`` entries is used. A size of 0 disables the store.
+    """
+
+    def __init__(self):
+        self._running = SingleFlight()
+
+    def backend(self) -> CacheBackend:
+        """
+        Get the backend of the current app, building it on first use.
+
+        Returns:
+            CacheBackend: The backend, or None if the store is disabled.
+        """
+        app = current_app._get_current_object()
+        if _EXTENSION not in app.extensions:
+            if url := app.config.get("IDEMPOTENCY_URL"):
+                app.extensions[_EXTENSION] = RedisCache(url, prefix="institute-api:idempotency:")
+            elif size := app.config.get("IDEMPOTENCY_SIZE", 0):
+                app.extensions[_EXTENSION] = LocalCache(size)
+            else:
+                app.extensions[_EXTENSION] = None
+        return app.extensions[_EXTENSION]
+
+    def idempotent(self, func):
+        """
+        Replay the stored response of a resource method to requests repeating an ``Idempotency-Key``.
+
+        Requests without the header run as usual. Only 2xx answers are stored;
+        errors are raised again by the retries. Every answer the method did not
+        produce for the request itself, including those shared with concurrent
+        retries, has an ``Idempotent-Replayed: true`` header. Place it under the authentication
+        decorator, so replays still need a valid token, and above ``marshal_with``.
+
+        Args:
+            func (Callable): The resource method.
+
+        Returns:
+            Callable: The decorated method.
+
+        Raises:
+            APIError: If the key is too long, or was already used for a different request.
+        """
+        @wraps(func)
+        def decorated(*args, **kwargs):
+            if (key := request.headers.get(HEADER)) is None or (backend := self.backend()) is None:
+                return func(*args, **kwargs)
+            if not key or len(key) > MAX_KEY_LENGTH:
+                raise APIError(
+                    f"The {HEADER} header must have 1 to {MAX_KEY_LENGTH} characters.",
+                    code=400,
+                    api_code="INVALID_IDEMPOTENCY_KEY",
+                )
+
+            scope = (request.endpoint, request.path, token_subject(), key)
+            store_key = "idempotency:" + blake2b(repr(scope).encode(), digest_size=16).hexdigest()
+            fingerprint = _fingerprint()
+
+            # Concurrent retries get the result of the caller that ran: only that one is not a replay
+            caller = object()
+
+            def run():
+                if (stored := backend.get(store_key)) is not None:
+                    return stored, None
+                data, code, headers = unpack(func(*args, **kwargs))
+                stored = {"fingerprint": fingerprint, "status": code, "data": data}
+                if HTTPStatus.OK <= code < HTTPStatus.MULTIPLE_CHOICES:
+                    backend.set(store_key, stored, current_app.config.get("IDEMPOTENCY_TTL", 86400))
+                return {**stored, "headers": headers}, caller
+
+            stored, runner = self._running.do(store_key, run)
+            replayed = runner is not caller
+            if stored["fingerprint"] != fingerprint:
+                raise APIError(
+                    f"The {HEADER} was already used for a different request.",
+                    code=422,
+                    api_code="IDEMPOTENCY_KEY_REUSED",
+                )
+            headers = {REPLAYED_HEADER: "true"} if replayed else stored.get("headers") or {}
+            return stored["data"], stored["status"], headers
+
+        return decorated
+
+
+idempotency = IdempotencyStore()
@@ -0,0 +1,140 @@
+import csv
+import json
+from itertools import islice
+
+from werkzeug.datastructures import FileStorage
+
+from .api_error import APIError
+
+NDJSON_MIMETYPES = {"application/x-ndjson", "application/jsonl", "application/x-jsonlines"}
+NDJSON_EXTENSIONS = (".ndjson", ".jsonl")
+
+
+def chunked(iterable, size: int):
+    """
+    Split an iterable into lists of at most ``size`` items, consuming it lazily.
+
+    Args:
+        iterable: The items.
+        size (int): Maximum items per list.
+
+    Yields:
+        list: The next items.
+    """
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def unflatten(record: dict) -> dict:
+    """
+    Nest the dotted keys of a CSV record, leaving out empty values.
+
+    Args:
+        record (dict): The record, as read by ``read_records``.
+
+    Returns:
+        dict: The nested record.
+    """
+    nested = {}
+    for key, value in record.items():
+        if key is None or value == "":
+            continue
+        *parents, name = key.split(".")
+        level = nested
+        for parent in parents:
+            level = level.setdefault(parent, {})
+        level[name] = value
+    return nested
+
+
+def _conflicting_columns(fieldnames) -> tuple:
+    # A column that is also the parent of a dotted column, like "user" and "user.name", cannot be nested
+    names = set(fieldnames)
+    for name in fieldnames:
+        parents = name.split(".")[:-1]
+        for depth in range(1, len(parents) + 1):
+            if (parent := ".".join(parents[:depth])) in names:
+                return parent, name
+    return None
+
+
+def read_records(file: FileStorage, columns: tuple = ()):
+    """
+    Read the records of an uploaded CSV or NDJSON file, line by line.
+
+    NDJSON is recognized by the mimetype or the ``.ndjson``/``.jsonl``
+    extension of the file, anything else is read as CSV with a header row whose
+    dotted columns are nested by ``unflatten``.
+
+    Args:
+        file (FileStorage): The uploaded file.
+        columns (tuple, optional): Columns a CSV header must have. Defaults to ().
+
+    Yields:
+        tuple[int, dict | None]: The row number, from 1, and its record, or None when
+        the line is not a JSON object.
+
+    Raises:
+        APIError: If there is no file, the CSV header lacks one of the columns or has a
+            column that is also the parent of a dotted one, or a line is not UTF-8 or
+            not valid CSV.
+    """
+    if file is None:
+        raise APIError("No file provided", code=400, api_code="INVALID_DATA", info="Upload a CSV or NDJSON 'file'")
+
+    # Lines are decoded one at a time, so a decoding error is reported on its own row
+    lines = _decoded_lines(file.stream)
+    if file.mimetype in NDJSON_MIMETYPES or (file.filename or "").lower().endswith(NDJSON_EXTENSIONS):
+        records = _ndjson_records(lines)
+    else:
+        records = _csv_records(lines, columns)
+
+    row = 0
+    try:
+        for row, record in records:
+            yield row, record
+    except (UnicodeDecodeError, csv.Error) as error:
+        raise _unreadable(error, f"Row {row + 1}") from error
+
+
+def _decoded_lines(stream):
+    for number, line in enumerate(stream, 1):
+        yield line.decode("utf-8-sig" if number == 1 else "utf-8")
+
+
+def _unreadable(error: Exception, where: str) -> APIError:
+    reason = "not UTF-8 encoded" if isinstance(error, UnicodeDecodeError) else f"invalid CSV ({error})"
+    return APIError("Invalid file", code=400, api_code="INVALID_DATA", info=f"{where} is {reason}")
+
+
+def _csv_records(lines, columns: tuple):
+    reader = csv.DictReader(lines)
+    try:
+        fieldnames = reader.fieldnames or ()
+    except (UnicodeDecodeError, csv.Error) as error:
+        raise _unreadable(error, "The header") from error
+    if missing := [column for column in columns if column not in fieldnames]:
+        raise APIError("Invalid CSV header", code=400, api_code="INVALID_DATA", info=f"Missing columns: {', '.join(missing)}")
+    if conflict := _conflicting_columns(fieldnames):
+        raise APIError(
+            "Invalid CSV header",
+            code=400,
+            api_code="INVALID_DATA",
+            info=f"Column '{conflict[0]}' conflicts with '{conflict[1]}'",
+        )
+    for row, record in enumerate(reader, 1):
+        yield row, unflatten(record)
+
+
+def _ndjson_records(lines):
+    row = 0
+    for line in lines:
+        if not line.strip():
+            continue
+        row += 1
+        try:
+            record = json.loads(line)
+        except ValueError:
+            record = None
+        yield row, record if isinstance(record, dict) else None
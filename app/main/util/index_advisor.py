@@ -0,0 +1,153 @@
+import json
+import re
+from collections import defaultdict
+from dataclasses import dataclass, field
+
+from sqlalchemy import inspect
+
+_IDENTIFIER = r'"?(\w+)"?'
+_TABLE_REFERENCE = re.compile(rf"\b(?:FROM|JOIN|UPDATE)\s+{_IDENTIFIER}(?:\s+AS\s+{_IDENTIFIER})?", re.IGNORECASE)
+_COLUMN = rf"{_IDENTIFIER}\.{_IDENTIFIER}"
+_EQUALITY = re.compile(rf"{_COLUMN}\s*(?:=\s*(?:\?|{_COLUMN})|IN\s*\(|IS\s+NULL)", re.IGNORECASE)
+_REVERSED_EQUALITY = re.compile(rf"\?\s*=\s*{_COLUMN}")
+_RANGE = re.compile(rf"{_COLUMN}\s*(?:<=|>=|<|>|BETWEEN\b|LIKE\b)", re.IGNORECASE)
+_ORDER_BY = re.compile(r"\bORDER BY\s+(.+?)(?:\s+LIMIT\b|\s+OFFSET\b|\s+FOR UPDATE\b|$)", re.IGNORECASE)
+_CLAUSES = re.compile(r"\b(?:WHERE|ON)\s+(.+?)(?=\s+(?:LEFT OUTER JOIN|LEFT JOIN|JOIN|WHERE|GROUP BY|ORDER BY|LIMIT|UNION)\b|$)", re.IGNORECASE)
+
+
+@dataclass
+class IndexProposal:
+    """
+    An index some logged statements would use and no existing index covers.
+
+    Attributes:
+        table (str): The indexed table.
+        columns (tuple): The indexed columns, in order.
+        statements (int): How many logged statements would use it.
+        duration_ms (float): Time spent running those statements.
+        example (str): One of the statements.
+    """
+    table: str
+    columns: tuple
+    statements: int = 0
+    duration_ms: float = 0.0
+    example: str = field(default=None, repr=False)
+
+    @property
+    def name(self) -> str:
+        """str: The name of the index, following the models' ``ix_<table>_<columns>`` convention."""
+        return f"ix_{self.table}_{'_'.join(self.columns)}"
+
+    @property
+    def ddl(self) -> str:
+        """str: The statement creating the index."""
+        return f"CREATE INDEX {self.name} ON {self.table} ({', '.join(self.columns)});"
+
+
+def read_query_log(lines) -> dict:
+    """
+    Aggregate a query log written by ``QueryLog``.
+
+    Args:
+        lines (Iterable[str]): The lines of the log.
+
+    Returns:
+        dict: The number of runs and total duration in milliseconds of each normalized statement.
+    """
+    statements = defaultdict(lambda: [0, 0.0])
+    for line in lines:
+        if not line.strip():
+            continue
+        entry = json.loads(line)
+        totals = statements[entry["statement"]]
+        totals[0] += 1
+        totals[1] += entry.get("duration_ms", 0.0)
+    return {statement: tuple(totals) for statement, totals in statements.items()}
+
+
+def _lookups(statement: str) -> dict:
+    # Columns each table is searched by: equality columns, then range or ordering columns
+    aliases = {}
+    for table, alias in _TABLE_REFERENCE.findall(statement):
+        aliases[table] = table
+        if alias:
+            aliases[alias] = table
+
+    equalities, ranges = defaultdict(list), defaultdict(list)
+
+    def add(columns, alias, column):
+        if (table := aliases.get(alias)) is not None and column not in columns[table]:
+            columns[table].append(column)
+
+    for clause in _CLAUSES.findall(statement):
+        for match in _EQUALITY.finditer(clause):
+            add(equalities, match.group(1), match.group(2))
+            if match.group(3):
+                add(equalities, match.group(3), match.group(4))
+        for alias, column in _REVERSED_EQUALITY.findall(clause):
+            add(equalities, alias, column)
+        for alias, column in _RANGE.findall(clause):
+            add(ranges, alias, column)
+    if order_by := _ORDER_BY.search(statement):
+        for alias, column in re.findall(_COLUMN, order_by.group(1)):
+            add(ranges, alias, column)
+
+    return {
+        table: (tuple(sorted(equalities[table])), tuple(column for column in ranges[table] if column not in equalities[table]))
+        for table in set(equalities) | set(ranges)
+    }
+
+
+def existing_indexes(engine) -> dict:
+    """
+    List the columns of the indexes, primary keys and unique constraints of every table.
+
+    Args:
+        engine: The engine of the database.
+
+    Returns:
+        dict: The column tuples of each table.
+    """
+    inspector = inspect(engine)
+    indexes = {}
+    for table in inspector.get_table_names():
+        columns = [tuple(index["column_names"]) for index in inspector.get_indexes(table)]
+        columns += [tuple(unique["column_names"]) for unique in inspector.get_unique_constraints(table)]
+        if primary_key := inspector.get_pk_constraint(table)["constrained_columns"]:
+            columns.append(tuple(primary_key))
+        indexes[table] = columns
+    return indexes
+
+
+def _covered(equalities: tuple, ranges: tuple, indexes: list) -> bool:
+    # An index serves the lookup when it starts with one of the searched columns
+    leading = set(equalities) or {ranges[0]}
+    return any(index and index[0] in leading for index in indexes)
+
+
+def advise(statements: dict, indexes: dict) -> list:
+    """
+    Propose the indexes missing for the logged statements.
+
+    Every table a statement filters, joins or sorts on must have an index whose
+    first column is one of its equality columns (or, without any, its first range
+    or ordering column). Otherwise an index on the equality columns followed by
+    the range and ordering ones is proposed.
+
+    Args:
+        statements (dict): Runs and duration of each statement, as returned by ``read_query_log``.
+        indexes (dict): The existing index columns of each table, as returned by ``existing_indexes``.
+
+    Returns:
+        list[IndexProposal]: The proposals, the most used first.
+    """
+    proposals = {}
+    for statement, (runs, duration_ms) in statements.items():
+        for table, (equalities, ranges) in _lookups(statement).items():
+            if table not in indexes or _covered(equalities, ranges, indexes[table]):
+                continue
+            columns = equalities + ranges
+            proposal = proposals.setdefault((table, columns), IndexProposal(table, columns, example=statement))
+            proposal.statements += runs
+            proposal.duration_ms += duration_ms
+    return sorted(proposals.values(), key=lambda proposal: (-proposal.statements, -proposal.duration_ms))
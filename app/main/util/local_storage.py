@@ -0,0 +1,69 @@
+import os
+
+from botocore.exceptions import ClientError
+
+
+class LocalObject:
+    """Minimal stand-in for the object returned by ``Bucket.put_object``."""
+
+    def __init__(self, key: str):
+        self.key = key
+
+
+class LocalBucket:
+    """Minimal stand-in for a boto3 ``s3.Bucket`` resource backed by a directory."""
+
+    def __init__(self, storage: "LocalStorage", name: str):
+        self.storage = storage
+        self.name = name
+
+    def put_object(self, Key: str, Body: bytes) -> LocalObject:
+        with open(self.storage.path_for(self.name, Key), "wb") as file:
+            file.write(Body)
+        return LocalObject(Key)
+
+
+class LocalStorage:
+    """
+    Filesystem replacement for the S3 resource and client used by ``aws_service``.
+
+    It implements just the calls the service makes, with the same return shapes and
+    ``ClientError`` codes, so documents can be uploaded and retrieved without AWS
+    (benchmarks, local development).
+
+    Attributes:
+        root (str): Directory where the objects are stored, one sub-directory per bucket.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def path_for(self, bucket: str, key: str) -> str:
+        """
+        Get the file path of an object, creating the bucket directory if needed.
+
+        Args:
+            bucket (str): Bucket name.
+            key (str): Object key.
+
+        Returns:
+            str: Path of the object on disk.
+        """
+        directory = os.path.join(self.root, bucket or "default")
+        os.makedirs(directory, exist_ok=True)
+        return os.path.join(directory, os.path.basename(key))
+
+    def Bucket(self, name: str) -> LocalBucket:
+        return LocalBucket(self, name)
+
+    def get_object(self, Bucket: str, Key: str) -> dict:
+        path = self.path_for(Bucket, Key)
+        if not os.path.isfile(path):
+            raise ClientError({"Error": {"Code": "NoSuchKey", "Message": f"{Key} not found"}}, "GetObject")
+        return {"Body": open(path, "rb"), "ContentLength": os.path.getsize(path)}
+
+    def delete_object(self, Bucket: str, Key: str) -> dict:
+        path = self.path_for(Bucket, Key)
+        if os.path.isfile(path):
+            os.remove(path)
+        return {"DeleteMarker": False}
@@ -0,0 +1,373 @@
+from collections import OrderedDict
+from functools import wraps
+from itertools import count
+from threading import Lock
+
+from flask import current_app, has_app_context, has_request_context, make_response, request
+from flask_restx import fields as restx_fields, marshal
+from flask_restx.fields import get_value
+from flask_restx.inputs import boolean
+from flask_restx.marshalling import make, marshal_with as restx_marshal_with
+from flask_restx.mask import Mask, apply as apply_mask
+from flask_restx.representations import output_json as restx_output_json
+from flask_restx.utils import unpack
+
+from .api_error import APIError
+from .projection_utils import fields_tree, get_fields_parameter
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is an optional speedup
+    orjson = None
+
+_FORMAT_EXPRESSIONS = {
+    restx_fields.Raw: "{value}",
+    restx_fields.String: "str({value})",
+    restx_fields.Integer: "int({value})",
+    restx_fields.Float: "float({value})",
+    restx_fields.Boolean: "({value} if {value}.__class__ is bool else _boolean({value}))",
+}
+_INDEXABLE_TYPES = {}
+
+
+def _is_indexable(obj) -> bool:
+    """
+    Tell whether restx would read the fields of ``obj`` by key rather than by attribute.
+
+    The answer is cached per class, so plain objects such as SQLAlchemy models
+    only pay for the check once.
+    """
+    cls = obj.__class__
+    if (indexable := _INDEXABLE_TYPES.get(cls)) is None:
+        indexable = _INDEXABLE_TYPES[cls] = hasattr(cls, "__iter__") and not hasattr(cls, "strip")
+    return indexable
+
+
+class SerializerCompiler:
+    """
+    Turns restx models into plain Python functions producing the same output as ``marshal``.
+
+    ``marshal`` deep-copies the model and walks its fields for every object it
+    serializes. The compiler resolves each model once, including clones,
+    inherited and nested models, and generates a function with the lookups and
+    formatting of every field inlined. Fields it does not know how to inline
+    fall back to their own ``output`` method, and any exception raised by a
+    compiled function re-runs ``marshal`` so errors are the ones restx raises.
+    """
+
+    def __init__(self):
+        self._serializers = {}
+        self._globals = {
+            "_OrderedDict": OrderedDict,
+            "_boolean": boolean,
+            "_get_value": get_value,
+            "_is_indexable": _is_indexable,
+            "_marshal": marshal,
+        }
+        self._ids = count()
+
+    def compile(self, model, skip_none: bool = False, ordered: bool = False):
+        """
+        Get the serializer of a model, compiling it on first use.
+
+        Args:
+            model (Model | dict): The restx model or fields dict.
+            skip_none (bool, optional): Drop keys whose value is None or empty. Defaults to False.
+            ordered (bool, optional): Produce OrderedDicts. Defaults to False.
+
+        Returns:
+            Callable: A function serializing an object, or a list of objects, like ``marshal``.
+        """
+        key = (id(model), skip_none, ordered)
+        if key not in self._serializers:
+            name = f"_serialize_{next(self._ids)}"
+            # Registered before compiling so recursive models resolve to the same function
+            self._serializers[key] = (model, name)
+            self._globals[name] = self._build(name, model, skip_none, ordered)
+        return self._globals[self._serializers[key][1]]
+
+    def _constant(self, value) -> str:
+        name = f"_c{next(self._ids)}"
+        self._globals[name] = value
+        return name
+
+    def _build(self, name: str, model, skip_none: bool, ordered: bool):
+        resolved = getattr(model, "resolved", model)
+        if mask := getattr(model, "__mask__", None):
+            resolved = apply_mask(resolved, mask, skip=True)
+
+        fields_name = self._constant(resolved)
+        generic = f"_marshal(obj, {fields_name}, skip_none={skip_none}, ordered={ordered})"
+
+        if any(isinstance(make(field), restx_fields.Wildcard) for field in resolved.values()):
+            return eval(f"lambda obj: {generic}", self._globals)
+
+        by_attribute, by_key = [], []
+        for index, (key, field) in enumerate(resolved.items()):
+            for lines, indexable in ((by_attribute, False), (by_key, True)):
+                lines.extend(self._field(f"r{index}", key, field, ordered, indexable))
+
+        keys = list(resolved)
+        if skip_none:
+            result = ["        out = _OrderedDict()" if ordered else "        out = {}"]
+            for index, key in enumerate(keys):
+                result.append(f"        if r{index} is not None and r{index} != {{}}:")
+                result.append(f"            out[{key!r}] = r{index}")
+            result.append("        return out")
+        elif ordered:
+            items = ", ".join(f"({key!r}, r{index})" for index, key in enumerate(keys))
+            result = [f"        return _OrderedDict([{items}])"]
+        else:
+            items = ", ".join(f"{key!r}: r{index}" for index, key in enumerate(keys))
+            result = [f"        return {{{items}}}"]
+
+        source = "\n".join([
+            f"def {name}(obj):",
+            "    if isinstance(obj, (list, tuple)):",
+            f"        return [{name}(item) for item in obj]",
+            "    try:",
+            "        if _is_indexable(obj):",
+            *(f"    {line}" for line in by_key + result),
+            *by_attribute,
+            *result,
+            "    except Exception:",
+            f"        return {generic}",
+        ])
+        namespace = {}
+        exec(compile(source, f"<serializer {getattr(model, 'name', name)}>", "exec"), self._globals, namespace)
+        return namespace[name]
+
+    def _lookup(self, key, field, indexable: bool) -> str:
+        attribute = key if field.attribute is None else field.attribute
+        if callable(attribute):
+            return f"{self._constant(attribute)}(obj)"
+        if indexable or not isinstance(attribute, str) or "." in attribute:
+            return f"_get_value({self._constant(attribute)}, obj)"
+        return f"getattr(obj, {attribute!r}, None)"
+
+    def _field(self, target: str, key, field, ordered: bool, indexable: bool) -> list:
+        field = make(field)
+        indent = "        "
+
+        if isinstance(field, dict):
+            serializer = self._reference(field, False, ordered)
+            return [f"{indent}{target} = {serializer}(obj)"]
+
+        field_type = type(field)
+        value = self._lookup(key, field, indexable)
+
+        if field_type is restx_fields.Nested:
+            return [f"{indent}v = {value}", f"{indent}{target} = {self._nested('v', field, ordered)}"]
+
+        if field_type is restx_fields.List and type(field.container) is restx_fields.Nested and field.container.attribute is None:
+            # List.format marshals its items without forwarding ``ordered``
+            item = self._nested("item", field.container, False)
+            return [
+                f"{indent}v = {value}",
+                f"{indent}if isinstance(v, (list, tuple)):",
+                f"{indent}    {target} = [{item} for item in v]",
+                f"{indent}else:",
+                f"{indent}    {target} = {self._constant(field)}.output({key!r}, obj, ordered={ordered})",
+            ]
+
+        if field_type.output is not restx_fields.Raw.output or field.mask or callable(field.default):
+            return [f"{indent}{target} = {self._constant(field)}.output({key!r}, obj, ordered={ordered})"]
+
+        if field_type in _FORMAT_EXPRESSIONS:
+            formatted = _FORMAT_EXPRESSIONS[field_type].format(value="v")
+        else:
+            formatted = f"{self._constant(field.format)}(v)"
+        default = field.format(field.default) if field.default else field.default
+        return [
+            f"{indent}v = {value}",
+            f"{indent}{target} = {self._constant(default)} if v is None else {formatted}",
+        ]
+
+    def _nested(self, value: str, field, ordered: bool) -> str:
+        serializer = self._reference(field.model, field.skip_none, ordered)
+        if field.allow_null:
+            return f"None if {value} is None else {serializer}({value})"
+        if field.default is not None:
+            return f"{self._constant(field.default)} if {value} is None else {serializer}({value})"
+        return f"{serializer}({value})"
+
+    def _reference(self, model, skip_none: bool, ordered: bool) -> str:
+        key = (id(model), skip_none, ordered)
+        if key not in self._serializers:
+            self.compile(model, skip_none, ordered)
+        return self._serializers[key][1]
+
+
+compiler = SerializerCompiler()
+
+
+def fields_mask(model, paths: list) -> Mask:
+    """
+    Turn a sparse fieldset into a restx mask of a model.
+
+    On paginated models (a ``total`` and an ``items`` list of nested models) the
+    paths select fields of the items and every pagination field is kept.
+
+    Args:
+        model (Model | dict): The response model.
+        paths (list[str]): Dotted field paths, as returned by ``get_fields_parameter``.
+
+    Returns:
+        Mask: The mask selecting those fields.
+
+    Raises:
+        APIError: If a path does not name a field of the model.
+    """
+    resolved = getattr(model, "resolved", model)
+    items = make(resolved.get("items"))
+    if "total" in resolved and isinstance(items, restx_fields.List) and isinstance(items.container, restx_fields.Nested):
+        return Mask({
+            key: fields_mask(items.container.model, paths) if key == "items" else True
+            for key in resolved
+        })
+    return _tree_mask(resolved, fields_tree(paths), "")
+
+
+def _tree_mask(fields: dict, tree: dict, prefix: str) -> Mask:
+    mask = Mask()
+    for name, subtree in tree.items():
+        if (field := make(fields.get(name))) is None:
+            raise APIError(
+                "Invalid fields to select",
+                code=400,
+                api_code="INVALID_FIELDS",
+                info=f"Unable to select '{prefix}{name}'",
+            )
+        if not subtree:
+            mask[name] = True
+            continue
+
+        if isinstance(field, restx_fields.List):
+            field = field.container
+        if not isinstance(field, restx_fields.Nested):
+            raise APIError(
+                "Invalid fields to select",
+                code=400,
+                api_code="INVALID_FIELDS",
+                info=f"'{prefix}{name}' has no nested fields",
+            )
+        nested = field.model
+        mask[name] = _tree_mask(getattr(nested, "resolved", nested), subtree, f"{prefix}{name}.")
+    return mask
+
+
+class marshal_with(restx_marshal_with):
+    """
+    ``flask_restx.marshal_with`` using a compiled serializer.
+
+    Partial responses, asked for with the mask header or the ``fields`` query
+    argument, use serializers compiled for their mask. The most recently used
+    ones are kept, up to ``MASKED_SERIALIZERS`` per decorated resource.
+    """
+
+    MASKED_SERIALIZERS = 32
+
+    def __init__(self, fields, envelope=None, skip_none=False, mask=None, ordered=False):
+        super().__init__(fields, envelope=envelope, skip_none=skip_none, mask=mask, ordered=ordered)
+        self.serializer = compiler.compile(fields, skip_none=skip_none, ordered=ordered)
+        self._masked_serializers = OrderedDict()
+        self._lock = Lock()
+
+    def masked_serializer(self, mask):
+        """
+        Get the serializer of the model restricted by a mask, compiling it on first use.
+
+        Args:
+            mask (Mask | str): The partial response mask.
+
+        Returns:
+            Callable: The serializer.
+        """
+        mask = Mask(mask, skip=True)
+        key = str(mask)
+        with self._lock:
+            if (serializer := self._masked_serializers.get(key)) is not None:
+                self._masked_serializers.move_to_end(key)
+                return serializer
+
+        fields = apply_mask(getattr(self.fields, "resolved", self.fields), mask, skip=True)
+        # A dedicated compiler, so evicted serializers do not stay referenced by the shared one
+        serializer = SerializerCompiler().compile(fields, skip_none=self.skip_none, ordered=self.ordered)
+        with self._lock:
+            self._masked_serializers[key] = serializer
+            if len(self._masked_serializers) > self.MASKED_SERIALIZERS:
+                self._masked_serializers.popitem(last=False)
+        return serializer
+
+    def marshal(self, data, mask=None):
+        """
+        Serialize the data returned by a resource.
+
+        Args:
+            data: The object, or list of objects, to serialize.
+            mask (Mask | str, optional): Partial response mask. Defaults to None.
+
+        Returns:
+            dict | list: The serialized data.
+        """
+        out = self.masked_serializer(mask)(data) if mask else self.serializer(data)
+        if self.envelope:
+            out = OrderedDict([(self.envelope, out)]) if self.ordered else {self.envelope: out}
+        return out
+
+    def request_mask(self, code: int = 200):
+        """
+        Get the mask of the current request.
+
+        Args:
+            code (int, optional): Status code of the response. Defaults to 200.
+
+        Returns:
+            Mask | str: The mask header, else for successful responses the mask of the
+            ``fields`` query argument, else the mask of the decorator.
+        """
+        if has_app_context() and (header := request.headers.get(current_app.config["RESTX_MASK_HEADER"])):
+            return header
+        if code < 400 and has_request_context() and (paths := get_fields_parameter()):
+            return fields_mask(self.fields, paths)
+        return self.mask
+
+    def __call__(self, f):
+        @wraps(f)
+        def wrapper(*args, **kwargs):
+            resp = f(*args, **kwargs)
+            if isinstance(resp, tuple):
+                data, code, headers = unpack(resp)
+                return self.marshal(data, self.request_mask(code)), code, headers
+            return self.marshal(resp, self.request_mask())
+
+        return wrapper
+
+
+def output_json(data, code, headers=None):
+    """
+    Make a JSON response, encoded with orjson when it is installed.
+
+    Falls back to the restx encoder when orjson is missing, when the app is in
+    debug mode or ``RESTX_JSON`` customizes the encoding, and for data orjson
+    cannot encode.
+
+    Args:
+        data: The serialized response data.
+        code (int): The HTTP status code.
+        headers (dict, optional): Additional response headers. Defaults to None.
+
+    Returns:
+        Response: The Flask response.
+    """
+    if orjson is None or current_app.debug or current_app.config.get("RESTX_JSON"):
+        return restx_output_json(data, code, headers)
+
+    try:
+        dumped = orjson.dumps(data, option=orjson.OPT_APPEND_NEWLINE | orjson.OPT_PASSTHROUGH_DATETIME)
+    except TypeError:
+        return restx_output_json(data, code, headers)
+
+    resp = make_response(dumped, code)
+    resp.headers.extend(headers or {})
+    return resp
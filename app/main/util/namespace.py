@@ -0,0 +1,38 @@
+from http import HTTPStatus
+
+from flask_restx import Namespace as RestxNamespace
+
+from .marshalling import marshal_with
+from .validation import Model
+
+
+class Namespace(RestxNamespace):
+    """
+    ``flask_restx.Namespace`` with compiled serializers and validators.
+
+    Responses are marshalled with the serializers of ``marshalling`` and the
+    models it registers validate payloads with the cached validators of ``validation``.
+    """
+
+    def model(self, name=None, model=None, mask=None, strict=False, **kwargs):
+        if self.ordered:
+            return super().model(name, model, mask=mask, strict=strict, **kwargs)
+        model = Model(name, model, mask=mask, strict=strict)
+        model.__apidoc__.update(kwargs)
+        return self.add_model(name, model)
+
+    def clone(self, name, *specs):
+        return self.add_model(name, Model.clone(name, *specs))
+
+    def inherit(self, name, *specs):
+        return self.add_model(name, Model.inherit(name, *specs))
+
+    def marshal_with(self, fields, as_list=False, code=HTTPStatus.OK, description=None, **kwargs):
+        restx_decorator = super().marshal_with(fields, as_list, code, description, **kwargs)
+
+        def wrapper(func):
+            # The restx decorator records the documentation; its marshalling wrapper is discarded
+            restx_decorator(func)
+            return marshal_with(fields, ordered=self.ordered, **kwargs)(func)
+
+        return wrapper
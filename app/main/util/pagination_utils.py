@@ -1,7 +1,10 @@
 from .. import db
 from .api_error import APIError
+from .projection_utils import attribute_paths, fields_tree, get_fields_parameter, projection_options, relationship_options
+from .row_utils import columns_tree, row_query
 
-from flask import request, current_app
+from flask import abort, request, current_app
+from flask_sqlalchemy import Pagination
 from sqlalchemy.sql import text
 
 
@@ -51,15 +54,22 @@ def get_ordering_parameters(ordenable_columns: list, tables: list) -> list:
     return [getattr(column, order)() for column, order in sort_data.items()]
 
 
-def paginate(table, *joinable_tables, filter: list, ordenable_columns: list = []):
+def paginate(table, *joinable_tables, filter: list, ordenable_columns: list = [], relationships: list = [], field_attributes: dict = {}):
     """
     Paginate the results based on the provided parameters.
 
+    When the request selects a sparse fieldset with ``fields``, only the columns
+    and relationships behind those fields are loaded.
+
     Args:
         table: The main table to paginate.
         joinable_tables: The additional tables to join.
         filter (list): The filters to apply.
         ordenable_columns (list, optional): The columns that can be ordered. Defaults to [].
+        relationships (list, optional): Dotted paths of the relationships to batch load for the
+            whole page when the request does not select ``fields``. Defaults to [].
+        field_attributes (dict, optional): DTO fields computed from other attributes, mapped to the
+            dotted attribute path they read. Defaults to {}.
 
     Returns:
         Pagination: The paginated results.
@@ -73,6 +83,11 @@ def paginate(table, *joinable_tables, filter: list, ordenable_columns: list = []
     for sub_table in joinable_tables:
         query = query.join(sub_table)
 
+    if fields := get_fields_parameter():
+        query = query.options(*projection_options(table, fields, field_attributes))
+    elif relationships:
+        query = query.options(*relationship_options(table, relationships))
+
     filtered = query.filter(*filter)
     if clauses := get_ordering_parameters(ordenable_columns, [table] + list(joinable_tables)):
         filtered = filtered.order_by(*clauses)
@@ -84,6 +99,65 @@ def paginate(table, *joinable_tables, filter: list, ordenable_columns: list = []
     raise APIError("No page generated", code=404, api_code="PAGES_NOT_FOUND")
 
 
+def paginate_rows(
+    table,
+    filter: list,
+    ordenable_columns: list = [],
+    relationships: list = [],
+    field_attributes: dict = {},
+    filter_relationships: dict = {},
+):
+    """
+    Paginate read-only rows of a table, without loading ORM instances.
+
+    The page is read with a single Core ``SELECT`` joining the scalar relationships
+    the DTO needs, and its items are lightweight row objects (see ``RowQuery``) that
+    are not attached to the session. Only use it for listings that marshal the rows
+    and never modify or lazy load them. Pages follow the rules of ``paginate``.
+
+    Args:
+        table: The main table to paginate.
+        filter (list): The filters to apply.
+        ordenable_columns (list, optional): The columns that can be ordered. Defaults to [].
+        relationships (list, optional): Dotted paths of the scalar relationships to load
+            with every column when the request does not select ``fields``. Defaults to [].
+        field_attributes (dict, optional): DTO fields computed from other attributes, mapped to the
+            dotted attribute path they read. Defaults to {}.
+        filter_relationships (dict, optional): Query arguments filtering on the columns of a
+            scalar relationship, mapped to its dotted path. The relationships of the arguments
+            a request sends are joined, without selecting their columns. Defaults to {}.
+
+    Returns:
+        Pagination: The paginated rows.
+
+    Raises:
+        APIError: If no page is generated.
+    """
+    paginate_kwargs = get_paginate_parameters()
+    page = paginate_kwargs["page"]
+    per_page = min(paginate_kwargs["per_page"], paginate_kwargs["max_per_page"])
+    if page < 1 or per_page < 0:
+        abort(404)
+
+    if fields := get_fields_parameter():
+        tree = fields_tree(attribute_paths(fields, field_attributes))
+    else:
+        tree = columns_tree(relationships)
+    joins = [path for argument, path in filter_relationships.items() if request.args.get(argument)]
+    query = row_query(table, tree, joins)
+
+    clauses = get_ordering_parameters(ordenable_columns, [table])
+    items = query.all(db.session, filter, clauses, limit=per_page, offset=(page - 1) * per_page)
+    if not items and page != 1:
+        abort(404)
+
+    if items:
+        pagination = Pagination(None, page, per_page, query.count(db.session, filter), items)
+        pagination.limit = paginate_kwargs["max_per_page"]
+        return pagination
+    raise APIError("No page generated", code=404, api_code="PAGES_NOT_FOUND")
+
+
 def get_student_filters() -> list:
     """
     Get the filters for querying students.
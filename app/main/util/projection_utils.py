@@ -0,0 +1,150 @@
+import re
+
+from flask import request
+from sqlalchemy import inspect
+from sqlalchemy.orm import ColumnProperty, RelationshipProperty, joinedload, load_only, selectinload
+
+from .api_error import APIError
+
+_FIELD_PATH = re.compile(r"^\w+(\.\w+)*$")
+
+
+def get_fields_parameter() -> list:
+    """
+    Get the sparse fieldset from the ``fields`` query argument.
+
+    Returns:
+        list[str]: The selected field paths, such as ``["id", "user.name"]``. Empty when every field is wanted.
+
+    Raises:
+        APIError: If a path is malformed.
+    """
+    paths = []
+    for path in request.args.get("fields", "", type=str).split(","):
+        if not (path := path.strip()):
+            continue
+        if not _FIELD_PATH.match(path):
+            raise APIError(
+                "Invalid fields to select",
+                code=400,
+                api_code="INVALID_FIELDS",
+                info=f"Unable to select '{path}'",
+            )
+        paths.append(path)
+    return paths
+
+
+def fields_tree(paths: list) -> dict:
+    """
+    Group dotted field paths by their first name.
+
+    Args:
+        paths (list[str]): The field paths.
+
+    Returns:
+        dict: A tree of names, an empty dict meaning the whole field.
+            ``["id", "user.name", "user.email"]`` gives ``{"id": {}, "user": {"name": {}, "email": {}}}``.
+    """
+    tree = {}
+    for path in paths:
+        node = tree
+        names = path.split(".")
+        for index, name in enumerate(names):
+            if name in node and not node[name]:
+                break  # the whole field was already selected
+            node = node.setdefault(name, {})
+            if index == len(names) - 1:
+                node.clear()
+    return tree
+
+
+def projection_options(table, paths: list, attributes: dict = {}) -> list:
+    """
+    Build loader options that fetch only the columns and relationships behind a sparse fieldset.
+
+    Selected columns are loaded with ``load_only``, selected relationships are
+    eager loaded (``joinedload``, or ``selectinload`` for collections) with their
+    own selected columns, and anything else is left unloaded. When a level selects
+    a field that is not a mapped attribute, every column of that level is loaded,
+    since the DTO may compute it from any of them.
+
+    Args:
+        table: The mapped class being queried.
+        paths (list[str]): The selected field paths.
+        attributes (dict, optional): Field paths computed from other attributes, mapped to the
+            dotted attribute path they read, e.g. ``{"document_id": "document.id"}``. Defaults to {}.
+
+    Returns:
+        list: The loader options.
+    """
+    return _level_options(inspect(table), fields_tree(attribute_paths(paths, attributes)), None)
+
+
+def relationship_options(table, paths: list) -> list:
+    """
+    Build loader options that eager load relationships with every column.
+
+    Every level is loaded with ``selectinload``, so each relationship costs one
+    ``IN`` query for the whole page, whatever its size.
+
+    Args:
+        table: The mapped class being queried.
+        paths (list[str]): Dotted paths of relationships, e.g. ``["address", "admin_user"]``.
+
+    Returns:
+        list: The loader options.
+    """
+    options = []
+    for path in paths:
+        mapper, loader = inspect(table), None
+        for name in path.split("."):
+            prop = mapper.attrs[name]
+            loader = selectinload(prop.class_attribute) if loader is None else loader.selectinload(prop.class_attribute)
+            mapper = prop.mapper
+        options.append(loader)
+    return options
+
+
+def attribute_paths(paths: list, attributes: dict) -> list:
+    """
+    Replace the fields computed from other attributes by the attributes they read.
+
+    Args:
+        paths (list[str]): The selected field paths.
+        attributes (dict): Field paths mapped to the dotted attribute path they read.
+
+    Returns:
+        list[str]: The attribute paths.
+    """
+    mapped_paths = []
+    for path in paths:
+        for field, attribute in attributes.items():
+            if path == field or path.startswith(f"{field}."):
+                path = attribute + path[len(field):]
+                break
+        mapped_paths.append(path)
+    return mapped_paths
+
+
+def _level_options(mapper, tree: dict, loader) -> list:
+    if not tree:
+        return [loader] if loader is not None else []
+
+    columns, options, restrict = [], [], True
+    for name, subtree in tree.items():
+        prop = mapper.attrs.get(name)
+        if isinstance(prop, ColumnProperty):
+            columns.append(prop.class_attribute)
+        elif isinstance(prop, RelationshipProperty):
+            strategy = selectinload if prop.uselist else joinedload
+            child = strategy(prop.class_attribute) if loader is None else getattr(loader, strategy.__name__)(prop.class_attribute)
+            options.extend(_level_options(prop.mapper, subtree, child))
+        else:
+            restrict = False
+
+    if restrict:
+        columns = columns or [column.class_attribute for column in map(mapper.get_property_by_column, mapper.primary_key)]
+        options.append(load_only(*columns) if loader is None else loader.load_only(*columns))
+    elif loader is not None:
+        options.append(loader)
+    return options
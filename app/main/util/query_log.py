@@ -0,0 +1,54 @@
+import json
+from threading import Lock
+from time import perf_counter
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from .query_recorder import normalize_statement
+
+
+class QueryLog:
+    """
+    Appends the statements run by every engine to a file, for ``flask index-advisor``.
+
+    Each line is a JSON object with the normalized ``statement`` and its
+    ``duration_ms``. Enabled by setting ``QUERY_LOG_PATH``.
+
+    Attributes:
+        path (str): The file the statements are appended to.
+    """
+
+    def __init__(self, path: str):
+        """
+        Initialize the QueryLog instance.
+
+        Args:
+            path (str): The file the statements are appended to.
+        """
+        self.path = path
+        self._file = None
+        self._lock = Lock()
+
+    @staticmethod
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_log_started", []).append(perf_counter())
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        duration_ms = (perf_counter() - conn.info["query_log_started"].pop()) * 1000
+        line = json.dumps({"statement": normalize_statement(statement), "duration_ms": round(duration_ms, 3)})
+        with self._lock:
+            self._file.write(line + "\n")
+
+    def start(self) -> "QueryLog":
+        """Start logging the statements of every engine."""
+        self._file = open(self.path, "a", buffering=1)
+        event.listen(Engine, "before_cursor_execute", self._before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", self._after_cursor_execute)
+        return self
+
+    def stop(self):
+        """Stop logging and close the file."""
+        event.remove(Engine, "before_cursor_execute", self._before_cursor_execute)
+        event.remove(Engine, "after_cursor_execute", self._after_cursor_execute)
+        self._file.close()
@@ -0,0 +1,87 @@
+import re
+from threading import Lock
+
+from sqlalchemy import event
+
+_PLACEHOLDER = re.compile(r"%\(\w+\)s|%s")
+_LITERAL = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_VALUE_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_statement(statement: str) -> str:
+    """
+    Normalize a SQL statement so equivalent queries compare equal.
+
+    Bound parameters and literals become ``?``, value lists collapse to ``(?)``
+    and whitespace is squeezed, so the text only changes with the query shape.
+
+    Args:
+        statement (str): The SQL statement as sent to the driver.
+
+    Returns:
+        str: The normalized statement.
+    """
+    statement = _PLACEHOLDER.sub("?", statement)
+    statement = _LITERAL.sub("?", statement)
+    statement = _VALUE_LIST.sub("(?)", statement)
+    return _WHITESPACE.sub(" ", statement).strip()
+
+
+class QueryRecorder:
+    """
+    Collects the SQL statements executed through an engine while it is active.
+
+    Attributes:
+        engine: The SQLAlchemy engine being observed.
+        statements (list[str]): The statements executed since the recorder started.
+        parameters (list): The parameters of each statement, ``None`` for executemany calls.
+    """
+
+    def __init__(self, engine):
+        """
+        Initialize the QueryRecorder instance.
+
+        Args:
+            engine: The SQLAlchemy engine to observe.
+        """
+        self.engine = engine
+        self.statements = []
+        self.parameters = []
+        self._lock = Lock()
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        with self._lock:
+            self.statements.append(statement)
+            self.parameters.append(None if executemany else parameters)
+
+    @property
+    def count(self) -> int:
+        """int: Number of statements recorded so far."""
+        return len(self.statements)
+
+    @property
+    def normalized(self) -> list:
+        """list[str]: The recorded statements, normalized with ``normalize_statement``."""
+        return [normalize_statement(statement) for statement in self.statements]
+
+    def reset(self):
+        """Discard the statements recorded so far."""
+        with self._lock:
+            self.statements = []
+            self.parameters = []
+
+    def start(self) -> "QueryRecorder":
+        """Start listening to the engine."""
+        event.listen(self.engine, "before_cursor_execute", self._before_cursor_execute)
+        return self
+
+    def stop(self):
+        """Stop listening to the engine."""
+        event.remove(self.engine, "before_cursor_execute", self._before_cursor_execute)
+
+    def __enter__(self) -> "QueryRecorder":
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
@@ -0,0 +1,247 @@
+import re
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from functools import wraps
+from math import ceil
+from threading import Lock
+from time import monotonic
+
+from flask import current_app, request
+
+from .api_error import APIError
+from .auth_utils import decode_auth_token
+
+_EXTENSION = "rate_limiter"
+_PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+_LIMIT = re.compile(r"^\s*(\d+)\s*/\s*(second|minute|hour|day)s?\s*$")
+
+
+class RateLimitExceeded(APIError):
+    """
+    Error of a request rejected by a rate limit.
+
+    Attributes:
+        retry_after (int): Seconds until the request would be accepted.
+    """
+
+    def __init__(self, retry_after: float):
+        self.retry_after = max(1, ceil(retry_after))
+        super().__init__(
+            "Too many requests.",
+            info=f"Retry after {self.retry_after} seconds.",
+            code=429,
+            api_code="TOO_MANY_REQUESTS",
+        )
+
+
+def parse_limit(limit: str) -> tuple:
+    """
+    Parse a rate limit written as ``<requests>/<second|minute|hour|day>``.
+
+    Args:
+        limit (str): The limit, like ``"5/minute"``. Empty or ``"0/..."`` disables it.
+
+    Returns:
+        tuple: The capacity of the bucket and the tokens it gains per second, or None if disabled.
+
+    Raises:
+        ValueError: If the limit is malformed.
+    """
+    if not limit:
+        return None
+    if (match := _LIMIT.match(limit)) is None:
+        raise ValueError(f"Invalid rate limit {limit!r}, expected '<requests>/<second|minute|hour|day>'")
+    capacity = int(match.group(1))
+    return (capacity, capacity / _PERIODS[match.group(2)]) if capacity else None
+
+
+class RateLimitBackend(ABC):
+    """Store of the token buckets."""
+
+    @abstractmethod
+    def take(self, key: str, capacity: int, refill_rate: float) -> float:
+        """
+        Take a token from a bucket, creating it full.
+
+        Args:
+            key (str): The bucket.
+            capacity (int): The most tokens the bucket holds.
+            refill_rate (float): Tokens added to the bucket per second.
+
+        Returns:
+            float: 0 if a token was taken, otherwise the seconds until one is available.
+        """
+
+
+class LocalRateLimit(RateLimitBackend):
+    """
+    In-process backend, for a single worker.
+
+    Each process has its own buckets, so with several workers a client gets the
+    limit once per worker: use a shared backend for those deployments. The least
+    recently used buckets are dropped beyond ``max_keys``.
+    """
+
+    def __init__(self, max_keys: int = 10000):
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()
+        self._lock = Lock()
+
+    def take(self, key: str, capacity: int, refill_rate: float) -> float:
+        now = monotonic()
+        with self._lock:
+            tokens, updated_at = self._buckets.pop(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - updated_at) * refill_rate)
+            wait = 0.0 if tokens >= 1 else (1 - tokens) / refill_rate
+            self._buckets[key] = (tokens - 1 if not wait else tokens, now)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return wait
+
+
+class RedisRateLimit(RateLimitBackend):
+    """Backend shared by every process, stored in Redis. Needs the ``redis`` package."""
+
+    # Refills and takes atomically, on the clock of the server so every worker agrees on it
+    _SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local refill_rate = tonumber(ARGV[2])
+local time = redis.call("TIME")
+local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+local bucket = redis.call("HMGET", KEYS[1], "tokens", "updated_at")
+local tokens = math.min(capacity, (tonumber(bucket[1]) or capacity) + (now - (tonumber(bucket[2]) or now)) * refill_rate)
+local wait = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    wait = (1 - tokens) / refill_rate
+end
+redis.call("HSET", KEYS[1], "tokens", tostring(tokens), "updated_at", tostring(now))
+redis.call("EXPIRE", KEYS[1], math.ceil(capacity / refill_rate))
+return tostring(wait)
+"""
+
+    def __init__(self, url: str, prefix: str = "institute-api:rate-limit:"):
+        try:
+            import redis
+        except ImportError as error:
+            raise RuntimeError("RATE_LIMIT_URL needs the redis package to be installed") from error
+        client = redis.Redis.from_url(url)
+        self._take = client.register_script(self._SCRIPT)
+        self._prefix = prefix
+
+    def take(self, key: str, capacity: int, refill_rate: float) -> float:
+        return float(self._take(keys=[self._prefix + key], args=[capacity, refill_rate]))
+
+
+def client_ip():
+    """Key requests by the address of the client."""
+    return request.remote_addr
+
+
+def json_field(name: str):
+    """
+    Key requests by a field of their JSON body, case insensitive.
+
+    Args:
+        name (str): The field.
+
+    Returns:
+        Callable: The key function.
+    """
+    def key():
+        body = request.get_json(silent=True)
+        value = body.get(name) if isinstance(body, dict) else None
+        return value.strip().lower() if isinstance(value, str) else None
+
+    return key
+
+
+def token_subject():
+    """Key requests by the user of their login token, decoded without querying the database."""
+    if token := request.headers.get("Authorization"):
+        try:
+            return decode_auth_token(token)["sub"]
+        except APIError:
+            return None
+    return None
+
+
+class RateLimiter:
+    """
+    Token bucket rate limits, checked before the resource method runs.
+
+    The limits of a namespace are read from the ``RATE_LIMITS`` configuration,
+    one per key: ``{"login": {"ip": "30/minute", "email": "10/minute"}}``. Each
+    key value of a request has its own bucket, and a request takes a token from
+    each of them. Rejections raise ``RateLimitExceeded`` before any database
+    query or password hash.
+
+    The backend is built on first use from the app configuration:
+    ``RATE_LIMIT_URL`` selects a ``RedisRateLimit``, otherwise a ``LocalRateLimit``
+    is used. ``RATE_LIMIT_ENABLED`` set to false disables the limits.
+    """
+
+    def backend(self) -> RateLimitBackend:
+        """
+        Get the backend of the current app, building it on first use.
+
+        Returns:
+            RateLimitBackend: The backend, or None if the limits are disabled.
+        """
+        app = current_app._get_current_object()
+        if _EXTENSION not in app.extensions:
+            if not app.config.get("RATE_LIMIT_ENABLED", True):
+                app.extensions[_EXTENSION] = None
+            elif url := app.config.get("RATE_LIMIT_URL"):
+                app.extensions[_EXTENSION] = RedisRateLimit(url)
+            else:
+                app.extensions[_EXTENSION] = LocalRateLimit()
+        return app.extensions[_EXTENSION]
+
+    def check(self, namespace: str, **keys) -> None:
+        """
+        Take a token from the bucket of each key of a namespace.
+
+        Args:
+            namespace (str): The namespace of the limits, in ``RATE_LIMITS``.
+            **keys: The value of each key. Keys without a value or a limit are skipped.
+
+        Raises:
+            RateLimitExceeded: If a bucket is empty.
+        """
+        if (backend := self.backend()) is None:
+            return
+        limits = current_app.config.get("RATE_LIMITS", {}).get(namespace, {})
+        for name, value in keys.items():
+            if value is None or (limit := parse_limit(limits.get(name))) is None:
+                continue
+            if wait := backend.take(f"{namespace}:{name}:{value}", *limit):
+                raise RateLimitExceeded(wait)
+
+    def limit(self, namespace: str, **key_functions):
+        """
+        Rate limit a resource method.
+
+        Place it above the authentication decorator, so rejected requests never
+        load the user.
+
+        Args:
+            namespace (str): The namespace of the limits, in ``RATE_LIMITS``.
+            **key_functions: The function giving the value of each key for the current request.
+
+        Returns:
+            Callable: The decorator.
+        """
+        def decorator(func):
+            @wraps(func)
+            def decorated(*args, **kwargs):
+                self.check(namespace, **{name: key() for name, key in key_functions.items()})
+                return func(*args, **kwargs)
+
+            return decorated
+
+        return decorator
+
+
+rate_limiter = RateLimiter()
@@ -0,0 +1,205 @@
+from functools import wraps
+from itertools import count
+from time import monotonic
+
+from flask import current_app, has_request_context, request
+from sqlalchemy import create_engine, event
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from .. import db
+from .cache_utils import CacheBackend, LocalCache, RedisCache
+from .database import REPLICA, engine_options
+from .rate_limit import token_subject
+
+_EXTENSION = "read_replicas"
+_PINS = "read_replica_pins"
+_WROTE = "read_replica_wrote"
+_READ_METHODS = ("GET", "HEAD")
+
+
+class ReplicaSet:
+    """
+    Engines of the read replicas, chosen round-robin among the healthy ones.
+
+    A replica is probed with ``SELECT 1`` when it is chosen and its last probe is
+    older than ``check_interval`` seconds, so each process probes each replica at
+    most once per interval. A replica failing a probe, or losing a connection
+    while serving a request, is skipped until the interval has passed.
+    """
+
+    def __init__(self, engines: list, check_interval: float):
+        self.engines = engines
+        self.check_interval = check_interval
+        self._next = count()
+        self._checks = {}
+        for engine in engines:
+            event.listen(engine, "handle_error", self._on_error)
+
+    def _on_error(self, context) -> None:
+        # No connection means the replica could not be reached at all
+        if context.is_disconnect or context.connection is None:
+            self._checks[context.engine] = (False, monotonic())
+
+    def _healthy(self, engine) -> bool:
+        healthy, checked_at = self._checks.get(engine, (True, None))
+        if checked_at is not None and monotonic() - checked_at < self.check_interval:
+            return healthy
+        try:
+            with engine.connect() as connection:
+                connection.exec_driver_sql("SELECT 1")
+            healthy = True
+        except SQLAlchemyError as error:
+            url = engine.url.render_as_string(hide_password=True)
+            current_app.logger.warning("Read replica %s is unreachable: %s", url, error.orig or error)
+            healthy = False
+        self._checks[engine] = (healthy, monotonic())
+        return healthy
+
+    def choose(self):
+        """
+        Choose the replica serving the next request.
+
+        Returns:
+            Engine: The next healthy replica, or None if they are all down.
+        """
+        start = next(self._next)
+        for offset in range(len(self.engines)):
+            engine = self.engines[(start + offset) % len(self.engines)]
+            if self._healthy(engine):
+                return engine
+        return None
+
+    def dispose(self) -> None:
+        """Drop the connections inherited from the parent process, without closing them."""
+        for engine in self.engines:
+            engine.dispose(close=False)
+        self._checks.clear()
+
+
+class ReplicaRouter:
+    """
+    Routing of the read-only requests to the read replicas.
+
+    The ``GET`` requests of the namespaces decorated with ``route`` read from a
+    replica of ``DB_REPLICA_URIS`` (comma separated), with the engine options of
+    the primary. Every other request, the flushes and the write statements use
+    the primary. A user whose request committed a write reads from the primary
+    for the next ``DB_REPLICA_PIN_SECONDS``, so the user sees the change even if
+    the replicas lag behind. Responses read from a replica are also cached for
+    at most that window, since they may be stale.
+
+    The pins are kept in ``DB_REPLICA_PIN_URL`` (Redis) or, without it, in each
+    process. With several workers, a user's next request may reach another
+    worker, so share the pins between them.
+    """
+
+    def replicas(self) -> ReplicaSet:
+        """
+        Get the replicas of the current app, building their engines on first use.
+
+        Returns:
+            ReplicaSet: The replicas, or None if there are none.
+        """
+        app = current_app._get_current_object()
+        if _EXTENSION not in app.extensions:
+            uris = [uri.strip() for uri in (app.config.get("DB_REPLICA_URIS") or "").split(",") if uri.strip()]
+            engines = [create_engine(uri, **engine_options({**app.config, "SQLALCHEMY_DATABASE_URI": uri})) for uri in uris]
+            app.extensions[_EXTENSION] = ReplicaSet(engines, app.config.get("DB_REPLICA_CHECK_INTERVAL", 5)) if engines else None
+        return app.extensions[_EXTENSION]
+
+    def pins(self) -> CacheBackend:
+        """
+        Get the store of the pinned users of the current app, building it on first use.
+
+        Returns:
+            CacheBackend: The store.
+        """
+        app = current_app._get_current_object()
+        if _PINS not in app.extensions:
+            if url := app.config.get("DB_REPLICA_PIN_URL"):
+                app.extensions[_PINS] = RedisCache(url, prefix="institute-api:replica:")
+            else:
+                app.extensions[_PINS] = LocalCache(10000)
+        return app.extensions[_PINS]
+
+    def pin(self, user_id) -> None:
+        """
+        Send the reads of a user to the primary for ``DB_REPLICA_PIN_SECONDS``.
+
+        Args:
+            user_id: The id of the user.
+        """
+        if self.replicas() is not None:
+            self.pins().set(f"pin:{user_id}", 1, current_app.config.get("DB_REPLICA_PIN_SECONDS", 5))
+
+    def is_pinned(self, user_id) -> bool:
+        """
+        Tell whether a user reads from the primary after a recent write.
+
+        Args:
+            user_id: The id of the user, or None for anonymous requests.
+
+        Returns:
+            bool: True if the user is pinned to the primary.
+        """
+        return user_id is not None and self.pins().get(f"pin:{user_id}") is not None
+
+    def route(self, func):
+        """
+        Read from a replica during the ``GET`` requests of a resource.
+
+        Meant for the ``decorators`` of a ``Namespace``, so the user loaded by the
+        authentication decorator is read from the replica too.
+
+        Args:
+            func (Callable): The view of the resource.
+
+        Returns:
+            Callable: The decorated view.
+        """
+        @wraps(func)
+        def decorated(*args, **kwargs):
+            if request.method in _READ_METHODS and (replicas := self.replicas()) is not None:
+                if not self.is_pinned(token_subject()):
+                    db.session.info[REPLICA] = replicas.choose()
+            return func(*args, **kwargs)
+
+        return decorated
+
+    def dispose(self) -> None:
+        """Drop the replica connections inherited from the parent process, after a fork."""
+        if (replicas := current_app.extensions.get(_EXTENSION)) is not None:
+            replicas.dispose()
+
+
+replica_router = ReplicaRouter()
+
+
+def _wrote(session: Session) -> None:
+    # The rest of the transaction reads its own writes from the primary
+    session.info[_WROTE] = True
+    session.info.pop(REPLICA, None)
+
+
+@event.listens_for(Session, "after_flush")
+def _track_flush(session, flush_context):
+    _wrote(session)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _track_statement(orm_execute_state):
+    if not orm_execute_state.is_select:
+        _wrote(orm_execute_state.session)
+
+
+@event.listens_for(Session, "after_commit")
+def _pin_writer(session):
+    if session.info.pop(_WROTE, None) and has_request_context():
+        if (user_id := token_subject()) is not None:
+            replica_router.pin(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_writes(session):
+    session.info.pop(_WROTE, None)
@@ -0,0 +1,210 @@
+from functools import lru_cache
+from itertools import count
+
+from sqlalchemy import func, inspect, select
+from sqlalchemy.orm import RelationshipProperty
+
+ALL_COLUMNS = "*"
+
+
+class RowQuery:
+    """
+    Read-only query of a mapped class returning lightweight row objects.
+
+    The columns of the class and of its selected one-to-one and many-to-one
+    relationships are read with a single SQLAlchemy Core ``SELECT`` joining the
+    related tables. Each row becomes an instance of a generated ``__slots__``
+    class per mapped class, with the related rows (or None) as attributes, so the
+    DTOs marshal them like ORM instances. Nothing is attached to the session:
+    no identity map, no change tracking and no lazy loading.
+
+    Attributes:
+        table: The mapped class being queried.
+        statement (Select): The ``SELECT`` of every column, without filters, order or limit.
+        from_clause: The table joined with its related tables, for counting.
+    """
+
+    def __init__(self, table, tree: dict, joins: tuple = ()):
+        """
+        Initialize the RowQuery instance.
+
+        Args:
+            table: The mapped class to query.
+            tree (dict): The selected fields, as built by ``fields_tree``. A level naming a
+                field that is not a mapped attribute, like ``ALL_COLUMNS``, selects every
+                column of that level.
+            joins (tuple, optional): Dotted paths of scalar relationships to join without
+                selecting their columns, for the filters reading them. Defaults to ().
+
+        Raises:
+            ValueError: If a selected relationship is a collection or joins a table twice.
+        """
+        self.table = table
+        self._columns = []
+        self._globals = {}
+        self._ids = count()
+
+        mapper = inspect(table)
+        self._tables = {mapper.local_table}
+        self.from_clause = mapper.local_table
+        expression, _ = self._level(mapper, tree)
+        for path in joins:
+            self._join(mapper, path)
+
+        self.statement = select(*self._columns).select_from(self.from_clause)
+        exec(f"def build(r):\n    return {expression}", self._globals)
+        self._build = self._globals["build"]
+
+    def _level(self, mapper, tree: dict) -> tuple:
+        # Returns the expression building a row of the level and the position of its primary key
+        columns = [prop for prop in mapper.column_attrs if prop.key in tree]
+        relationships = []
+        for name, subtree in tree.items():
+            if isinstance(prop := mapper.attrs.get(name), RelationshipProperty):
+                relationships.append((prop, subtree))
+
+        selected = {prop.key for prop in columns} | {prop.key for prop, _ in relationships}
+        if not tree or selected != set(tree):
+            columns = list(mapper.column_attrs)
+        primary_keys = [mapper.get_property_by_column(column) for column in mapper.primary_key]
+        columns += [prop for prop in primary_keys if prop not in columns]
+
+        key_position = len(self._columns) + columns.index(primary_keys[0])
+        arguments = []
+        for prop in columns:
+            arguments.append(f"r[{len(self._columns)}]")
+            self._columns.append(prop.columns[0].label(f"c{len(self._columns)}"))
+
+        for prop, subtree in relationships:
+            if prop.uselist:
+                raise ValueError(f"{prop} is a collection, rows only follow scalar relationships")
+            if (target := prop.mapper.local_table) in self._tables:
+                raise ValueError(f"{prop} joins {target} twice")
+            self._tables.add(target)
+            self.from_clause = self.from_clause.outerjoin(target, prop.primaryjoin)
+
+            nested, nested_key = self._level(prop.mapper, subtree)
+            arguments.append(f"({nested} if r[{nested_key}] is not None else None)")
+
+        row_class = self._row_class(mapper, [prop.key for prop in columns] + [prop.key for prop, _ in relationships])
+        return f"{row_class}({', '.join(arguments)})", key_position
+
+    def _join(self, mapper, path: str) -> None:
+        # Joins the tables of a relationship path that the selected fields did not join already
+        for name in path.split("."):
+            prop = mapper.attrs[name]
+            if prop.uselist:
+                raise ValueError(f"{prop} is a collection, rows only follow scalar relationships")
+            if (target := prop.mapper.local_table) not in self._tables:
+                self._tables.add(target)
+                self.from_clause = self.from_clause.outerjoin(target, prop.primaryjoin)
+            mapper = prop.mapper
+
+    def _row_class(self, mapper, attributes: list) -> str:
+        name = f"_{mapper.class_.__name__}Row{next(self._ids)}"
+        parameters = ", ".join(attributes)
+        body = "".join(f"\n        self.{attribute} = {attribute}" for attribute in attributes) or "\n        pass"
+        source = (
+            f"class {name}:\n"
+            f"    __slots__ = {tuple(attributes)!r}\n"
+            f"    def __init__(self, {parameters}):{body}\n"
+        )
+        exec(source, self._globals)
+        self._globals[name].__qualname__ = f"{mapper.class_.__name__}Row"
+        return name
+
+    def all(self, session, filter: list = (), order_by: list = (), limit: int = None, offset: int = None) -> list:
+        """
+        Run the query.
+
+        Args:
+            session: The session whose connection runs the query.
+            filter (list, optional): The filters to apply. Defaults to ().
+            order_by (list, optional): The ordering clauses. Defaults to ().
+            limit (int, optional): Maximum number of rows. Defaults to None.
+            offset (int, optional): Rows to skip. Defaults to None.
+
+        Returns:
+            list: The row objects.
+        """
+        statement = self.statement.where(*filter).order_by(*order_by).limit(limit).offset(offset)
+        return [self._build(row) for row in session.execute(statement)]
+
+    def stream(self, session, filter: list = (), order_by: list = (), yield_per: int = 500):
+        """
+        Run the query with a server-side cursor, building the rows as they are fetched.
+
+        Args:
+            session: The session whose connection runs the query.
+            filter (list, optional): The filters to apply. Defaults to ().
+            order_by (list, optional): The ordering clauses. Defaults to ().
+            yield_per (int, optional): Rows fetched from the cursor at a time. Defaults to 500.
+
+        Yields:
+            The row objects.
+        """
+        statement = self.statement.where(*filter).order_by(*order_by).execution_options(stream_results=True)
+        build = self._build
+        for partition in session.execute(statement).yield_per(yield_per).partitions():
+            for row in partition:
+                yield build(row)
+
+    def count(self, session, filter: list = ()) -> int:
+        """
+        Count the rows matching the filters.
+
+        Args:
+            session: The session whose connection runs the query.
+            filter (list, optional): The filters to apply. Defaults to ().
+
+        Returns:
+            int: The number of rows.
+        """
+        return session.execute(select(func.count()).select_from(self.from_clause).where(*filter)).scalar()
+
+
+def columns_tree(relationships: list = ()) -> dict:
+    """
+    Build the tree selecting every column of a table and of some of its relationships.
+
+    Args:
+        relationships (list, optional): Dotted paths of scalar relationships. Defaults to ().
+
+    Returns:
+        dict: The tree to give to ``row_query``.
+    """
+    tree = {ALL_COLUMNS: {}}
+    for path in relationships:
+        level = tree
+        for name in path.split("."):
+            level = level.setdefault(name, {ALL_COLUMNS: {}})
+    return tree
+
+
+def _freeze(tree: dict) -> tuple:
+    return tuple(sorted((name, _freeze(subtree)) for name, subtree in tree.items()))
+
+
+def _thaw(frozen: tuple) -> dict:
+    return {name: _thaw(subtree) for name, subtree in frozen}
+
+
+@lru_cache(maxsize=128)
+def _row_query(table, frozen_tree: tuple, joins: tuple) -> RowQuery:
+    return RowQuery(table, _thaw(frozen_tree), joins)
+
+
+def row_query(table, tree: dict, joins=()) -> RowQuery:
+    """
+    Get the RowQuery of a table and selected fields, building it on first use.
+
+    Args:
+        table: The mapped class to query.
+        tree (dict): The selected fields, as built by ``fields_tree``.
+        joins (Iterable[str], optional): Dotted paths of relationships to join without
+            selecting their columns. Defaults to ().
+
+    Returns:
+        RowQuery: The cached query.
+    """
+    return _row_query(table, _freeze(tree), tuple(sorted(set(joins))))
@@ -0,0 +1,129 @@
+from collections import Counter
+from functools import wraps
+from threading import Event, Lock
+
+from flask_restx.utils import unpack
+
+from .cache_utils import GLOBAL, TENANT, resource_key
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Coalesces identical calls running at the same time in a worker.
+
+    The first caller of a key runs the function; callers arriving while it runs
+    wait for it and get its result (or its exception) instead of running it
+    again. Nothing is kept once the call returns, so a result is never older than
+    the call that produced it.
+
+    Attributes:
+        executions (Counter): Calls that ran the function, by metric name.
+        coalesced (Counter): Calls that shared the result of a running one, by metric name.
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = Lock()
+        self.executions = Counter()
+        self.coalesced = Counter()
+
+    def do(self, key, func, metric: str = None):
+        """
+        Run a function, or wait for the call of the same key already running.
+
+        Args:
+            key: Hashable identity of the call.
+            func (Callable): The function, called without arguments.
+            metric (str, optional): Name the call is counted under. Defaults to None.
+
+        Returns:
+            The result of the function.
+        """
+        with self._lock:
+            if (call := self._calls.get(key)) is not None:
+                self.coalesced[metric] += 1
+                running = True
+            else:
+                call = self._calls[key] = _Call()
+                self.executions[metric] += 1
+                running = False
+        return self._wait(call) if running else self._run(key, call, func)
+
+    def _run(self, key, call: _Call, func):
+        try:
+            call.result = func()
+            return call.result
+        except BaseException as error:
+            call.error = error
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    @staticmethod
+    def _wait(call: _Call):
+        call.done.wait()
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+    def stats(self) -> dict:
+        """
+        Get the coalescing metrics.
+
+        Returns:
+            dict: The ``executions`` and ``coalesced`` calls by metric name.
+        """
+        with self._lock:
+            return {
+                metric: {"executions": self.executions[metric], "coalesced": self.coalesced[metric]}
+                for metric in self.executions.keys() | self.coalesced.keys()
+            }
+
+    def reset_stats(self) -> None:
+        """Reset the coalescing metrics."""
+        with self._lock:
+            self.executions.clear()
+            self.coalesced.clear()
+
+    def coalesce(self, scope: str = GLOBAL):
+        """
+        Share the answer of a read-only resource method between identical concurrent requests.
+
+        Requests are identical when they have the same route, query arguments,
+        partial response mask, database (replica or primary) and, for ``TENANT``,
+        institute of the ``user``. Place it under the authentication decorator and
+        above ``marshal_with``, so the requests also share the marshalled result.
+        Calls are counted under the endpoint name.
+
+        Args:
+            scope (str, optional): ``GLOBAL`` or ``TENANT``, as for ``ResponseCache.cached``. Defaults to ``GLOBAL``.
+
+        Returns:
+            Callable: The decorator.
+        """
+        if scope not in (GLOBAL, TENANT):
+            raise ValueError(f"Invalid coalescing scope {scope!r}")
+
+        def decorator(func):
+            @wraps(func)
+            def decorated(*args, **kwargs):
+                identity, _ = resource_key(scope, kwargs)
+                return self.do(identity, lambda: unpack(func(*args, **kwargs)), metric=identity[0])
+
+            return decorated
+
+        return decorator
+
+
+single_flight = SingleFlight()
@@ -0,0 +1,308 @@
+import numbers
+import re
+from http import HTTPStatus
+from itertools import count
+
+from flask_restx import Model as RestxModel
+from flask_restx.errors import abort
+from jsonschema import Draft4Validator, FormatError, ValidationError, validators
+from jsonschema._utils import ensure_list, extras_msg, types_msg, unbool
+
+_PATTERNS = {}
+_TYPE_CHECKS = {
+    "array": "isinstance({value}, list)",
+    "boolean": "isinstance({value}, bool)",
+    "integer": "(isinstance({value}, int) and not isinstance({value}, bool))",
+    "null": "{value} is None",
+    "number": "(isinstance({value}, _Number) and not isinstance({value}, bool))",
+    "object": "isinstance({value}, dict)",
+    "string": "isinstance({value}, str)",
+}
+_ANNOTATED_KEYWORDS = {"exclusiveMaximum", "exclusiveMinimum"}
+
+
+def _compiled_pattern(pattern: str) -> re.Pattern:
+    if (compiled := _PATTERNS.get(pattern)) is None:
+        compiled = _PATTERNS[pattern] = re.compile(pattern)
+    return compiled
+
+
+def _pattern(validator, pattern, instance, schema):
+    if validator.is_type(instance, "string") and not _compiled_pattern(pattern).search(instance):
+        yield ValidationError("%r does not match %r" % (instance, pattern))
+
+
+def _not_in_enum(instance, enums) -> bool:
+    if instance == 0 or instance == 1:
+        unbooled = unbool(instance)
+        return all(unbooled != unbool(each) for each in enums)
+    return instance not in enums
+
+
+PayloadValidator = validators.extend(Draft4Validator, {"pattern": _pattern})
+
+
+def compile_schema(schema, resolver=None, _resolving=()):
+    """
+    Prepare a JSON schema for repeated validation.
+
+    Local ``$ref``s are replaced by the schema they point to, so validating does
+    not go through the resolver, keywords without a validator (descriptions,
+    examples, ...) are dropped, and ``pattern`` regexes are compiled.
+    References to a schema being inlined are kept, so recursive models still work
+    with the resolver.
+
+    Args:
+        schema: The JSON schema of a model.
+        resolver (RefResolver, optional): Resolver of the ``$ref``s. Defaults to None.
+
+    Returns:
+        The schema ready to be given to ``PayloadValidator`` or ``ValidatorCompiler``.
+    """
+    if isinstance(schema, list):
+        return [compile_schema(item, resolver, _resolving) for item in schema]
+    if not isinstance(schema, dict):
+        return schema
+
+    if (ref := schema.get("$ref")) is not None:
+        if resolver is None or ref in _resolving:
+            return {"$ref": ref}
+        _, resolved = resolver.resolve(ref)
+        return compile_schema(resolved, resolver, _resolving + (ref,))
+
+    compiled = {}
+    for keyword, value in schema.items():
+        if keyword not in PayloadValidator.VALIDATORS and keyword not in _ANNOTATED_KEYWORDS:
+            continue
+        if keyword == "pattern":
+            _compiled_pattern(value)
+        elif keyword in ("properties", "patternProperties", "definitions", "dependencies"):
+            value = {name: compile_schema(subschema, resolver, _resolving) for name, subschema in value.items()}
+        elif keyword in ("items", "additionalItems", "additionalProperties", "not", "allOf", "anyOf", "oneOf"):
+            value = compile_schema(value, resolver, _resolving)
+        compiled[keyword] = value
+    return compiled
+
+
+class UnsupportedSchema(Exception):
+    """Raised by ``ValidatorCompiler`` for keywords it does not generate code for."""
+
+
+class ValidatorCompiler:
+    """
+    Turns a prepared JSON schema into Python functions reporting the errors ``Draft4Validator`` would.
+
+    Covers the keywords restx models produce: ``type``, ``properties``,
+    ``required``, ``additionalProperties``, ``minLength``, ``maxLength``,
+    ``pattern``, ``enum``, ``minimum``, ``maximum``, ``items``, ``allOf`` and
+    ``format``. Errors come out in the order of ``iter_errors``, with the same
+    messages, so ``Model.validate`` answers exactly like restx does.
+
+    Raises:
+        UnsupportedSchema: When the schema uses any other keyword.
+    """
+
+    def __init__(self, format_checker=None):
+        self.format_checker = format_checker
+        self._globals = {
+            "_FormatError": FormatError,
+            "_Number": numbers.Number,
+            "_extras_msg": extras_msg,
+            "_format_checker": format_checker,
+            "_not_in_enum": _not_in_enum,
+            "_types_msg": types_msg,
+        }
+        self._ids = count()
+
+    def compile(self, schema):
+        """
+        Compile a schema.
+
+        Args:
+            schema (dict): A schema prepared by ``compile_schema``.
+
+        Returns:
+            Callable: A function taking an instance and returning its errors as
+            ``(path, message)`` tuples, or None when the instance is valid.
+        """
+        return self._globals[self._function(schema)]
+
+    def _constant(self, value) -> str:
+        name = f"_c{next(self._ids)}"
+        self._globals[name] = value
+        return name
+
+    def _function(self, schema) -> str:
+        if not isinstance(schema, dict):
+            raise UnsupportedSchema(schema)
+
+        name = f"_validate_{next(self._ids)}"
+        lines = [f"def {name}(x):", "    errors = []"]
+        for keyword, value in schema.items():
+            if keyword in _ANNOTATED_KEYWORDS:
+                continue
+            method = getattr(self, f"_{keyword}", None)
+            if method is None:
+                raise UnsupportedSchema(keyword)
+            lines.extend(f"    {line}" for line in method(value, schema))
+        lines.append("    return errors or None")
+
+        exec(compile("\n".join(lines), f"<validator {name}>", "exec"), self._globals)
+        return name
+
+    def _descend(self, schema, value: str, path: str = None) -> list:
+        function = self._function(schema)
+        if path is None:
+            return [f"if e := {function}({value}):", "    errors.extend(e)"]
+        return [f"if e := {function}({value}):", f"    errors.extend((({path},) + p, m) for p, m in e)"]
+
+    def _type(self, types, schema) -> list:
+        types = ensure_list(types)
+        if any(type_ not in _TYPE_CHECKS for type_ in types):
+            raise UnsupportedSchema("type")
+        check = " or ".join(_TYPE_CHECKS[type_].format(value="x") for type_ in types)
+        return [f"if not ({check}):", f"    errors.append(((), _types_msg(x, {self._constant(types)})))"]
+
+    def _properties(self, properties, schema) -> list:
+        lines = ["if isinstance(x, dict):"]
+        for property, subschema in properties.items():
+            lines.append(f"    if {property!r} in x:")
+            lines.extend(f"        {line}" for line in self._descend(subschema, f"x[{property!r}]", repr(property)))
+        return lines if len(lines) > 1 else []
+
+    def _required(self, required, schema) -> list:
+        return [
+            "if isinstance(x, dict):",
+            f"    for name in {self._constant(list(required))}:",
+            "        if name not in x:",
+            "            errors.append(((name,), '%r is a required property' % name))",
+        ]
+
+    def _additionalProperties(self, additional, schema) -> list:
+        if "patternProperties" in schema:
+            raise UnsupportedSchema("patternProperties")
+        properties = self._constant(set(schema.get("properties", {})))
+        lines = ["if isinstance(x, dict):", f"    extras = set(p for p in x if p not in {properties})"]
+        if isinstance(additional, dict):
+            lines.append("    for extra in extras:")
+            lines.extend(f"        {line}" for line in self._descend(additional, "x[extra]", "extra"))
+        elif not additional:
+            lines.extend([
+                "    if extras:",
+                "        errors.append(((), 'Additional properties are not allowed (%s %s unexpected)' % _extras_msg(extras)))",
+            ])
+        else:
+            return []
+        return lines
+
+    def _maxLength(self, length, schema) -> list:
+        return [f"if isinstance(x, str) and len(x) > {length!r}:", "    errors.append(((), '%r is too long' % (x,)))"]
+
+    def _minLength(self, length, schema) -> list:
+        return [f"if isinstance(x, str) and len(x) < {length!r}:", "    errors.append(((), '%r is too short' % (x,)))"]
+
+    def _pattern(self, pattern, schema) -> list:
+        compiled = self._constant(_compiled_pattern(pattern))
+        return [
+            f"if isinstance(x, str) and not {compiled}.search(x):",
+            f"    errors.append(((), '%r does not match %r' % (x, {pattern!r})))",
+        ]
+
+    def _enum(self, enums, schema) -> list:
+        enums = self._constant(enums)
+        return [f"if _not_in_enum(x, {enums}):", f"    errors.append(((), '%r is not one of %r' % (x, {enums})))"]
+
+    def _minimum(self, minimum, schema) -> list:
+        operator, comparison = ("<=", "less than or equal to") if schema.get("exclusiveMinimum", False) else ("<", "less than")
+        return self._bound(minimum, operator, f"{comparison} the minimum")
+
+    def _maximum(self, maximum, schema) -> list:
+        operator, comparison = (">=", "greater than or equal to") if schema.get("exclusiveMaximum", False) else (">", "greater than")
+        return self._bound(maximum, operator, f"{comparison} the maximum")
+
+    def _bound(self, bound, operator: str, description: str) -> list:
+        bound = self._constant(bound)
+        return [
+            f"if {_TYPE_CHECKS['number'].format(value='x')} and x {operator} {bound}:",
+            f"    errors.append(((), '%r is {description} of %r' % (x, {bound})))",
+        ]
+
+    def _items(self, items, schema) -> list:
+        if not isinstance(items, dict):
+            raise UnsupportedSchema("items")
+        return [
+            "if isinstance(x, list):",
+            "    for index, item in enumerate(x):",
+            *(f"        {line}" for line in self._descend(items, "item", "index")),
+        ]
+
+    def _allOf(self, schemas, schema) -> list:
+        return [line for subschema in schemas for line in self._descend(subschema, "x")]
+
+    def _format(self, format_, schema) -> list:
+        if self.format_checker is None:
+            return []
+        return [
+            "try:",
+            f"    _format_checker.check(x, {format_!r})",
+            "except _FormatError as error:",
+            "    errors.append(((), error.message))",
+        ]
+
+
+class Model(RestxModel):
+    """
+    ``flask_restx.Model`` keeping a compiled validator of its schema.
+
+    restx builds a new ``Draft4Validator`` and walks the ``$ref``s of the model
+    on every validated request. The schema is prepared once per resolver and
+    format checker instead, and compiled by ``ValidatorCompiler``; schemas it
+    does not support are validated by a cached ``PayloadValidator``.
+    """
+
+    def validator(self, resolver=None, format_checker=None):
+        """
+        Get the validator of the model, compiling it on first use.
+
+        Args:
+            resolver (RefResolver, optional): Resolver of the API schema. Defaults to None.
+            format_checker (FormatChecker, optional): Checker of the ``format`` keywords. Defaults to None.
+
+        Returns:
+            Callable: A function taking the payload and returning its errors as
+            ``(key, message)`` tuples, or None when the payload is valid.
+        """
+        validators = self.__dict__.setdefault("_validators", {})
+        key = (id(resolver), id(format_checker))
+        if key not in validators:
+            schema = compile_schema(self.__schema__, resolver)
+            try:
+                check = ValidatorCompiler(format_checker).compile(schema)
+            except UnsupportedSchema:
+                payload_validator = PayloadValidator(schema, resolver=resolver, format_checker=format_checker)
+                validators[key] = (resolver, format_checker, self._iter_errors(payload_validator))
+            else:
+                validators[key] = (resolver, format_checker, self._format_errors(check))
+        return validators[key][2]
+
+    def _iter_errors(self, validator):
+        def errors(data):
+            return [self.format_error(error) for error in validator.iter_errors(data)] or None
+
+        return errors
+
+    @staticmethod
+    def _format_errors(check):
+        def errors(data):
+            if found := check(data):
+                return [(".".join(str(part) for part in path), message) for path, message in found]
+
+        return errors
+
+    def validate(self, data, resolver=None, format_checker=None):
+        if errors := self.validator(resolver, format_checker)(data):
+            abort(
+                HTTPStatus.BAD_REQUEST,
+                message="Input payload validation failed",
+                errors=dict(errors),
+            )
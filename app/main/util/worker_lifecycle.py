@@ -0,0 +1,41 @@
+from .. import db
+from ..service import aws_service
+from ..service.auth_service import last_logins
+from .background import wait_for_background_jobs
+from .replicas import replica_router
+from .revocation import revocations
+
+
+def after_fork(app) -> None:
+    """
+    Reset what a worker process must not share with the process it was forked from.
+
+    The connections of the engines, primary and replicas, belong to the parent:
+    they are dropped without being closed, so the parent's sockets are left
+    alone and the worker opens its own. The S3 clients are built again for the same reason.
+
+    Args:
+        app (Flask): The app loaded before the fork.
+    """
+    with app.app_context():
+        db.engine.dispose(close=False)
+        replica_router.dispose()
+    aws_service.reset_clients()
+
+
+def before_exit(app) -> None:
+    """
+    Finish the work a worker keeps in memory, when it is recycled or shut down.
+
+    The buffered login times are written, the revocation reloads stop and the
+    queued background jobs are waited for.
+
+    Args:
+        app (Flask): The app of the worker.
+    """
+    revocations.stop()
+    try:
+        last_logins.stop()
+    except Exception:
+        app.logger.exception("Failed to write the buffered login times")
+    wait_for_background_jobs()
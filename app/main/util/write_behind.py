@@ -0,0 +1,96 @@
+import atexit
+from threading import Event, Lock, Thread
+
+from flask import current_app
+from sqlalchemy import bindparam, update
+
+from .. import db
+
+
+class WriteBehindBuffer:
+    """
+    Buffers the new values of one column and writes them in batches.
+
+    Values are kept in memory, the latest one per row, and written by a daemon
+    thread every ``interval`` seconds with a single ``executemany`` ``UPDATE`` in
+    its own transaction. Columns with an ``onupdate``, like ``updated_at``, are
+    left untouched, so the rows do not look modified to conditional requests.
+    Values not yet written are lost if the process is killed: only use it for
+    data that tolerates it, like the time of the last login.
+
+    Attributes:
+        column: The column written, of a table whose primary key is ``id``.
+        interval (float): Seconds between writes. 0 disables the buffer.
+    """
+
+    def __init__(self, column, interval: float):
+        """
+        Initialize the WriteBehindBuffer instance.
+
+        Args:
+            column: The column written, of a table whose primary key is ``id``.
+            interval (float): Seconds between writes. 0 disables the buffer.
+        """
+        self.column = column
+        self.interval = interval
+        self._pending = {}
+        self._lock = Lock()
+        self._app = None
+        self._stopped = Event()
+
+    def add(self, row_id: int, value) -> None:
+        """
+        Buffer the new value of a row, starting the writer thread on first use.
+
+        Args:
+            row_id (int): The id of the row.
+            value: Its new value.
+        """
+        if not self.interval:
+            return
+        with self._lock:
+            self._pending[row_id] = value
+            if self._app is None:
+                self._start(current_app._get_current_object())
+
+    def _start(self, app) -> None:
+        self._app = app
+        Thread(target=self._run, name=f"write-behind-{self.column}", daemon=True).start()
+        atexit.register(self.flush)
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self.interval):
+            try:
+                self.flush()
+            except Exception:
+                self._app.logger.exception("Failed to write %s", self.column)
+
+    def flush(self) -> int:
+        """
+        Write the buffered values now.
+
+        Returns:
+            int: The number of rows written.
+        """
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return 0
+
+        table = self.column.table
+        values = {column.key: column for column in table.columns if column.onupdate is not None}
+        values[self.column.key] = bindparam("new_value")
+        statement = update(table).where(table.c.id == bindparam("row_id")).values(values)
+        try:
+            with self._app.app_context(), db.engine.begin() as connection:
+                connection.execute(statement, [{"row_id": row_id, "new_value": value} for row_id, value in pending.items()])
+        except Exception:
+            with self._lock:
+                self._pending = {**pending, **self._pending}
+            raise
+        return len(pending)
+
+    def stop(self) -> None:
+        """Stop the writer thread after writing the buffered values."""
+        self._stopped.set()
+        self.flush()
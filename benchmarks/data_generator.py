@@ -0,0 +1,162 @@
+import random
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+
+from pycpfcnpj import gen
+
+from app.main import db
+from app.main.model import Address, Document, Employee, Institute, Student, User
+from app.main.model.student import Gender
+from app.main.model.user import Profile
+from app.main.service.auth_service import generate_hashed_password
+
+PASSWORD = "@String0"
+
+_FIRST_NAMES = ["Ana", "Bruno", "Carla", "Diego", "Elisa", "Felipe", "Gabriela", "Heitor", "Iara", "João"]
+_LAST_NAMES = ["Almeida", "Barbosa", "Costa", "Dias", "Ferreira", "Gomes", "Lima", "Moreira", "Rocha", "Souza"]
+_CITIES = [("CE", "Fortaleza"), ("CE", "Sobral"), ("SP", "Campinas"), ("SP", "Santos"), ("RJ", "Niterói"), ("BA", "Salvador")]
+_CHUNK_SIZE = 1000
+
+
+@dataclass
+class Dataset:
+    """
+    Identifiers of the generated rows, used by the scenarios to build requests.
+
+    Attributes:
+        institute_ids (list[int]): Generated institutes.
+        admin_ids (list[int]): Institute admin users, one per institute.
+        employee_ids (list[int]): Employee users (admins excluded).
+        student_user_ids (list[int]): Users of students with a document.
+        undocumented_student_user_ids (list[int]): Users of students without a document.
+        student_ids (list[int]): All generated students.
+        student_emails (list[str]): Emails of every student user.
+    """
+    institute_ids: list = field(default_factory=list)
+    admin_ids: list = field(default_factory=list)
+    employee_ids: list = field(default_factory=list)
+    student_user_ids: list = field(default_factory=list)
+    undocumented_student_user_ids: list = field(default_factory=list)
+    student_ids: list = field(default_factory=list)
+    student_emails: list = field(default_factory=list)
+
+
+def _phone_number(rng: random.Random) -> str:
+    return "".join(rng.choice("123456789") for _ in range(2)) + "9" + rng.choice("123456789") + f"{rng.randrange(10 ** 7):07d}"
+
+
+def _name(rng: random.Random) -> str:
+    return f"{rng.choice(_FIRST_NAMES)} {rng.choice(_LAST_NAMES)}"
+
+
+def _address(rng: random.Random, **kwargs) -> Address:
+    state, city = rng.choice(_CITIES)
+    return Address(
+        postal_code=f"{rng.randrange(10 ** 8):08d}",
+        country="Brasil",
+        state=state,
+        city=city,
+        neighborhood="Centro",
+        street=f"Rua {rng.choice(_LAST_NAMES)}",
+        number=str(rng.randint(1, 9999)),
+        **kwargs,
+    )
+
+
+def _user(rng: random.Random, email: str, profile: Profile, password: str) -> User:
+    return User(
+        email=email,
+        password=password,
+        name=_name(rng),
+        phone_number=_phone_number(rng),
+        activation_status=True,
+        profile=profile,
+    )
+
+
+def generate_dataset(
+    institutes: int,
+    employees: int,
+    students: int,
+    seed: int = 42,
+    document_ratio: float = 0.5,
+) -> Dataset:
+    """
+    Populate the database with a deterministic synthetic dataset.
+
+    Every institute gets one admin, ``employees`` employees and ``students`` students,
+    each student with an address and, for ``document_ratio`` of them, a document.
+    All users are active and share the password ``PASSWORD``.
+
+    Args:
+        institutes (int): Number of institutes.
+        employees (int): Employees per institute, besides the admin.
+        students (int): Students per institute.
+        seed (int, optional): Seed of the random generators. Defaults to 42.
+        document_ratio (float, optional): Fraction of students with a document. Defaults to 0.5.
+
+    Returns:
+        Dataset: Identifiers of the generated rows.
+    """
+    rng = random.Random(seed)
+    random.seed(seed)
+    password = generate_hashed_password(PASSWORD)
+    dataset = Dataset()
+    cnpjs = set()
+
+    for institute_index in range(institutes):
+        while (cnpj := gen.cnpj()) in cnpjs:
+            pass
+        cnpjs.add(cnpj)
+
+        domain = f"institute{institute_index}.bench"
+        institute = Institute(
+            cnpj=cnpj,
+            trading_name=f"Institute {institute_index}",
+            corporate_name=f"Institute {institute_index} LTDA",
+            address=_address(rng),
+        )
+        admin = _user(rng, f"admin@{domain}", Profile.INSTITUTE, password)
+        staff = [Employee(user=admin, institute=institute, role="Director")]
+        staff += [
+            Employee(
+                user=_user(rng, f"employee{index}@{domain}", Profile.EMPLOYEE, password),
+                institute=institute,
+                role="Secretary",
+            )
+            for index in range(employees)
+        ]
+        db.session.add(institute)
+        db.session.add_all(staff)
+        db.session.commit()
+
+        dataset.institute_ids.append(institute.id)
+        dataset.admin_ids.append(admin.id)
+        dataset.employee_ids.extend(employee.user_id for employee in staff[1:])
+
+        for start in range(0, students, _CHUNK_SIZE):
+            chunk = []
+            for index in range(start, min(start + _CHUNK_SIZE, students)):
+                email = f"student{index}@{domain}"
+                chunk.append(Student(
+                    birthday_date=date(1995, 1, 1) + timedelta(days=rng.randrange(365 * 15)),
+                    gender=rng.choice(list(Gender)),
+                    disabled_person=rng.random() < 0.1,
+                    user=_user(rng, email, Profile.STUDENT, password),
+                    address=_address(rng),
+                    institute=institute,
+                ))
+            db.session.add_all(chunk)
+            db.session.flush()
+
+            for student in chunk:
+                dataset.student_ids.append(student.id)
+                dataset.student_emails.append(student.user.email)
+                if rng.random() < document_ratio:
+                    student.document = Document(title="School Record", key=f"{student.id}.pdf")
+                    dataset.student_user_ids.append(student.user_id)
+                else:
+                    dataset.undocumented_student_user_ids.append(student.user_id)
+            db.session.commit()
+
+    return dataset
@@ -0,0 +1,42 @@
+import os
+import tempfile
+
+
+def configure_environment(database_uri: str = None) -> str:
+    """
+    Point the application at a disposable database and local document storage.
+
+    Must run before ``app`` is imported, since the configuration is read at import time.
+
+    Args:
+        database_uri (str, optional): Database to use. Defaults to a temporary SQLite file.
+
+    Returns:
+        str: The database URI in use.
+    """
+    os.environ["ENV_NAME"] = "test"
+    os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+    os.environ.setdefault("LOCAL_STORAGE_PATH", tempfile.mkdtemp(prefix="institute-bench-storage-"))
+    database_uri = database_uri or "sqlite:///" + os.path.join(tempfile.mkdtemp(prefix="institute-bench-"), "bench.db")
+    os.environ["SQLALCHEMY_DATABASE_URI"] = database_uri
+    return database_uri
+
+
+def reset_database(institutes: int, employees: int, students: int, seed: int):
+    """
+    Re-create the schema and seed it with the synthetic dataset.
+
+    Returns:
+        Dataset: Identifiers of the generated rows.
+    """
+    from app.main import db
+    from app.main.util.api_error import APIError
+    from .data_generator import generate_dataset
+
+    db.session.remove()
+    db.drop_all()
+    db.create_all()
+    APIError.add_errors_to_database()
+    dataset = generate_dataset(institutes, employees, students, seed=seed)
+    db.session.remove()
+    return dataset
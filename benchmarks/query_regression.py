@@ -0,0 +1,179 @@
+"""
+Replay every documented route against a seeded database and compare its SQL with a baseline.
+
+Usage (from the repository root):
+
+    python -m benchmarks.query_regression                     # compare with the baseline
+    python -m benchmarks.query_regression --update-baseline   # accept the current queries
+
+The run fails (exit code 1) when a route executes more statements than the committed
+baseline, when a route has no replay case, or when a request answers with a 5xx.
+On PostgreSQL every SELECT is also explained with sequential scans disabled, and any
+``Seq Scan`` on a watched table that is not in the baseline is reported as a failure,
+since it means no index can serve the query.
+"""
+import argparse
+import json
+import os
+import re
+import sys
+
+from .environment import configure_environment, reset_database
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "query_baseline.json")
+WATCHED_TABLES = {"students", "users", "employees", "address"}
+IGNORED_ENDPOINTS = {"api.root", "api.specs", "api.doc"}
+
+_SEQ_SCAN = re.compile(r"Seq Scan on (\w+)")
+
+
+def documented_routes(app) -> set:
+    """
+    List the routes registered by the API blueprint.
+
+    Returns:
+        set[str]: Routes as ``"<METHOD> <rule>"``, with repeated slashes merged.
+    """
+    return {
+        f"{method} {re.sub('/+', '/', rule.rule)}"
+        for rule in app.url_map.iter_rules()
+        if rule.endpoint.startswith("api.") and rule.endpoint not in IGNORED_ENDPOINTS
+        for method in rule.methods - {"HEAD", "OPTIONS"}
+    }
+
+
+def sequential_scans(connection, statements: list, parameters: list) -> list:
+    """
+    Explain the SELECT statements on PostgreSQL and collect sequential scans on watched tables.
+
+    Sequential scans are disabled while planning, so a remaining ``Seq Scan`` means the
+    table has no index able to serve the query.
+
+    Returns:
+        list[str]: Sorted names of the scanned tables.
+    """
+    tables = set()
+    for statement, params in zip(statements, parameters):
+        if params is None or not statement.lstrip().upper().startswith("SELECT"):
+            continue
+        transaction = connection.begin()
+        try:
+            connection.exec_driver_sql("SET LOCAL enable_seqscan = off")
+            plan = connection.exec_driver_sql(f"EXPLAIN {statement}", params).scalars().all()
+        finally:
+            transaction.rollback()
+        tables.update(table for line in plan for table in _SEQ_SCAN.findall(line) if table in WATCHED_TABLES)
+    return sorted(tables)
+
+
+def replay(app, dataset, explain: bool) -> dict:
+    """
+    Replay every case and record its statements.
+
+    Returns:
+        dict: Per route, the status code, statement count, normalized statements and,
+        when ``explain`` is set, the watched tables read with a sequential scan.
+    """
+    from app.main import db
+    from app.main.util.query_recorder import QueryRecorder
+    from .replay_cases import CASES, ReplayContext
+
+    client = app.test_client()
+    results = {}
+    with app.app_context():
+        context = ReplayContext(dataset)
+        db.session.remove()
+        engine = db.engine
+
+    for route, build in CASES:
+        with app.app_context():
+            request = build(context)
+        with QueryRecorder(engine) as recorder:
+            response = client.open(request.path, method=request.method, headers=request.headers, data=request.body)
+            response.get_data()  # consume streamed bodies
+        response.close()
+        with app.app_context():
+            db.session.remove()
+
+        results[route] = {
+            "status": response.status_code,
+            "count": recorder.count,
+            "statements": recorder.normalized,
+        }
+        if explain:
+            with engine.connect() as connection:
+                results[route]["seq_scans"] = sequential_scans(connection, recorder.statements, recorder.parameters)
+    return results
+
+
+def compare(results: dict, baseline: dict, routes: set) -> list:
+    """
+    Compare a replay with the baseline.
+
+    Returns:
+        list[str]: Human readable failures, empty when the replay is acceptable.
+    """
+    from .replay_cases import CASES
+
+    failures = [f"{route}: no replay case" for route in sorted(routes - {route for route, _ in CASES})]
+
+    for route, result in results.items():
+        if result["status"] >= 500:
+            failures.append(f"{route}: answered {result['status']}")
+
+        if (expected := baseline.get(route)) is None:
+            failures.append(f"{route}: not in baseline, run with --update-baseline")
+            continue
+
+        if result["count"] > expected["count"]:
+            new_statements = [s for s in result["statements"] if s not in expected["statements"]]
+            failures.append(
+                f"{route}: {result['count']} statements, baseline allows {expected['count']}"
+                + "".join(f"\n    + {statement}" for statement in new_statements)
+            )
+
+        if "seq_scans" in result:
+            if new_scans := set(result["seq_scans"]) - set(expected.get("seq_scans", [])):
+                failures.append(f"{route}: new sequential scans on {', '.join(sorted(new_scans))}")
+    return failures
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Query-count and query-plan regression check")
+    parser.add_argument("--database-uri", default=None, help="Database to replay against (default: temporary SQLite file)")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--update-baseline", action="store_true", help="Write the current replay as the new baseline")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args(argv)
+
+    database_uri = configure_environment(args.database_uri)
+
+    from api import app
+
+    with app.app_context():
+        dataset = reset_database(institutes=2, employees=3, students=15, seed=args.seed)
+
+    results = replay(app, dataset, explain=database_uri.startswith("postgresql"))
+
+    if args.update_baseline:
+        with open(args.baseline, "w") as file:
+            json.dump(results, file, indent=2, sort_keys=True)
+            file.write("\n")
+        print(f"Baseline written to {args.baseline} ({len(results)} routes)")
+        return 0
+
+    with open(args.baseline) as file:
+        baseline = json.load(file)
+
+    for route, result in results.items():
+        expected = baseline.get(route, {}).get("count")
+        print(f"{result['status']} {result['count']:>4} (baseline {expected}) {route}")
+
+    if failures := compare(results, baseline, documented_routes(app)):
+        print("\nQuery regressions:", *failures, sep="\n  ", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,190 @@
+"""
+Replay cases for ``benchmarks.query_regression``, one per documented route, plus
+a few more for parameter combinations that once failed, named after their route.
+
+Cases run in order against the same database, so the ones that create rows come
+before the ones that consume them. Every route registered by the API blueprint
+must have a case here.
+"""
+import json
+from io import BytesIO
+
+from .data_generator import PASSWORD
+from .scenarios import build_request
+
+_PDF = b"%PDF-1.4\n%%EOF\n"
+
+
+class ReplayContext:
+    """Dataset identifiers plus helpers shared by the replay cases."""
+
+    def __init__(self, dataset):
+        from app.main.model import User
+
+        self.dataset = dataset
+        self.admin = dataset.admin_ids[0]
+        self.other_admin = dataset.admin_ids[-1]
+        self.students = list(dataset.student_user_ids)
+        self.undocumented = list(dataset.undocumented_student_user_ids)
+        self.employees = list(dataset.employee_ids)
+        self._emails = {user.id: user.email for user in User.query.all()}
+
+    def email(self, user_id: int) -> str:
+        return self._emails[user_id]
+
+    def token(self, purpose: str, **claims) -> str:
+        from app.main.service.token_service import generate_token
+
+        return generate_token(purpose, **claims)
+
+    def user_token(self, purpose: str, email: str) -> str:
+        # Looked up when the case is built: the user may have been created by an earlier case
+        from app.main.model import User
+        from app.main.service.token_service import generate_user_token
+
+        return generate_user_token(purpose, User.query.filter_by(email=email).one())
+
+    def job(self, user_id: int) -> str:
+        from app.main import db
+        from app.main.model import Job
+        from app.main.model.job import JobStatus
+
+        job = Job(kind="PURGE_INSTITUTE", status=JobStatus.RUNNING, user_id=user_id, target_id=0, processed=10, total=20)
+        db.session.add(job)
+        db.session.commit()
+        return job.id
+
+
+def _document(title: str = "School Record") -> dict:
+    return {"json": json.dumps({"title": title}), "file": (BytesIO(_PDF), "record.pdf")}
+
+
+def _institute_address() -> dict:
+    return {
+        "country": "Brasil",
+        "state": "CE",
+        "city": "Fortaleza",
+        "postal_code": "60000000",
+        "neighborhood": "Centro",
+        "street": "Rua A",
+        "number": "10",
+    }
+
+
+def _student_put() -> dict:
+    return {
+        "gender": "NON_BINARY",
+        "disabled_person": False,
+        "birthday_date": "2001-02-03",
+        "user": {"name": "Updated Student", "phone_number": "85999999999"},
+        "address": {"country": "Brasil", "state": "CE", "city": "Sobral"},
+    }
+
+
+# Keyed by "<METHOD> <rule>".
+CASES = [
+    ("POST /api/auth/login", lambda ctx: build_request(
+        "POST", "/api/auth/login", json={"email": ctx.email(ctx.students[0]), "password": PASSWORD})),
+    ("GET /api/auth/activation/<string:token>", lambda ctx: build_request(
+        "GET", f"/api/auth/activation/{ctx.user_token('activation', ctx.email(ctx.students[0]))}")),
+    ("POST /api/institute/invite/employee/", lambda ctx: build_request(
+        "POST", "/api/institute/invite/employee/", ctx.admin, json={
+            "name": "Invited Employee", "phone_number": "85999999999",
+            "email": "invited@institute0.bench", "role": "Teacher"})),
+    ("PUT /api/auth/activation/<string:token>", lambda ctx: build_request(
+        "PUT", f"/api/auth/activation/{ctx.user_token('activation', 'invited@institute0.bench')}",
+        json={"password": PASSWORD, "confirm_password": PASSWORD})),
+    ("GET /api/auth/forgot-password/", lambda ctx: build_request(
+        "GET", f"/api/auth/forgot-password/?token={ctx.user_token('password-reset', ctx.email(ctx.students[1]))}")),
+    ("POST /api/auth/forgot-password/", lambda ctx: build_request(
+        "POST", "/api/auth/forgot-password/", json={"email": ctx.email(ctx.students[1])})),
+    ("PUT /api/auth/forgot-password/", lambda ctx: build_request(
+        "PUT", f"/api/auth/forgot-password/?token={ctx.user_token('password-reset', ctx.email(ctx.students[1]))}",
+        json={"password": "@String1", "confirm_password": "@String1"})),
+    ("GET /api/health/live", lambda ctx: build_request("GET", "/api/health/live")),
+    ("GET /api/health/ready", lambda ctx: build_request("GET", "/api/health/ready")),
+    ("POST /api/auth/logout", lambda ctx: build_request("POST", "/api/auth/logout", ctx.students[1])),
+    ("PUT /api/auth/password-update", lambda ctx: build_request(
+        "PUT", "/api/auth/password-update", ctx.students[2],
+        json={"old_password": PASSWORD, "new_password": "@String1", "confirm_password": "@String1"})),
+    ("GET /api/document/", lambda ctx: build_request("GET", "/api/document/", ctx.students[0])),
+    ("POST /api/document/", lambda ctx: build_request("POST", "/api/document/", ctx.undocumented[0], data=_document())),
+    ("PUT /api/document/", lambda ctx: build_request(
+        "PUT", "/api/document/", ctx.undocumented[0], data=_document("Updated Record"))),
+    ("DELETE /api/document/", lambda ctx: build_request("DELETE", "/api/document/", ctx.undocumented[0])),
+    ("GET /api/document/filter/", lambda ctx: build_request("GET", "/api/document/filter/?per_page=10", ctx.admin)),
+    ("GET /api/employee/", lambda ctx: build_request("GET", "/api/employee/?per_page=10", ctx.admin)),
+    ("PUT /api/employee/<int:id>", lambda ctx: build_request(
+        "PUT", f"/api/employee/{ctx.employees[0]}", ctx.admin,
+        json={"name": "Updated Employee", "phone_number": "85999999999"})),
+    ("DELETE /api/employee/<int:id>", lambda ctx: build_request(
+        "DELETE", f"/api/employee/{ctx.employees[1]}", ctx.admin)),
+    ("PUT /api/employee/batch", lambda ctx: build_request(
+        "PUT", "/api/employee/batch", ctx.admin, json={"employees": [
+            {"id": id, "name": "Batch Employee", "phone_number": "85999999999"} for id in ctx.employees[:2] + ctx.employees[3:4]
+        ]})),
+    ("DELETE /api/employee/batch", lambda ctx: build_request(
+        "DELETE", f"/api/employee/batch?ids={ctx.employees[0]},{ctx.employees[3]}", ctx.admin)),
+    ("GET /api/error/", lambda ctx: build_request("GET", "/api/error/?per_page=10")),
+    ("GET /api/institute/", lambda ctx: build_request("GET", "/api/institute/?per_page=10", ctx.admin)),
+    ("POST /api/institute/", lambda ctx: build_request("POST", "/api/institute/", json={
+        "cnpj": "11444777000161",
+        "trading_name": "Replay Institute",
+        "corporate_name": "Replay Institute LTDA",
+        "address": _institute_address(),
+        "institute_admin": {
+            "name": "Replay Admin", "phone_number": "85999999999",
+            "email": "admin@replay.bench", "role": "Director"},
+    })),
+    ("PUT /api/institute/", lambda ctx: build_request("PUT", "/api/institute/", ctx.admin, json={
+        "trading_name": "Updated Institute",
+        "corporate_name": "Updated Institute LTDA",
+        "address": _institute_address(),
+    })),
+    ("POST /api/institute/invite/student/", lambda ctx: build_request(
+        "POST", "/api/institute/invite/student/", ctx.admin, json={"email": "invited.student@institute0.bench"})),
+    ("POST /api/institute/invite/student/bulk/", lambda ctx: build_request(
+        "POST", "/api/institute/invite/student/bulk/", ctx.admin, data={"file": (BytesIO(
+            "email\n".encode() + "".join(f"bulk{index}@institute0.bench\n" for index in range(20)).encode()
+            + f"{ctx.email(ctx.students[0])}\n".encode()
+        ), "students.csv")})),
+    ("GET /api/institute/jobs/<string:job_id>", lambda ctx: build_request(
+        "GET", f"/api/institute/jobs/{ctx.job(ctx.admin)}", ctx.admin)),
+    ("GET /api/institute/jobs/status/<string:token>", lambda ctx: build_request(
+        "GET", f"/api/institute/jobs/status/{ctx.token('job', id=ctx.job(ctx.admin))}")),
+    ("GET /api/institute/info", lambda ctx: build_request("GET", "/api/institute/info", ctx.admin)),
+    ("GET /api/institute/export/students", lambda ctx: build_request(
+        "GET", "/api/institute/export/students?format=ndjson", ctx.admin, headers={"Accept-Encoding": "gzip"})),
+    ("POST /api/student/<string:token>", lambda ctx: build_request(
+        "POST", f"/api/student/{ctx.token('student-invite', email='invited.student@institute0.bench', inviter_id=ctx.admin)}",
+        json={**_student_put(), "user": {"name": "Invited Student", "phone_number": "85999999999"}})),
+    ("POST /api/student/import/", lambda ctx: build_request(
+        "POST", "/api/student/import/", ctx.admin, data={"file": (BytesIO("".join(
+            json.dumps({**_student_put(), "email": f"imported{index}@institute0.bench",
+                        "user": {"name": "Imported Student", "phone_number": "85999999999"}}) + "\n"
+            for index in range(20)
+        ).encode()), "students.ndjson")})),
+    ("GET /api/student/", lambda ctx: build_request("GET", "/api/student/?per_page=10", ctx.admin)),
+    # Text filters read the users and address tables, which the selected fields alone would not join
+    ("GET /api/student/ fields=id name=", lambda ctx: build_request(
+        "GET", "/api/student/?per_page=10&fields=id&name=a", ctx.admin)),
+    ("GET /api/student/ fields=id state=", lambda ctx: build_request(
+        "GET", "/api/student/?per_page=10&fields=id&state=a", ctx.admin)),
+    ("GET /api/student/ fields=id,user.name city=", lambda ctx: build_request(
+        "GET", "/api/student/?per_page=10&fields=id,user.name&city=a", ctx.admin)),
+    ("PUT /api/student/", lambda ctx: build_request("PUT", "/api/student/", ctx.students[3], json=_student_put())),
+    ("GET /api/student/batch", lambda ctx: build_request(
+        "GET", f"/api/student/batch?ids={','.join(str(id) for id in ctx.dataset.student_ids[:10])},{max(ctx.dataset.student_ids) + 1}",
+        ctx.admin)),
+    ("POST /api/student/batch", lambda ctx: build_request(
+        "POST", "/api/student/batch", ctx.students[0], json={"ids": ctx.dataset.student_ids[:3]})),
+    ("GET /api/student/<int:id>", lambda ctx: build_request(
+        "GET", f"/api/student/{ctx.dataset.student_ids[0]}", ctx.admin)),
+    ("DELETE /api/student/", lambda ctx: build_request("DELETE", "/api/student/", ctx.students[4])),
+    ("GET /api/user/", lambda ctx: build_request("GET", "/api/user/", ctx.students[0])),
+    ("PUT /api/user/", lambda ctx: build_request(
+        "PUT", "/api/user/", ctx.students[0], json={"name": "Updated User", "phone_number": "85999999999"})),
+    ("PUT /api/user/<int:id>", lambda ctx: build_request("PUT", f"/api/user/{ctx.students[5]}", ctx.admin)),
+    ("DELETE /api/user/", lambda ctx: build_request("DELETE", "/api/user/", ctx.employees[2])),
+    ("DELETE /api/institute/", lambda ctx: build_request("DELETE", "/api/institute/", ctx.other_admin)),
+]
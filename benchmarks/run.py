@@ -0,0 +1,205 @@
+"""
+Run the benchmark scenarios and print a JSON report.
+
+Usage (from the repository root):
+
+    python -m benchmarks.run --students 500 --requests 200 --output bench.json
+
+The database is dropped and re-created before every target, so never point
+``--database-uri`` at a database holding real data.
+"""
+import argparse
+import http.client
+import itertools
+import json
+import math
+import platform
+import subprocess
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from .environment import configure_environment, reset_database
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Institute API benchmarks")
+    parser.add_argument("--database-uri", default=None, help="Database to benchmark (default: temporary SQLite file)")
+    parser.add_argument("--institutes", type=int, default=3)
+    parser.add_argument("--employees", type=int, default=5, help="Employees per institute, besides the admin")
+    parser.add_argument("--students", type=int, default=200, help="Students per institute")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--requests", type=int, default=100, help="Measured requests per scenario")
+    parser.add_argument("--warmup", type=int, default=5, help="Unmeasured requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=4, help="Client threads for the WSGI target")
+    parser.add_argument("--targets", default="client,wsgi", help="Comma separated targets: client, wsgi")
+    parser.add_argument("--scenarios", default=None, help="Comma separated scenario names (default: all)")
+    parser.add_argument("--output", default=None, help="Write the JSON report to this file instead of stdout")
+    return parser.parse_args(argv)
+
+
+def percentile(sorted_values: list, rank: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    index = max(0, math.ceil(rank / 100 * len(sorted_values)) - 1)
+    return sorted_values[index]
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "HEAD"], stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class ClientTarget:
+    """Sends requests through the Flask test client, in process and sequentially."""
+
+    name = "client"
+    concurrency = 1
+
+    def __init__(self, app):
+        self.client = app.test_client()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        pass
+
+    def send(self, request) -> int:
+        response = self.client.open(request.path, method=request.method, headers=request.headers, data=request.body)
+        response.close()
+        return response.status_code
+
+
+class WSGITarget:
+    """Sends requests over HTTP to the app served by a threaded werkzeug WSGI server."""
+
+    name = "wsgi"
+
+    def __init__(self, app, concurrency: int):
+        from werkzeug.serving import WSGIRequestHandler, make_server
+
+        class QuietRequestHandler(WSGIRequestHandler):
+            def log_request(self, *args, **kwargs):
+                pass
+
+        self.concurrency = concurrency
+        self.server = make_server("127.0.0.1", 0, app, threaded=True, request_handler=QuietRequestHandler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.server.shutdown()
+        self.thread.join()
+
+    def send(self, request) -> int:
+        connection = http.client.HTTPConnection("127.0.0.1", self.server.server_port)
+        try:
+            connection.request(request.method, request.path, body=request.body, headers=request.headers)
+            response = connection.getresponse()
+            response.read()
+            return response.status
+        finally:
+            connection.close()
+
+
+def run_scenario(target, scenario, dataset, recorder, requests: int, warmup: int) -> dict:
+    """
+    Replay a scenario against a target and summarize latencies and query counts.
+
+    Returns:
+        dict: Latency percentiles in milliseconds, throughput, queries per request, status
+        codes and the requests that shared the execution of an identical concurrent one.
+    """
+    from app.main.util.single_flight import single_flight
+
+    batch = list(itertools.islice(scenario.factory(dataset), warmup + requests))
+    for request in batch[:warmup]:
+        target.send(request)
+    measured = batch[warmup:]
+
+    def timed_send(request):
+        start = time.perf_counter()
+        status = target.send(request)
+        return (time.perf_counter() - start) * 1000, status
+
+    recorder.reset()
+    single_flight.reset_stats()
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=target.concurrency) as executor:
+        results = list(executor.map(timed_send, measured))
+    elapsed = time.perf_counter() - started
+
+    latencies = sorted(latency for latency, _ in results)
+    return {
+        "requests": len(results),
+        "p50_ms": percentile(latencies, 50),
+        "p95_ms": percentile(latencies, 95),
+        "p99_ms": percentile(latencies, 99),
+        "mean_ms": sum(latencies) / len(latencies) if latencies else None,
+        "throughput_rps": len(results) / elapsed if elapsed else None,
+        "queries_per_request": recorder.count / len(results) if results else None,
+        "status_codes": dict(Counter(str(status) for _, status in results)),
+        "coalesced": sum(stats["coalesced"] for stats in single_flight.stats().values()),
+    }
+
+
+def main(argv=None) -> dict:
+    args = parse_args(argv)
+
+    database_uri = configure_environment(args.database_uri)
+
+    from api import app
+    from app.main import db
+    from app.main.util.query_recorder import QueryRecorder
+    from .scenarios import SCENARIOS
+
+    selected = set(args.scenarios.split(",")) if args.scenarios else None
+    scenarios = [scenario for scenario in SCENARIOS if selected is None or scenario.name in selected]
+
+    report = {
+        "meta": {
+            "revision": git_revision(),
+            "python": platform.python_version(),
+            "dialect": database_uri.split(":", 1)[0],
+            "seed": args.seed,
+            "institutes": args.institutes,
+            "employees": args.employees,
+            "students": args.students,
+            "requests": args.requests,
+            "warmup": args.warmup,
+            "concurrency": args.concurrency,
+        },
+        "results": {},
+    }
+
+    for target_name in args.targets.split(","):
+        with app.app_context():
+            dataset = reset_database(args.institutes, args.employees, args.students, args.seed)
+            recorder = QueryRecorder(db.engine)
+
+        target = ClientTarget(app) if target_name == "client" else WSGITarget(app, args.concurrency)
+        with target, recorder:
+            report["results"][target_name] = {
+                scenario.name: run_scenario(target, scenario, dataset, recorder, args.requests, args.warmup)
+                for scenario in scenarios
+            }
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(output + "\n")
+    else:
+        print(output)
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+import itertools
+import json
+from dataclasses import dataclass
+from datetime import timedelta
+from io import BytesIO
+from typing import Callable, Iterator
+
+from werkzeug.test import EnvironBuilder
+
+from app.main.util.auth_utils import generate_auth_token
+from .data_generator import PASSWORD, Dataset
+
+_PDF = b"%PDF-1.4\n1 0 obj<<>>endobj\ntrailer<<>>\n%%EOF\n"
+_REVALIDATED_SINCE = "Fri, 01 Jan 2100 00:00:00 GMT"
+
+
+@dataclass
+class BenchmarkRequest:
+    """A fully encoded request, replayable against the test client or a real server."""
+    method: str
+    path: str
+    headers: dict
+    body: bytes = b""
+
+
+@dataclass
+class Scenario:
+    """
+    A named stream of requests.
+
+    Attributes:
+        name (str): Scenario name used in the report.
+        factory (Callable[[Dataset], Iterator[BenchmarkRequest]]): Builds the requests from the dataset.
+    """
+    name: str
+    factory: Callable[[Dataset], Iterator[BenchmarkRequest]]
+
+
+def build_request(method: str, path: str, user_id: int = None, **kwargs) -> BenchmarkRequest:
+    """
+    Encode a request once so every target sends exactly the same bytes.
+
+    Args:
+        method (str): HTTP method.
+        path (str): Path including the query string.
+        user_id (int, optional): User to authenticate as. Defaults to None.
+        **kwargs: ``headers``, ``json`` or ``data`` arguments accepted by ``werkzeug.test.EnvironBuilder``.
+
+    Returns:
+        BenchmarkRequest: The encoded request.
+    """
+    headers = dict(kwargs.pop("headers", {}))
+    if user_id is not None:
+        headers["Authorization"] = generate_auth_token(timedelta(hours=1), user_id)
+
+    environ = EnvironBuilder(path=path, method=method, headers=headers, **kwargs).get_environ()
+    body = environ["wsgi.input"].read()
+    if content_type := environ.get("CONTENT_TYPE"):
+        headers["Content-Type"] = content_type
+    return BenchmarkRequest(method, path, headers, body)
+
+
+def _login(dataset: Dataset) -> Iterator[BenchmarkRequest]:
+    for email in itertools.cycle(dataset.student_emails):
+        yield build_request("POST", "/api/auth/login", json={"email": email, "password": PASSWORD})
+
+
+def _student_list(dataset: Dataset) -> Iterator[BenchmarkRequest]:
+    pages = max(1, len(dataset.student_ids) // 10)
+    for admin_id, page in zip(itertools.cycle(dataset.admin_ids), itertools.cycle(range(1, pages + 1))):
+        yield build_request("GET", f"/api/student/?page={page}&per_page=10", admin_id)
+
+
+def _student_list_burst(dataset: Dataset) -> Iterator[BenchmarkRequest]:
+    request = build_request("GET", "/api/student/?page=1&per_page=10", dataset.admin_ids[0])
+    yield from itertools.repeat(request)
+
+
+def _student_list_filtered(dataset: Dataset) -> Iterator[BenchmarkRequest]:
+    query = "per_page=10&gender=CIS_FEMALE&date_lower=2000-01-01&date_upper=2005-12-31&sort=-birthday_date,id"
+    for admin_id in itertools.cycle(dataset.admin_ids):
+        yield build_request("GET", f"/api/student/?{query}", admin_id)
+
+
+def _student_list_sparse(dataset: Dataset) -> Iterator[BenchmarkRequest]:
+    query = "per_page=10&fields=id,user.name,address.city"
+    for admin_id in itertools.cycle(dataset.admin_ids):
+        yield build_request("GET", f"/api/student/?{query}", admin_id)
+
+
+def _institute_list(dataset: Dataset) -> Iterator[BenchmarkRequest]:
+    for admin_id in itertools.cycle(dataset.admin_ids):
+        yield build_request("GET", "/api/institute/?per_page=10", admin_id)
+
+
+def _student_export(dataset: Dataset) -> Iterator[BenchmarkRequest]:
+    for admin_id in itertools.cycle(dataset.admin_ids):
+        yield build_request("GET", "/api/institute/export/students?format=csv", admin_id, headers={"Accept-Encoding": "gzip"})
+
+
+def _document_upload(dataset: Dataset) -> Iterator[BenchmarkRequest]:
+    for user_id in dataset.undocumented_student_user_ids:
+        yield build_request("POST", "/api/document/", user_id, data={
+            "json": json.dumps({"title": "School Record"}),
+            "file": (BytesIO(_PDF), "record.pdf"),
+        })
+
+
+def _document_get(dataset: Dataset) -> Iterator[BenchmarkRequest]:
+    for user_id in itertools.cycle(dataset.student_user_ids):
+        yield build_request("GET", "/api/document/", user_id)
+
+
+def _conditional_get(dataset: Dataset) -> Iterator[BenchmarkRequest]:
+    headers = {"If-Modified-Since": _REVALIDATED_SINCE}
+    for user_id, student_id in zip(itertools.cycle(dataset.student_user_ids), itertools.cycle(dataset.student_ids)):
+        yield build_request("GET", "/api/user/", user_id, headers=headers)
+        yield build_request("GET", f"/api/student/{student_id}", dataset.admin_ids[0], headers=headers)
+        yield build_request("GET", "/api/institute/info", dataset.admin_ids[0], headers=headers)
+
+
+def _document_list(dataset: Dataset) -> Iterator[BenchmarkRequest]:
+    for admin_id in itertools.cycle(dataset.admin_ids):
+        yield build_request("GET", "/api/document/filter/?per_page=10", admin_id)
+
+
+def _error_list(dataset: Dataset) -> Iterator[BenchmarkRequest]:
+    pages = itertools.cycle(range(1, 4))
+    for page in pages:
+        yield build_request("GET", f"/api/error/?page={page}&per_page=10")
+
+
+def _error_responses(dataset: Dataset) -> Iterator[BenchmarkRequest]:
+    missing_id = max(dataset.student_ids) + 1
+    requests = [
+        build_request("GET", "/api/student/"),
+        build_request("GET", f"/api/student/{missing_id}", dataset.admin_ids[0]),
+        build_request("POST", "/api/institute/", json={"cnpj": "invalid"}),
+        build_request("POST", "/api/auth/login", json={"email": dataset.student_emails[0], "password": "@Wrong000"}),
+    ]
+    yield from itertools.cycle(requests)
+
+
+SCENARIOS = [
+    Scenario("login", _login),
+    Scenario("student_list", _student_list),
+    Scenario("student_list_burst", _student_list_burst),
+    Scenario("student_list_filtered", _student_list_filtered),
+    Scenario("student_list_sparse", _student_list_sparse),
+    Scenario("institute_list", _institute_list),
+    Scenario("student_export", _student_export),
+    Scenario("document_upload", _document_upload),
+    Scenario("document_get", _document_get),
+    Scenario("conditional_get", _conditional_get),
+    Scenario("document_list", _document_list),
+    Scenario("error_list", _error_list),
+    Scenario("error_responses", _error_responses),
+]
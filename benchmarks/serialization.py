@@ -0,0 +1,72 @@
+"""
+Compare restx ``marshal`` with the compiled serializers on seeded pages.
+
+Usage (from the repository root):
+
+    python -m benchmarks.serialization --per-page 10 --iterations 2000
+
+Every page is serialized by both implementations first and the outputs must be
+identical, otherwise the run stops with exit code 1.
+"""
+import argparse
+import json
+import sys
+import timeit
+
+from .environment import configure_environment, reset_database
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Response serialization benchmark")
+    parser.add_argument("--database-uri", default=None, help="Database to seed (default: temporary SQLite file)")
+    parser.add_argument("--per-page", type=int, default=10)
+    parser.add_argument("--iterations", type=int, default=1000)
+    args = parser.parse_args(argv)
+
+    configure_environment(args.database_uri)
+
+    from flask_restx import marshal
+
+    from api import app
+    from app.main.dto.institute_dto import InstituteDTO
+    from app.main.dto.student_dto import StudentDTO
+    from app.main.dto.user_dto import UserDTO
+    from app.main.model.institute import Institute
+    from app.main.model.student import Student
+    from app.main.model.user import User
+    from app.main.util.marshalling import compiler
+
+    pages = {
+        "StudentPaged": (StudentDTO.student_paged, Student),
+        "UserPaged": (UserDTO.user_paged, User),
+        "InstitutesPaged": (InstituteDTO.institutes_paged, Institute),
+    }
+
+    report = {}
+    with app.app_context():
+        reset_database(institutes=1, employees=args.per_page, students=args.per_page, seed=42)
+        for name, (model, table) in pages.items():
+            page = table.query.paginate(page=1, per_page=args.per_page)
+            for item in page.items:
+                marshal(item, model)  # load lazy relationships before timing
+
+            serializer = compiler.compile(model)
+            if (expected := marshal(page, model)) != serializer(page):
+                print(f"{name}: compiled output differs from marshal", file=sys.stderr)
+                return 1
+
+            restx = timeit.timeit(lambda: marshal(page, model), number=args.iterations)
+            compiled = timeit.timeit(lambda: serializer(page), number=args.iterations)
+            report[name] = {
+                "items": len(expected["items"]),
+                "marshal_us": restx / args.iterations * 1e6,
+                "compiled_us": compiled / args.iterations * 1e6,
+                "speedup": restx / compiled,
+            }
+
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,85 @@
+"""
+Compare restx payload validation with the compiled validators.
+
+Usage (from the repository root):
+
+    python -m benchmarks.validation --iterations 2000
+
+Both implementations must abort with the same errors for every payload,
+otherwise the run stops with exit code 1.
+"""
+import argparse
+import json
+import sys
+import timeit
+
+from .environment import configure_environment
+
+PAYLOADS = {
+    "StudentPost": {
+        "valid": {
+            "gender": "CIS_FEMALE",
+            "disabled_person": False,
+            "birthday_date": "2004-05-17",
+            "user": {"name": "Maria Souza", "phone_number": "85999999999"},
+            "address": {"country": "Brasil", "state": "CE", "city": "Fortaleza"},
+        },
+        "invalid": {
+            "gender": "UNKNOWN",
+            "disabled_person": "no",
+            "birthday_date": "2004-05-17",
+            "user": {"name": "Maria Souza", "phone_number": "123"},
+            "address": {"state": "CE", "city": "Fortaleza", "zip": "60000"},
+        },
+    },
+    "UserPut": {
+        "valid": {"name": "Maria Souza", "phone_number": "85999999999"},
+        "invalid": {"name": 42},
+    },
+}
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Payload validation benchmark")
+    parser.add_argument("--iterations", type=int, default=1000)
+    args = parser.parse_args(argv)
+
+    configure_environment()
+
+    from flask_restx import Model as RestxModel
+    from werkzeug.exceptions import BadRequest
+
+    from api import app
+    from app import api
+
+    def aborted(validate, model, payload):
+        try:
+            validate(model, payload, api.refresolver, api.format_checker)
+        except BadRequest as error:
+            return error.data
+        return None
+
+    report = {}
+    with app.test_request_context():
+        for name, payloads in PAYLOADS.items():
+            model = api.models[name]
+            for kind, payload in payloads.items():
+                expected = aborted(RestxModel.validate, model, payload)
+                if aborted(type(model).validate, model, payload) != expected:
+                    print(f"{name} {kind}: compiled validation differs from restx", file=sys.stderr)
+                    return 1
+
+                restx = timeit.timeit(lambda: aborted(RestxModel.validate, model, payload), number=args.iterations)
+                compiled = timeit.timeit(lambda: aborted(type(model).validate, model, payload), number=args.iterations)
+                report[f"{name} {kind}"] = {
+                    "restx_us": restx / args.iterations * 1e6,
+                    "compiled_us": compiled / args.iterations * 1e6,
+                    "speedup": restx / compiled,
+                }
+
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,50 @@
+"""
+Gunicorn settings of ``gunicorn wsgi:app``, read from the working directory.
+
+Every value can be overridden with its ``GUNICORN_*`` environment variable.
+"""
+import multiprocessing
+import os
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:8000")
+
+# gthread: each worker process serves ``threads`` requests at a time, so requests
+# waiting on the database, S3 or SMTP do not block the others. gevent needs the
+# gevent and psycogreen packages.
+worker_class = os.getenv("GUNICORN_WORKER_CLASS", "gthread")
+workers = int(os.getenv("GUNICORN_WORKERS") or multiprocessing.cpu_count() * 2 + 1)
+threads = int(os.getenv("GUNICORN_THREADS", 4))
+worker_connections = int(os.getenv("GUNICORN_WORKER_CONNECTIONS", 1000))
+
+# The app is imported once and the workers are forked from it, sharing its memory;
+# ``post_fork`` resets what must not be shared.
+preload_app = True
+
+# Workers are recycled after a random number of requests around ``max_requests``,
+# so their memory growth is capped and they do not all restart at once.
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", 2000))
+max_requests_jitter = int(os.getenv("GUNICORN_MAX_REQUESTS_JITTER", 200))
+timeout = int(os.getenv("GUNICORN_TIMEOUT", 60))
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", 30))
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", 5))
+
+accesslog = os.getenv("GUNICORN_ACCESS_LOG", "-")
+errorlog = "-"
+
+
+def post_fork(server, worker):
+    from app.main.util.worker_lifecycle import after_fork
+    from wsgi import app
+
+    if worker_class == "gevent":
+        from psycogreen.gevent import patch_psycopg
+
+        patch_psycopg()
+    after_fork(app)
+
+
+def worker_exit(server, worker):
+    from app.main.util.worker_lifecycle import before_exit
+    from wsgi import app
+
+    before_exit(app)
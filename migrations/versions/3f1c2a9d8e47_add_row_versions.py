@@ -0,0 +1,34 @@
+"""Add row version and modification time columns
+
+Revision ID: 3f1c2a9d8e47
+Revises: 
+Create Date: 2026-10-18 09:12:41.283517
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f1c2a9d8e47'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+_TABLES = ("users", "institutes", "employees", "students", "address", "documents")
+
+
+def upgrade():
+    for table in _TABLES:
+        op.add_column(table, sa.Column("version", sa.Integer(), nullable=False, server_default="1"))
+        op.add_column(table, sa.Column("updated_at", sa.DateTime(), nullable=True))
+        op.execute(f"UPDATE {table} SET updated_at = CURRENT_TIMESTAMP")
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.alter_column("updated_at", existing_type=sa.DateTime(), nullable=False)
+
+
+def downgrade():
+    for table in reversed(_TABLES):
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.drop_column("updated_at")
+            batch_op.drop_column("version")
@@ -0,0 +1,45 @@
+"""Add foreign key and filter indexes
+
+Revision ID: 8b6e0d4c7a15
+Revises: 3f1c2a9d8e47
+Create Date: 2026-10-18 10:03:17.904126
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8b6e0d4c7a15'
+down_revision = '3f1c2a9d8e47'
+branch_labels = None
+depends_on = None
+
+_INDEXES = (
+    # Tenant pagination and lookups by institute, in id order
+    ("ix_students_institute_id_id", "students", ["institute_id", "id"]),
+    ("ix_employees_institute_id_id", "employees", ["institute_id", "id"]),
+    # Joins and cascades from users and students
+    ("ix_students_user_id", "students", ["user_id"]),
+    ("ix_employees_user_id", "employees", ["user_id"]),
+    ("ix_documents_student_id", "documents", ["student_id"]),
+    ("ix_address_student_id", "address", ["student_id"]),
+    ("ix_address_institute_id", "address", ["institute_id"]),
+    # Listing filters and sorts
+    ("ix_students_birthday_date", "students", ["birthday_date"]),
+    ("ix_students_gender", "students", ["gender"]),
+    ("ix_users_profile", "users", ["profile"]),
+)
+
+
+def upgrade():
+    # Built concurrently on PostgreSQL so the tables stay writable, which cannot run in a transaction
+    with op.get_context().autocommit_block():
+        for name, table, columns in _INDEXES:
+            op.create_index(name, table, columns, unique=False, postgresql_concurrently=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(_INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True)
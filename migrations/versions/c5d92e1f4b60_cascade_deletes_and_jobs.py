@@ -0,0 +1,75 @@
+"""Cascade deletes and jobs
+
+Revision ID: c5d92e1f4b60
+Revises: 8b6e0d4c7a15
+Create Date: 2026-10-18 11:24:51.310482
+
+"""
+from itertools import groupby
+from operator import itemgetter
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c5d92e1f4b60'
+down_revision = '8b6e0d4c7a15'
+branch_labels = None
+depends_on = None
+
+_FOREIGN_KEYS = (
+    ("students", "user_id", "users"),
+    ("students", "institute_id", "institutes"),
+    ("employees", "user_id", "users"),
+    ("employees", "institute_id", "institutes"),
+    ("address", "student_id", "students"),
+    ("address", "institute_id", "institutes"),
+    ("documents", "student_id", "students"),
+)
+
+
+# Names the unnamed foreign keys of SQLite as PostgreSQL does, so both drop them by the same name
+_NAMING_CONVENTION = {"fk": "%(table_name)s_%(column_0_name)s_fkey"}
+
+
+def _recreate_foreign_keys(ondelete):
+    # SQLite cannot alter constraints, so batch mode copies each table into a new one, and dropping the
+    # old table would run the ON DELETE actions of its children unless foreign keys are off meanwhile
+    sqlite = op.get_bind().dialect.name == "sqlite"
+    if sqlite:
+        op.execute("PRAGMA foreign_keys=OFF")
+    for table, foreign_keys in groupby(_FOREIGN_KEYS, key=itemgetter(0)):
+        with op.batch_alter_table(table, naming_convention=_NAMING_CONVENTION) as batch_op:
+            for _, column, referred in foreign_keys:
+                name = f"{table}_{column}_fkey"
+                batch_op.drop_constraint(name, type_="foreignkey")
+                batch_op.create_foreign_key(name, referred, [column], ["id"], ondelete=ondelete)
+    if sqlite:
+        op.execute("PRAGMA foreign_keys=ON")
+
+
+def upgrade():
+    _recreate_foreign_keys("CASCADE")
+    op.create_table(
+        'jobs',
+        sa.Column('id', sa.String(length=36), nullable=False),
+        sa.Column('kind', sa.String(length=40), nullable=False),
+        sa.Column('status', sa.Enum('PENDING', 'RUNNING', 'DONE', 'FAILED', name='jobstatus'), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('target_id', sa.Integer(), nullable=False),
+        sa.Column('processed', sa.Integer(), nullable=False),
+        sa.Column('total', sa.Integer(), nullable=True),
+        sa.Column('error', sa.String(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_jobs_user_id'), 'jobs', ['user_id'], unique=False)
+
+
+def downgrade():
+    op.drop_index(op.f('ix_jobs_user_id'), table_name='jobs')
+    op.drop_table('jobs')
+    sa.Enum(name='jobstatus').drop(op.get_bind(), checkfirst=True)
+    _recreate_foreign_keys(None)
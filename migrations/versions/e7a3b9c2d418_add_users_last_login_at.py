@@ -0,0 +1,25 @@
+"""Add users.last_login_at
+
+Revision ID: e7a3b9c2d418
+Revises: c5d92e1f4b60
+Create Date: 2026-10-18 13:02:36.518247
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e7a3b9c2d418'
+down_revision = 'c5d92e1f4b60'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('users', sa.Column('last_login_at', sa.DateTime(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('users') as batch_op:
+        batch_op.drop_column('last_login_at')
@@ -0,0 +1,8 @@
+"""Production entrypoint: ``gunicorn wsgi:app``, configured by ``gunicorn.conf.py``."""
+from werkzeug.middleware.proxy_fix import ProxyFix
+
+from api import app
+
+if proxies := app.config["TRUSTED_PROXIES"]:
+    # The client address is the one the proxies saw, for the rate limits and logs
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=proxies, x_proto=proxies)